@@ -0,0 +1,201 @@
+import argparse
+import itertools
+import json
+
+import numpy as np
+
+from keyword_index import tokenize
+
+MATCH, SUBSTITUTION, DELETION, INSERTION = 0, 1, 2, 3
+OP_NAMES = {MATCH: "match", SUBSTITUTION: "substitution", DELETION: "deletion", INSERTION: "insertion"}
+MAX_CELLS = 1 << 24  # int32 DP cells per chunk (~64 MB)
+
+
+# Word-level alignment of a hypothesis (what was said) against a reference (what was expected)
+class Alignment:
+    def __init__(self, reference, hypothesis, substitutions, deletions, insertions, ops=None):
+        self.reference = reference
+        self.hypothesis = hypothesis
+        self.substitutions = substitutions
+        self.deletions = deletions
+        self.insertions = insertions
+        self.ops = ops  # [(op, reference word or None, hypothesis word or None)] in reading order
+
+    @property
+    def errors(self):
+        return self.substitutions + self.deletions + self.insertions
+
+    @property
+    def hits(self):
+        return len(self.reference) - self.substitutions - self.deletions
+
+    @property
+    def wer(self):
+        return self.errors / len(self.reference) if self.reference else float(bool(self.hypothesis))
+
+    # Share of reference words spoken correctly, in order
+    @property
+    def accuracy(self):
+        return self.hits / len(self.reference) if self.reference else 1.0
+
+    def of(self, op):
+        return [(ref, hyp) for code, ref, hyp in self.ops if code == op]
+
+
+def _as_tokens(text):
+    return tokenize(text) if isinstance(text, str) else list(text)
+
+
+# Levenshtein DP for a batch of padded id sequences, one row at a time for every pair at once.
+# Substitution/deletion are elementwise; the insertion chain along a row is the prefix scan
+# row[j] = j + min_{k<=j}(cand[k] - k), i.e. np.minimum.accumulate.
+def _distance_matrices(ref_ids, hyp_ids):
+    batch, n = ref_ids.shape
+    m = hyp_ids.shape[1]
+    cols = np.arange(m + 1, dtype=np.int32)
+    d = np.empty((batch, n + 1, m + 1), dtype=np.int32)
+    d[:, 0, :] = cols
+    cand = np.empty((batch, m + 1), dtype=np.int32)
+    for i in range(1, n + 1):
+        prev = d[:, i - 1, :]
+        cost = (ref_ids[:, i - 1, None] != hyp_ids).astype(np.int32)
+        cand[:, 0] = i
+        np.minimum(prev[:, :-1] + cost, prev[:, 1:] + 1, out=cand[:, 1:])
+        cand -= cols
+        np.minimum.accumulate(cand, axis=1, out=d[:, i, :])
+        d[:, i, :] += cols
+    return d
+
+
+# Walk every pair back from (n, m) together; ties prefer match/substitution, then deletion
+def _backtrace(d, ref_ids, hyp_ids, ref_len, hyp_len, with_ops):
+    batch = len(ref_len)
+    i, j = ref_len.astype(np.int64), hyp_len.astype(np.int64)
+    counts = np.zeros((4, batch), dtype=np.int32)
+    steps = int((ref_len + hyp_len).max()) if batch else 0
+    ops = np.full((batch, steps), -1, dtype=np.int8) if with_ops else None
+    rows = np.arange(batch)
+    for step in range(steps):
+        active = (i > 0) | (j > 0)
+        if not active.any():
+            break
+        b, ii, jj = rows[active], i[active], j[active]
+        im, jm = np.maximum(ii - 1, 0), np.maximum(jj - 1, 0)
+        current = d[b, ii, jj]
+        can_diag = (ii > 0) & (jj > 0)
+        differs = ref_ids[b, im] != hyp_ids[b, jm]
+        diag = can_diag & (d[b, im, jm] + differs == current)
+        delete = ~diag & (ii > 0) & (d[b, im, jj] + 1 == current)
+        insert = ~diag & ~delete
+        code = np.where(diag, np.where(differs, SUBSTITUTION, MATCH), np.where(delete, DELETION, INSERTION))
+        np.add.at(counts, (code, b), 1)
+        if with_ops:
+            ops[b, step] = code
+        i[active] -= diag | delete
+        j[active] -= diag | insert
+    return counts, ops
+
+
+# Word ids for ragged token lists, left-aligned in a padded matrix
+def _pad_ids(sequences, lengths, vocab, pad):
+    ids = np.full((len(sequences), max(int(lengths.max(initial=0)), 1)), pad, dtype=np.int32)
+    flat = np.fromiter(map(vocab.__getitem__, itertools.chain.from_iterable(sequences)), dtype=np.int32,
+                       count=int(lengths.sum()))
+    ids[np.arange(ids.shape[1]) < lengths[:, None]] = flat  # row-major, same order as the chain
+    return ids
+
+
+def _align_chunk(refs, hyps, with_ops):
+    ref_len = np.array([len(r) for r in refs], dtype=np.int64)
+    hyp_len = np.array([len(h) for h in hyps], dtype=np.int64)
+    n, m = int(ref_len.max(initial=0)), int(hyp_len.max(initial=0))
+    words = set(itertools.chain.from_iterable(refs))
+    words.update(itertools.chain.from_iterable(hyps))
+    vocab = {w: k for k, w in enumerate(words)}
+    # Padding ids never match: -1 in references, -2 in hypotheses
+    ref_ids = _pad_ids(refs, ref_len, vocab, -1)
+    hyp_ids = _pad_ids(hyps, hyp_len, vocab, -2)
+    d = _distance_matrices(ref_ids[:, :n], hyp_ids[:, :m])
+    counts, ops = _backtrace(d, ref_ids, hyp_ids, ref_len, hyp_len, with_ops)
+
+    results = []
+    for k, (ref, hyp) in enumerate(zip(refs, hyps)):
+        words = None
+        if with_ops:
+            words = []
+            r, h = 0, 0
+            for code in ops[k][ops[k] >= 0][::-1]:
+                if code == INSERTION:
+                    words.append((INSERTION, None, hyp[h]))
+                    h += 1
+                elif code == DELETION:
+                    words.append((DELETION, ref[r], None))
+                    r += 1
+                else:
+                    words.append((int(code), ref[r], hyp[h]))
+                    r += 1
+                    h += 1
+        results.append(Alignment(ref, hyp, int(counts[SUBSTITUTION, k]), int(counts[DELETION, k]),
+                                 int(counts[INSERTION, k]), words))
+    return results
+
+
+# Align many (reference, hypothesis) pairs at once. Texts are tokenized like the keyword
+# index (lowercase, no punctuation); token lists are used as given. Pairs are sorted by size
+# and chunked so padding and the DP matrices stay small.
+def align_batch(pairs, with_ops=True, max_cells=MAX_CELLS):
+    refs = [_as_tokens(ref) for ref, _ in pairs]
+    hyps = [_as_tokens(hyp) for _, hyp in pairs]
+    order = sorted(range(len(pairs)), key=lambda k: (len(refs[k]), len(hyps[k])))
+    results = [None] * len(pairs)
+    start = 0
+    while start < len(order):
+        end = start + 1
+        # Grow the chunk while its padded (n+1) * (m+1) matrices fit in max_cells
+        n, m = len(refs[order[start]]), len(hyps[order[start]])
+        while end < len(order):
+            n2, m2 = max(n, len(refs[order[end]])), max(m, len(hyps[order[end]]))
+            if (end - start + 1) * (n2 + 1) * (m2 + 1) > max_cells:
+                break
+            n, m = n2, m2
+            end += 1
+        chunk = order[start:end]
+        for k, alignment in zip(chunk, _align_chunk([refs[k] for k in chunk], [hyps[k] for k in chunk], with_ops)):
+            results[k] = alignment
+        start = end
+    return results
+
+
+def align(reference, hypothesis):
+    return align_batch([(reference, hypothesis)])[0]
+
+
+# Corpus-level WER for a whole session or log: total errors over total reference words
+def corpus_wer(alignments):
+    words = sum(len(a.reference) for a in alignments)
+    return sum(a.errors for a in alignments) / words if words else 0.0
+
+
+# python alignment.py attempts.jsonl  (one {"reference": ..., "hypothesis": ...} per line)
+def main():
+    parser = argparse.ArgumentParser(description="Bulk word error rate for logged attempts")
+    parser.add_argument("path")
+    parser.add_argument("--reference-field", default="reference")
+    parser.add_argument("--hypothesis-field", default="hypothesis")
+    args = parser.parse_args()
+
+    with open(args.path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    alignments = align_batch([(r[args.reference_field], r[args.hypothesis_field]) for r in records], with_ops=False)
+    print(json.dumps({
+        "attempts": len(alignments),
+        "corpus_wer": corpus_wer(alignments),
+        "mean_wer": float(np.mean([a.wer for a in alignments])) if alignments else 0.0,
+        "substitutions": sum(a.substitutions for a in alignments),
+        "deletions": sum(a.deletions for a in alignments),
+        "insertions": sum(a.insertions for a in alignments),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,49 @@
+import os
 import streamlit as st
+import startup
+import tracing
+import speech_upload
+import session_memory
+
+# Start loading NLTK data, the Sentence-BERT model and the TTS engine in the background
+startup.warm_up()
+if speech_upload.BROWSER:
+    startup.warm_up(["speech_pool"])  # Answers are recorded in the browser and recognized on the speech pool
+
+# Stage latency export: METRICS_PORT serves /metrics and /metrics.json, METRICS_FILE is a Prometheus text file
+tracing.start_exporter(port=os.environ.get("METRICS_PORT"), path=os.environ.get("METRICS_FILE", ".cache/metrics.prom"))
 
 # Define pages
 fluency_practice = st.Page("pages/fluency_practice.py", title="Fluency Practice", icon="🗣️")
 emotion_based_speaking = st.Page("pages/emotion_based_speaking.py", title="Emotion-Based Speaking", icon="🎭")
 single_word_spark = st.Page("pages/single_word_spark.py", title="Single Word Spark", icon="💡")
 sentence_speech_challenge = st.Page("pages/sentence_speech_challenge.py", title="Sentence Speech Challenge", icon="📝")
+progress = st.Page("pages/progress.py", title="My Progress", icon="📈")
+metrics_admin = st.Page("pages/metrics_admin.py", title="Metrics", icon="📊", url_path="metrics", visibility="hidden")  # Admin only, not in the menu
 
 # Configure navigation
 pg = st.navigation([
     fluency_practice,
     emotion_based_speaking,
     single_word_spark,
-    sentence_speech_challenge
+    sentence_speech_challenge,
+    progress,
+    metrics_admin
 ])
 
 # Set global page configuration
 st.set_page_config(page_title="Speech Training & Gamified Learning App", page_icon="🎓")
 
+# Mark this session active; a session idle for SESSION_IDLE_MINUTES (0 disables) starts over here,
+# before the page runs, and is told so. Saved results are kept.
+if session_memory.touch():
+    st.toast("⏳ Your session was idle and has been reset. Your saved results are on My Progress.")
+
+# Learner name for saved results; kept in the URL so it survives a refresh
+learner = st.sidebar.text_input("👤 Your name", value=st.query_params.get("learner", ""))
+if learner.strip() and learner.strip() != st.query_params.get("learner"):
+    st.query_params["learner"] = learner.strip()
+
 # Sidebar button to open external module
 st.sidebar.markdown("## Hearning Impaired People")
 st.sidebar.markdown("## Sound Make Sign")
@@ -0,0 +1,45 @@
+import contextlib
+import os
+import tempfile
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows: callers run one writer at a time
+
+
+# Write-then-rename, so readers never map a half-written file. The tmp file is unique to this
+# write, so processes and threads writing the same path never share one.
+@contextlib.contextmanager
+def _replacing(path):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        os.chmod(tmp, 0o644)  # mkstemp makes it owner-only
+        with os.fdopen(fd, "wb") as f:
+            yield f
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp)
+        raise
+
+
+def write_bytes(path, data):
+    with _replacing(path) as f:
+        f.write(data)
+
+
+def save_array(path, array):
+    with _replacing(path) as f:
+        np.save(f, array)
+
+
+# Exclusive lock on a lock file, held across processes for the with block
+@contextlib.contextmanager
+def file_lock(path):
+    with open(path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
@@ -0,0 +1,148 @@
+import threading
+import time
+
+import speech_recognition as sr
+
+import speech_stream
+from speech_stream import EnergyEndpointer, RingBuffer, capture_and_recognize
+
+
+# Keeps one input stream open, tracks ambient noise in the background and hands
+# out utterances, so answers skip the per-call device open and calibration pass
+class CaptureService:
+    def __init__(self, source_factory=speech_stream.open_source, backend_factory=speech_stream.make_backend,
+                 buffer_seconds=30, idle_timeout=300):
+        self.source_factory = source_factory
+        self.backend_factory = backend_factory
+        self.buffer_seconds = buffer_seconds
+        self.idle_timeout = idle_timeout
+        self.sample_rate = None
+        self.frame_ms = None
+        self.frame_samples = None
+        self.ring = None
+        self.ambient = None
+        self.stats = {"opens": 0, "captures": 0, "overruns": 0}
+        self._cond = threading.Condition()
+        self._capture_lock = threading.Lock()
+        self._thread = None
+        self._running = False
+        self._capturing = False
+        self._last_used = time.monotonic()
+
+    @property
+    def noise(self):
+        return self.ambient.noise if self.ambient is not None else None
+
+    @property
+    def threshold(self):
+        return self.ambient.threshold if self.ambient is not None else None
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return self
+            self._running = True
+            self._last_used = time.monotonic()
+            self.ring = None
+            self._thread = threading.Thread(target=self._read, name="audio-capture", daemon=True)
+            self._thread.start()
+            # Wait for the device to open and the first calibration to finish
+            while self._running and (self.ring is None or self.ambient.threshold is None):
+                self._cond.wait(0.1)
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _read(self):
+        try:
+            with self.source_factory() as source:
+                with self._cond:
+                    self.stats["opens"] += 1
+                    self.sample_rate = source.sample_rate
+                    self.frame_ms = source.frame_ms
+                    self.frame_samples = source.frame_samples
+                    self.ring = RingBuffer(source.sample_rate * self.buffer_seconds)
+                    if self.ambient is None:
+                        self.ambient = EnergyEndpointer(source.frame_ms)
+                for frame in source.frames():
+                    with self._cond:
+                        if not self._running:
+                            break
+                        self.ring.write(frame)
+                        # Outside of captures every frame refines the noise estimate
+                        if not self._capturing:
+                            self.ambient.process(frame)
+                            self.ambient.speaking = False
+                            if time.monotonic() - self._last_used > self.idle_timeout:
+                                break
+                        self._cond.notify_all()
+        finally:
+            with self._cond:
+                self._running = False
+                self._cond.notify_all()
+
+    # Frames written from now on; the capture pipeline reads these like a live source
+    def frames(self):
+        with self._cond:
+            position = self.ring.end
+        while True:
+            with self._cond:
+                while self.ring.end - position < self.frame_samples and self._running:
+                    self._cond.wait(0.5)
+                if self.ring.end - position < self.frame_samples:
+                    return
+                if position < self.ring.start:
+                    self.stats["overruns"] += 1
+                    position = self.ring.start
+                frame = self.ring.read(position, position + self.frame_samples)
+            position += self.frame_samples
+            yield frame
+
+    # The one capture API for every page: waits for speech, returns a speech_stream.Utterance
+    def capture_utterance(self, timeout=None, phrase_time_limit=None, on_partial=None, backend=None):
+        with self._capture_lock:
+            self.start()
+            if self.ring is None or self.ambient.threshold is None:
+                raise sr.WaitTimeoutError("audio input is not available")
+            with self._cond:
+                self._capturing = True
+                self._last_used = time.monotonic()
+                endpointer = EnergyEndpointer(self.frame_ms, noise=self.ambient.noise)
+            try:
+                utterance = capture_and_recognize(
+                    self, backend or self.backend_factory(), endpointer=endpointer, timeout=timeout,
+                    phrase_time_limit=phrase_time_limit, on_partial=on_partial)
+                self.stats["captures"] += 1
+                return utterance
+            finally:
+                with self._cond:
+                    self._capturing = False
+                    self._last_used = time.monotonic()
+                    # Keep the noise level the capture tracked while waiting for speech
+                    if endpointer.noise is not None:
+                        self.ambient.noise = endpointer.noise
+                        self.ambient.threshold = endpointer.threshold
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+# One capture service per process: the server has one input device
+def get_service():
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = CaptureService()
+        return _service
+
+
+def capture_utterance(timeout=None, phrase_time_limit=None, on_partial=None):
+    return get_service().capture_utterance(timeout=timeout, phrase_time_limit=phrase_time_limit,
+                                           on_partial=on_partial)
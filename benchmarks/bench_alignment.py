@@ -0,0 +1,77 @@
+import argparse
+import random
+import time
+
+from alignment import align_batch, corpus_wer
+from benchmarks.fake_services import LOREM_WORDS
+
+
+# Textbook O(n*m) Python DP with backtrace, one pair at a time
+def python_align(ref, hyp):
+    n, m = len(ref), len(hyp)
+    d = [[0] * (m + 1) for _ in range(n + 1)]
+    for i in range(n + 1):
+        d[i][0] = i
+    for j in range(m + 1):
+        d[0][j] = j
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + (ref[i - 1] != hyp[j - 1]))
+    i, j, s, dl, ins = n, m, 0, 0, 0
+    while i or j:
+        if i and j and d[i][j] == d[i - 1][j - 1] + (ref[i - 1] != hyp[j - 1]):
+            s += ref[i - 1] != hyp[j - 1]
+            i, j = i - 1, j - 1
+        elif i and d[i][j] == d[i - 1][j] + 1:
+            dl, i = dl + 1, i - 1
+        else:
+            ins, j = ins + 1, j - 1
+    return s, dl, ins
+
+
+# A spoken attempt: the sentence with some words dropped, swapped or added
+def make_pair(rng, min_words, max_words):
+    ref = rng.choices(LOREM_WORDS, k=rng.randint(min_words, max_words))
+    hyp = []
+    for word in ref:
+        r = rng.random()
+        if r < 0.08:
+            continue
+        hyp.append(rng.choice(LOREM_WORDS) if r < 0.16 else word)
+        if rng.random() < 0.05:
+            hyp.append(rng.choice(LOREM_WORDS))
+    return ref, hyp
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk WER: per-pair Python DP vs batched NumPy alignment")
+    parser.add_argument("--pairs", type=int, default=10000)
+    parser.add_argument("--min-words", type=int, default=6)
+    parser.add_argument("--max-words", type=int, default=40)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    pairs = [make_pair(rng, args.min_words, args.max_words) for _ in range(args.pairs)]
+
+    start = time.perf_counter()
+    expected = [python_align(ref, hyp) for ref, hyp in pairs]
+    python_s = time.perf_counter() - start
+
+    rows = []
+    for with_ops in (False, True):
+        start = time.perf_counter()
+        alignments = align_batch(pairs, with_ops=with_ops)
+        rows.append((with_ops, time.perf_counter() - start, alignments))
+
+    print(f"{len(pairs)} pairs of {args.min_words}-{args.max_words} words")
+    print(f"{'path':<22} {'total s':>8} {'pairs/s':>10}")
+    print(f"{'python per pair':<22} {python_s:>8.3f} {len(pairs) / python_s:>10.0f}")
+    for with_ops, seconds, alignments in rows:
+        name = "batched + word ops" if with_ops else "batched (counts only)"
+        same = all((a.substitutions, a.deletions, a.insertions) == e for a, e in zip(alignments, expected))
+        print(f"{name:<22} {seconds:>8.3f} {len(pairs) / seconds:>10.0f}  same S/D/I as python: {same}")
+    print(f"corpus WER: {corpus_wer(rows[0][2]):.4f}")
+
+
+if __name__ == "__main__":
+    main()
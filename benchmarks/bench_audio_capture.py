@@ -0,0 +1,96 @@
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from audio_capture import CaptureService
+from benchmarks.fixtures import ensure_fixtures
+from speech_stream import EnergyEndpointer, OfflineBackend, WavFileSource, capture_and_recognize
+
+
+# Live-like input: room noise until say() is called, then the fixture's speech, then noise again.
+# Models a user who starts answering once the page shows "Listening...".
+class PromptedSource(WavFileSource):
+    def __init__(self, path, open_cost=0.0):
+        super().__init__(path, realtime=True)
+        self.open_cost = open_cost
+        lead = self.sample_rate // 2
+        self.noise = self.samples[:lead - lead % self.frame_samples]
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        time.sleep(self.open_cost)  # device open/close that every per-answer Microphone() pays
+        return self
+
+    def say(self, after_frames=0):
+        with self._lock:
+            self._pending = [None] * after_frames + list(range(0, len(self.samples) - self.frame_samples + 1,
+                                                             self.frame_samples))
+
+    def frames(self):
+        start = time.monotonic()
+        i = 0
+        while True:
+            with self._lock:
+                offset = self._pending.pop(0) if self._pending else None
+            if offset is None:
+                n = i % (len(self.noise) // self.frame_samples)
+                frame = self.noise[n * self.frame_samples:(n + 1) * self.frame_samples]
+            else:
+                frame = self.samples[offset:offset + self.frame_samples]
+            delay = start + i * self.frame_ms / 1000 - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            i += 1
+            yield frame
+
+
+# Old path: open the input and calibrate before every answer
+def per_answer(path, questions, calibration_ms, open_cost):
+    times = []
+    for _ in range(questions):
+        start = time.perf_counter()
+        with PromptedSource(path, open_cost) as source:
+            endpointer = EnergyEndpointer(source.frame_ms, calibration_ms=calibration_ms)
+            source.say(after_frames=endpointer.calibration_frames)
+            capture_and_recognize(source, OfflineBackend.for_wav(path), endpointer=endpointer, timeout=10)
+        times.append(time.perf_counter() - start)
+    return times, {"opens": questions}
+
+
+def shared_service(path, questions, calibration_ms, open_cost):
+    source = PromptedSource(path, open_cost)
+    service = CaptureService(source_factory=lambda: source, backend_factory=lambda: OfflineBackend.for_wav(path))
+    service.ambient = EnergyEndpointer(source.frame_ms, calibration_ms=calibration_ms)
+    service.start()
+    times = []
+    try:
+        for _ in range(questions):
+            start = time.perf_counter()
+            source.say(after_frames=3)  # small margin so the capture is reading before speech starts
+            service.capture_utterance(timeout=10)
+            times.append(time.perf_counter() - start)
+    finally:
+        service.stop()
+    return times, service.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-answer time: open+calibrate per call vs shared capture service")
+    parser.add_argument("--fixture", default="short_answer")
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument("--calibration-ms", type=int, default=500, help="old pages ran adjust_for_ambient_noise(0.5-1 s)")
+    parser.add_argument("--open-cost", type=float, default=0.05, help="simulated device open time (s)")
+    args = parser.parse_args()
+
+    path = ensure_fixtures()[args.fixture]
+    print(f"{'path':<16} {'mean s':>7} {'p95 s':>7} {'total s':>8}  stats")
+    for name, run in (("per-answer", per_answer), ("shared service", shared_service)):
+        times, stats = run(path, args.questions, args.calibration_ms, args.open_cost)
+        print(f"{name:<16} {np.mean(times):>7.2f} {np.percentile(times, 95):>7.2f} {sum(times):>8.2f}  {stats}")
+
+
+if __name__ == "__main__":
+    main()
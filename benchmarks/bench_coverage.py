@@ -0,0 +1,61 @@
+import argparse
+import random
+import time
+
+import numpy as np
+
+from benchmarks.fake_services import FakeSentenceModel, make_sentence
+from speech_coverage import ReferenceMatrix, chunk_speech, score_coverage, split_sentences
+
+
+# Chunked scoring done naively: one encode call per chunk and a Python loop of cosines
+def per_chunk(model, reference_sentences, speech):
+    reference = [model.encode([s])[0] for s in reference_sentences]
+    said = [model.encode([c])[0] for c in chunk_speech(speech)]
+    return [max(float(np.dot(r, s) / (np.linalg.norm(r) * np.linalg.norm(s))) for s in said) for r in reference]
+
+
+# Reference matrix built once per topic; one batched call and one matrix product per attempt
+def batched(model, reference, speech):
+    return score_coverage(reference, model.encode(chunk_speech(speech))).per_sentence
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-attempt coverage scoring: per-chunk encode vs one batched matrix")
+    parser.add_argument("--attempts", type=int, default=50)
+    parser.add_argument("--reference-sentences", type=int, default=12)
+    parser.add_argument("--speech-words", type=int, default=120)
+    parser.add_argument("--call-cost", type=float, default=0.004, help="fake model cost per encode call (s)")
+    parser.add_argument("--text-cost", type=float, default=0.0005, help="fake model cost per text (s)")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    model = FakeSentenceModel(call_cost=args.call_cost, text_cost=args.text_cost)
+    summary = " ".join(make_sentence(rng) for _ in range(args.reference_sentences))
+    sentences = split_sentences(summary)
+    reference = ReferenceMatrix(sentences, model.encode(sentences))
+    speeches = [" ".join(make_sentence(rng).rstrip(".").lower() for _ in range(args.speech_words // 10))
+                for _ in range(args.attempts)]
+
+    rows = []
+    for name, fn, ref in (("per chunk", per_chunk, sentences), ("batched", batched, reference)):
+        calls = model.calls
+        times, results = [], []
+        for speech in speeches:
+            start = time.perf_counter()
+            results.append(fn(model, ref, speech))
+            times.append(time.perf_counter() - start)
+        rows.append((name, np.array(times), (model.calls - calls) / len(speeches), results))
+
+    same = all(np.allclose(a, b, atol=1e-5) for a, b in zip(rows[0][3], rows[1][3]))
+    chunks = np.mean([len(chunk_speech(s)) for s in speeches])
+    print(f"reference: {len(sentences)} sentences; speech: {chunks:.1f} chunks per attempt")
+    print(f"{'path':<10} {'calls/attempt':>14} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, times, calls, _ in rows:
+        p50, p95 = np.percentile(times, [50, 95]) * 1e3
+        print(f"{name:<10} {calls:>14.1f} {p50:>8.2f} {p95:>8.2f}")
+    print(f"per-sentence coverage identical: {same}")
+
+
+if __name__ == "__main__":
+    main()
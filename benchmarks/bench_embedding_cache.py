@@ -0,0 +1,53 @@
+import argparse
+import random
+import tempfile
+import time
+
+from benchmarks.fake_services import FakeSentenceModel
+from embedding_cache import EmbeddingCache
+
+
+def load_encoder(model_name):
+    if model_name is None:
+        return FakeSentenceModel(call_cost=0.004, text_cost=0.002)
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+# Simulated quiz traffic: many users answering questions drawn from a small answer pool
+def simulate(encode_fn, answers, guesses, attempts, rng):
+    start = time.perf_counter()
+    for _ in range(attempts):
+        encode_fn([rng.choice(guesses), rng.choice(answers)])
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding cache hit rate and encode time saved")
+    parser.add_argument("--model", default=None, help="SentenceTransformer name; default is a fake encoder")
+    parser.add_argument("--attempts", type=int, default=500)
+    parser.add_argument("--answers", type=int, default=50)
+    parser.add_argument("--guesses", type=int, default=200)
+    args = parser.parse_args()
+
+    encoder = load_encoder(args.model)
+    answers = [f"answer{i}" for i in range(args.answers)]
+    guesses = [f"guess{i}" for i in range(args.guesses)]
+
+    uncached = simulate(encoder.encode, answers, guesses, args.attempts, random.Random(0))
+    print(f"uncached: {uncached:7.2f} s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = EmbeddingCache(args.model or "fake", cache_dir=tmp)
+        cached = simulate(lambda texts: cache.encode(texts, encoder.encode), answers, guesses,
+                          args.attempts, random.Random(0))
+        print(f"cached:   {cached:7.2f} s  hit rate {cache.hit_rate():.1%}  {cache.stats}")
+
+        restarted = EmbeddingCache(args.model or "fake", cache_dir=tmp)
+        warm = simulate(lambda texts: restarted.encode(texts, encoder.encode), answers, guesses,
+                        args.attempts, random.Random(1))
+        print(f"restart:  {warm:7.2f} s  hit rate {restarted.hit_rate():.1%}  {restarted.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import argparse
+import random
+import time
+import tracemalloc
+
+import numpy as np
+
+from emotion_corpus import Corpus
+
+
+# Emma's word list, or a Zipf-shaped synthetic stand-in when NLTK data is unavailable
+def load_words(synthetic):
+    if not synthetic:
+        try:
+            from nltk.corpus import gutenberg
+            gutenberg.fileids()
+            return lambda: list(gutenberg.words('austen-emma.txt'))
+        except LookupError:
+            print("gutenberg corpus not installed; using a synthetic word list")
+    rng = np.random.default_rng(0)
+    vocab = [f"w{i}" for i in range(7000)]
+    ranks = np.minimum(rng.zipf(1.3, 192_000), len(vocab)) - 1
+    text = " ".join(vocab[r] for r in ranks)
+    return lambda: text.split()
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, elapsed, retained, peak
+
+
+def old_rerun(read_words, num_sentences):
+    words = read_words()
+    sentences = []
+    for _ in range(num_sentences):
+        length = random.randint(8, 15)
+        sentences.append((" ".join(random.sample(words, length)) + ".").capitalize())
+    return words, sentences
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gutenberg corpus memory and per-rerun latency, before and after")
+    parser.add_argument("--sentences", type=int, default=50)
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--synthetic", action="store_true")
+    args = parser.parse_args()
+
+    read_words = load_words(args.synthetic)
+
+    (words, _), _, list_bytes, _ = measure(lambda: old_rerun(read_words, args.sentences))
+    corpus, load_time, corpus_bytes, _ = measure(lambda: Corpus.from_words(read_words()))
+    print(f"resident corpus: list[str] {list_bytes / 2 ** 20:7.2f} MiB   "
+          f"vocab+int32 {corpus_bytes / 2 ** 20:7.2f} MiB ({len(corpus.vocab)} types, {len(corpus)} tokens)")
+    print(f"one-time load:   {load_time * 1000:7.1f} ms")
+    del words
+
+    start = time.perf_counter()
+    for _ in range(args.reruns):
+        old_rerun(read_words, args.sentences)
+    old = (time.perf_counter() - start) / args.reruns
+
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    for _ in range(args.reruns):
+        corpus.generate_sentences(args.sentences, rng)
+    new = (time.perf_counter() - start) / args.reruns
+    print(f"per rerun ({args.sentences} sentences): old {old * 1000:8.2f} ms   new {new * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
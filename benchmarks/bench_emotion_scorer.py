@@ -0,0 +1,65 @@
+import argparse
+import time
+
+import numpy as np
+from textblob import TextBlob
+from textblob.en import sentiment as pattern_sentiment
+
+from emotion_corpus import Corpus
+from emotion_scorer import EmotionScorer, emotion_label
+
+
+# Emma if installed; otherwise a word mix that exercises lexicon words, negations,
+# modifiers and punctuation so both the fast path and the fallback are covered
+def load_corpus():
+    try:
+        from nltk.corpus import gutenberg
+        return Corpus.from_words(gutenberg.words('austen-emma.txt'))
+    except LookupError:
+        print("gutenberg corpus not installed; using a synthetic corpus")
+    rng = np.random.default_rng(0)
+    lexicon = sorted(w for w in pattern_sentiment if w.isalpha())
+    fillers = ["the", "of", "and", "to", "her", "was", "it", "in", "she", "that", "emma", "harriet"]
+    specials = ["not", "never", "no", "!", ":)", "a", "mr", "don"]
+    punctuation = [",", ";", "--", "'", ".", ":", "?", "\"", "(!)"]
+    pool = lexicon + fillers * 2000 + specials * 30 + punctuation * 300
+    return Corpus.from_words(pool[i] for i in rng.integers(0, len(pool), 200_000))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched lexicon emotion scoring vs TextBlob")
+    parser.add_argument("--sentences", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    start = time.perf_counter()
+    scorer = EmotionScorer(corpus.vocab)
+    print(f"lexicon table: {len(corpus.vocab)} types in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    ids, offsets = corpus.sample(args.sentences, np.random.default_rng(args.seed))
+    sentences = corpus.render(ids, offsets)
+
+    start = time.perf_counter()
+    reference = [TextBlob(s).sentiment.polarity for s in sentences]
+    expected = [emotion_label(p) for p in reference]
+    textblob_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    labels = scorer.score_batch(ids, offsets, sentences)
+    batch_time = time.perf_counter() - start
+
+    polarity, fallback = scorer.polarity_batch(ids, offsets)
+    fast = ~fallback
+    mismatched = [i for i in range(len(sentences)) if labels[i] != expected[i]]
+    worst = np.abs(polarity[fast] - np.asarray(reference)[fast]).max() if fast.any() else 0.0
+
+    print(f"TextBlob loop: {len(sentences) / textblob_time:10.0f} sentences/s")
+    print(f"batch scorer:  {len(sentences) / batch_time:10.0f} sentences/s "
+          f"({fallback.mean():.1%} routed through TextBlob)")
+    print(f"max |polarity difference| on the fast path: {worst:.3g}")
+    print(f"emotion buckets differing from TextBlob: {len(mismatched)} (checked by python -m benchmarks.scorer_parity)")
+
+
+if __name__ == "__main__":
+    main()
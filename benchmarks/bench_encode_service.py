@@ -0,0 +1,71 @@
+import argparse
+import random
+import threading
+import time
+
+from benchmarks.fake_services import FakeSentenceModel
+from encode_service import EncodeService
+
+
+def load_model(model_name):
+    if model_name is None:
+        return FakeSentenceModel()
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+# Each simulated session submits 1-2 texts, waits for the result, then thinks briefly
+def run_sessions(service, sessions, requests_per_session, think_time):
+    latencies = []
+    lock = threading.Lock()
+
+    def session(seed):
+        rng = random.Random(seed)
+        for i in range(requests_per_session):
+            texts = [f"session {seed} answer {i}", f"reference {rng.randint(0, 50)}"][:rng.randint(1, 2)]
+            start = time.perf_counter()
+            service.encode(texts)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+            time.sleep(rng.uniform(0, think_time))
+
+    threads = [threading.Thread(target=session, args=(seed,)) for seed in range(sessions)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Encode throughput and p95 latency with and without micro-batching")
+    parser.add_argument("--model", default=None, help="SentenceTransformer name; default is a fake model")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--think-time", type=float, default=0.02)
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--max-wait", type=float, default=0.01)
+    args = parser.parse_args()
+
+    model = load_model(args.model)
+    print(f"{'sessions':>8} {'mode':>9} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'batches':>8}")
+    for sessions in args.sessions:
+        for batching in (False, True):
+            service = EncodeService(model.encode, max_batch=args.max_batch, max_wait=args.max_wait, batching=batching)
+            elapsed, latencies = run_sessions(service, sessions, args.requests, args.think_time)
+            service.close()
+            mode = "batched" if batching else "direct"
+            print(f"{sessions:>8} {mode:>9} {len(latencies) / elapsed:>9.1f} "
+                  f"{percentile(latencies, 0.5) * 1000:>8.1f} {percentile(latencies, 0.95) * 1000:>8.1f} "
+                  f"{service.stats['batches']:>8}")
+
+
+if __name__ == "__main__":
+    main()
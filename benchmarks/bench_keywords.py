@@ -0,0 +1,81 @@
+import argparse
+import random
+import string
+import time
+
+import nltk
+import numpy as np
+
+from benchmarks.fake_services import LOREM_WORDS
+from keyword_index import KeywordIndex, extract_keywords, stopwords
+
+
+# Old path: stopword set and translate table rebuilt and both texts re-tokenized per attempt
+def old_extract_keywords(text):
+    stop = set(nltk.corpus.stopwords.words('english'))
+    translator = str.maketrans("", "", string.punctuation)
+    tokens = nltk.word_tokenize(text.translate(translator).lower())
+    return set(word for word in tokens if word not in stop and len(word) > 2)
+
+
+def old_feedback(user_speech, reference_text):
+    user_keywords = old_extract_keywords(user_speech)
+    reference_keywords = old_extract_keywords(reference_text)
+    missing = list(reference_keywords - user_keywords)[:5]
+    extra = list(user_keywords - reference_keywords)[:5]
+    return missing, extra, len(user_speech.split()) < len(reference_text.split()) * 0.5
+
+
+def new_feedback(user_speech, reference_index):
+    user_index = KeywordIndex(user_speech)
+    missing = reference_index.missing(user_index)[:5]
+    extra = user_index.extra(reference_index)[:5]
+    return missing, extra, user_index.word_count < reference_index.word_count * 0.5
+
+
+def make_paragraph(rng, sentences):
+    filler = ["the", "of", "and", "was", "is", "in", "it", "with", "for", "its"]
+    out = []
+    for _ in range(sentences):
+        words = [rng.choice(LOREM_WORDS + filler) for _ in range(rng.randint(8, 20))]
+        out.append(" ".join(words).capitalize() + rng.choice([".", ",", ";", "!"]) + " (" + rng.choice(LOREM_WORDS) + ")")
+    return " ".join(out)
+
+
+def per_attempt(fn, reference, attempts):
+    times = []
+    for user in attempts:
+        start = time.perf_counter()
+        fn(user, reference)
+        times.append(time.perf_counter() - start)
+    return np.array(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-attempt keyword feedback latency: re-tokenize vs topic index")
+    parser.add_argument("--attempts", type=int, default=500)
+    parser.add_argument("--sentences", type=int, default=8, help="sentences in the reference paragraph")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    stopwords()  # load once outside the timings
+    reference = make_paragraph(rng, args.sentences)
+    attempts = [make_paragraph(rng, rng.randint(1, args.sentences)) for _ in range(args.attempts)]
+
+    old = per_attempt(old_feedback, reference, attempts)
+    start = time.perf_counter()
+    index = KeywordIndex(reference)  # once per topic, cached with the summary
+    build = time.perf_counter() - start
+    new = per_attempt(new_feedback, index, attempts)
+
+    same = sum(old_extract_keywords(text) == extract_keywords(text) for text in attempts[:100])
+    print(f"reference: {index.word_count} words, {len(index)} keywords, index built in {build * 1e3:.2f} ms")
+    print(f"{'path':<12} {'p50 us':>8} {'p95 us':>8} {'p99 us':>8}")
+    for name, times in (("re-tokenize", old), ("topic index", new)):
+        p50, p95, p99 = np.percentile(times, [50, 95, 99]) * 1e6
+        print(f"{name:<12} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f}")
+    print(f"keyword sets identical to the nltk path: {same}/100 texts")
+
+
+if __name__ == "__main__":
+    main()
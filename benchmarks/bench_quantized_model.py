@@ -0,0 +1,80 @@
+import argparse
+import json
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.fake_services import make_sentence
+
+PRECISIONS = ["float32", "int8"]
+
+# Runs in a fresh interpreter per precision so load time and RSS are the model's own
+CHILD = """
+import json, resource, sys, time
+from benchmarks.bench_quantized_model import encode_latency
+import startup
+precision, threads, batches, iterations = sys.argv[1], int(sys.argv[2]) or None, json.loads(sys.argv[3]), int(sys.argv[4])
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+model = startup.load_sentence_model(precision, threads)
+load = time.perf_counter() - start
+loaded = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+result = {"load_s": load, "batches": {str(b): encode_latency(model, b, iterations) for b in batches}}
+scale = 1 if sys.platform == "darwin" else 1024
+result["model_rss_mb"] = (loaded - before) * scale / 2 ** 20
+result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2 ** 20
+print(json.dumps(result))
+"""
+
+
+def encode_latency(model, batch, iterations):
+    rng = random.Random(batch)
+    model.encode([make_sentence(rng) for _ in range(batch)])  # warm-up
+    times = []
+    for _ in range(iterations):
+        texts = [make_sentence(rng) for _ in range(batch)]
+        start = time.perf_counter()
+        model.encode(texts)
+        times.append(time.perf_counter() - start)
+    p50, p95 = np.percentile(times, [50, 95])
+    return {"p50_ms": p50 * 1e3, "p95_ms": p95 * 1e3, "texts_per_s": batch / np.mean(times)}
+
+
+def run_mode(precision, args):
+    out = subprocess.run([sys.executable, "-c", CHILD, precision, str(args.threads or 0), json.dumps(args.batches),
+                          str(args.iterations)], capture_output=True, text=True)
+    if out.returncode != 0:
+        return {"error": (out.stderr.strip().splitlines() or ["no output"])[-1]}
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentence-BERT encode latency and RSS, float32 vs int8")
+    parser.add_argument("--batches", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads (default: torch's own)")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    results = {precision: run_mode(precision, args) for precision in PRECISIONS}
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'precision':<9} {'load s':>7} {'model MB':>9} {'peak MB':>8} " +
+          " ".join(f"{f'b={b} p50 ms':>12} {f'b={b} p95 ms':>12} {f'b={b} txt/s':>11}" for b in args.batches))
+    for precision, result in results.items():
+        if "error" in result:
+            print(f"{precision:<9} failed: {result['error']}")
+            continue
+        row = f"{precision:<9} {result['load_s']:>7.2f} {result['model_rss_mb']:>9.0f} {result['peak_rss_mb']:>8.0f} "
+        row += " ".join(f"{r['p50_ms']:>12.2f} {r['p95_ms']:>12.2f} {r['texts_per_s']:>11.0f}"
+                        for r in (result["batches"][str(b)] for b in args.batches))
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
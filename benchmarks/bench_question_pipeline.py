@@ -0,0 +1,87 @@
+import argparse
+import random
+import string
+import time
+
+import numpy as np
+import requests
+
+from benchmarks.fake_services import FakeDatamuse
+from question_pipeline import QuestionPipeline
+
+
+# Before: one question at a time, a fresh connection per request
+def sequential_question(api_url):
+    for _ in range(10):
+        letter = random.choice(string.ascii_lowercase)
+        resp = requests.get(api_url, params={"sp": f"{letter}*", "max": 50}, timeout=10)
+        if resp.status_code != 200 or not resp.json():
+            continue
+        word = random.choice(resp.json())["word"]
+        syn_resp = requests.get(api_url, params={"rel_syn": word, "max": 10}, timeout=10)
+        if syn_resp.status_code == 200 and syn_resp.json():
+            return word
+    return None
+
+
+def sequential_quiz(api_url, amount):
+    start = time.perf_counter()
+    questions, first, attempts = [], None, 0
+    while len(questions) < amount and attempts < amount * 5:
+        question = sequential_question(api_url)
+        attempts += 1
+        if question:
+            questions.append(question)
+            first = first or time.perf_counter() - start
+    return first, time.perf_counter() - start, len(questions)
+
+
+def pipeline_quiz(pipeline, amount):
+    stream = pipeline.quiz(amount)
+    questions = stream.wait()
+    return stream.first_ready, time.perf_counter() - stream.started, len(questions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synonym quiz generation: sequential Datamuse calls vs the async pipeline")
+    parser.add_argument("--questions", type=int, nargs="+", default=[5, 10])
+    parser.add_argument("--latency", type=float, default=0.08, help="stand-in Datamuse latency per request (s)")
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with FakeDatamuse(latency=args.latency, failure_rate=args.failure_rate) as datamuse:
+        print(f"Datamuse stand-in: {args.latency * 1000:.0f} ms per request, {args.failure_rate:.0%} failures")
+        print("(the sequential page showed question 1 only once every question was made: its 'all s')")
+        print(f"{'path':<22} {'questions':>9} {'first s':>8} {'all s':>7} {'made':>5}")
+        for amount in args.questions:
+            cold = []
+            for _ in range(args.repeat):
+                pipeline = QuestionPipeline(datamuse.api_url)  # nothing cached, new connections
+                cold.append(pipeline_quiz(pipeline, amount))
+                pipeline.close()
+            pipeline = QuestionPipeline(datamuse.api_url)
+            pipeline_quiz(pipeline, amount)
+            warm = [pipeline_quiz(pipeline, amount) for _ in range(args.repeat)]
+            # Look-ahead: the next quiz was started while the current one was played
+            ahead = []
+            for _ in range(args.repeat):
+                stream = pipeline.quiz(amount)
+                stream.wait()
+                start = time.perf_counter()
+                stream.get(0)
+                ahead.append((time.perf_counter() - start, time.perf_counter() - start, len(stream.questions)))
+            pipeline.close()
+            rows = [
+                ("sequential", [sequential_quiz(datamuse.api_url, amount) for _ in range(args.repeat)]),
+                ("pipeline, cold", cold),
+                ("pipeline, warm", warm),
+                ("pipeline, look-ahead", ahead),
+            ]
+            for name, runs in rows:
+                first, total, made = np.median(np.array(runs, dtype=float), axis=0)
+                print(f"{name:<22} {amount:>9} {first:>8.3f} {total:>7.3f} {made:>5.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import argparse
+import os
+import tempfile
+import time
+
+import nltk
+
+from benchmarks.fake_services import FakeWikipedia
+from sentence_reservoir import SentenceReservoir, make_session
+
+
+# Old behaviour: one random article per round-trip, fetched serially on the click
+def serial_fetch(session, api_url, num_sentences):
+    sentences = []
+    while len(sentences) < num_sentences:
+        resp = session.get(api_url, params={
+            "action": "query", "format": "json", "generator": "random", "grnlimit": 1,
+            "prop": "extracts", "exintro": 1, "explaintext": 1, "exsentences": 5,
+        })
+        if resp.status_code != 200:
+            continue
+        for page in resp.json()["query"]["pages"].values():
+            sentences.extend(nltk.tokenize.sent_tokenize(page["extract"]))
+    return sentences[:num_sentences]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time-to-first-sentence: serial fetch vs reservoir")
+    parser.add_argument("--sentences", type=int, default=10)
+    parser.add_argument("--clicks", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--failure-rate", type=float, default=0.1)
+    args = parser.parse_args()
+
+    with FakeWikipedia(latency=args.latency, failure_rate=args.failure_rate) as wiki:
+        session = make_session(1)
+        start = time.perf_counter()
+        for _ in range(3):
+            serial_fetch(session, wiki.api_url, args.sentences)
+        serial = (time.perf_counter() - start) / 3
+        print(f"serial fetch:      {serial * 1000:8.1f} ms per click")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            spill_path = os.path.join(tmp, "spill.json")
+            reservoir = SentenceReservoir(api_url=wiki.api_url, backoff=0.05, spill_path=spill_path).start()
+            reservoir.pop(reservoir.low_water, timeout=60)
+
+            waits = []
+            for _ in range(args.clicks):
+                start = time.perf_counter()
+                got = reservoir.pop(args.sentences)
+                waits.append(time.perf_counter() - start)
+                assert len(got) == args.sentences
+            waits.sort()
+            print(f"reservoir pop:     {waits[len(waits) // 2] * 1000:8.3f} ms p50, "
+                  f"{waits[-1] * 1000:8.3f} ms max over {args.clicks} clicks")
+            print(f"reservoir stats:   {reservoir.stats}")
+            reservoir.stop()
+
+            warm = SentenceReservoir(api_url="http://127.0.0.1:9/unreachable", spill_path=spill_path)
+            start = time.perf_counter()
+            got = warm.pop(args.sentences, timeout=0)
+            print(f"cold restart pop:  {(time.perf_counter() - start) * 1000:8.3f} ms "
+                  f"({len(got)} sentences from spill, {len(warm)} left)")
+
+
+if __name__ == "__main__":
+    main()
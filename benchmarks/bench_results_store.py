@@ -0,0 +1,104 @@
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+import numpy as np
+
+from results_store import ResultsStore
+
+PAGES = ("fluency", "emotion", "single_word", "sentence")
+
+
+def make_attempts(rng, count, learners, words, days):
+    now = time.time()
+    for i in range(count):
+        # One heavy learner holds a tenth of the history, the rest share it evenly
+        learner = "heavy" if rng.random() < 0.1 else f"learner{rng.randrange(learners)}"
+        page = rng.choice(PAGES)
+        yield dict(learner=learner, page=page, item=f"item {i % 997}", answer="some answer",
+                   accuracy=rng.random(), wpm=rng.uniform(60, 180) if page != "single_word" else None,
+                   points=rng.choice((0, 3, 5, 8, 10, 15)) if page == "single_word" else None,
+                   errors=rng.sample(words, rng.randrange(3)), ts=now - rng.random() * days * 86400)
+
+
+# Before: every figure recomputed from the full attempt log
+def rescan(path, learner):
+    db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    db.execute("SELECT page, COUNT(*), AVG(accuracy), AVG(wpm), SUM(points) FROM attempts WHERE learner = ? "
+               "GROUP BY page", (learner,)).fetchall()
+    db.execute("SELECT date(ts, 'unixepoch', 'localtime') AS day, page, COUNT(*), AVG(accuracy) FROM attempts "
+               "WHERE learner = ? AND ts > ? GROUP BY day, page", (learner, time.time() - 30 * 86400)).fetchall()
+    db.close()
+
+
+def progress(store, learner):
+    store.totals(learner)
+    store.daily(learner)
+    store.top_errors(learner)
+    store.recent(learner)
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return np.percentile(times, 50) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Results store: batched writes and progress reads at scale")
+    parser.add_argument("--attempts", type=int, default=1_000_000)
+    parser.add_argument("--learners", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--direct", type=int, default=2000, help="attempts for the commit-per-attempt baseline")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    words = [f"word{i}" for i in range(5000)]
+    with tempfile.TemporaryDirectory() as workdir:
+        # Before: one transaction per answer, on the request thread
+        direct = ResultsStore(os.path.join(workdir, "direct.db"), flush_interval=3600)
+        start = time.perf_counter()
+        for attempt in make_attempts(rng, args.direct, args.learners, words, args.days):
+            direct.record(**attempt)
+            direct.flush()
+        direct_rate = args.direct / (time.perf_counter() - start)
+        direct.close()
+
+        path = os.path.join(workdir, "results.db")
+        store = ResultsStore(path)
+        attempts = list(make_attempts(rng, args.attempts, args.learners, words, args.days))
+        start = time.perf_counter()
+        for attempt in attempts:
+            store.record(**attempt)
+        record_s = time.perf_counter() - start
+        store.flush()
+        total_s = time.perf_counter() - start
+        stats = dict(store.stats)
+        size_mb = sum(os.path.getsize(os.path.join(workdir, f)) for f in os.listdir(workdir)
+                      if f.startswith("results.db")) / 2 ** 20
+
+        rows = {learner: store._reader().execute("SELECT COUNT(*) FROM attempts WHERE learner = ?",
+                                                 (learner,)).fetchone()[0] for learner in ("heavy", "learner1")}
+        reads = [(learner, timed(lambda: progress(store, learner), 50), timed(lambda: rescan(path, learner), 5))
+                 for learner in rows]
+        store.close()
+
+    print(f"{args.attempts} attempts, {args.learners + 1} learners, {args.days} days")
+    print(f"commit per attempt:   {direct_rate:>9.0f} attempts/s")
+    print(f"batched writer:       {args.attempts / total_s:>9.0f} attempts/s "
+          f"({stats['batches']} batches, {stats['flush_seconds'] / max(stats['batches'], 1) * 1000:.1f} ms each)")
+    print(f"record() on the request thread: {record_s / args.attempts * 1e6:.2f} us per attempt")
+    print(f"database: {size_mb:.0f} MB")
+    print(f"{'learner':<10} {'attempts':>9} {'progress page ms':>17} {'rescan ms':>10}")
+    for learner, fast, slow in reads:
+        print(f"{learner:<10} {rows[learner]:>9} {fast:>17.2f} {slow:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import tempfile
+import time
+
+import nltk
+import numpy as np
+
+from benchmarks.bench_emotion_scorer import load_corpus
+from emotion_scorer import EMOTIONS, EmotionScorer
+from sentence_index import build, gutenberg_sentences, speaking_time
+
+
+# Before: generate word sequences, score them, and keep drawing until n match the filter
+def generate_matching(corpus, scorer, n, emotion, max_time, rng, batch=50, max_rounds=200):
+    found = []
+    for _ in range(max_rounds):
+        ids, offsets = corpus.sample(batch, rng)
+        sentences = corpus.render(ids, offsets)
+        labels = scorer.score_batch(ids, offsets, sentences)
+        for sentence, label in zip(sentences, labels):
+            if (emotion is None or label == emotion) and speaking_time(len(nltk.word_tokenize(sentence))) <= max_time:
+                found.append(sentence)
+        if len(found) >= n:
+            return found[:n]
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Emotion practice sentences: generate and filter vs the sentence index")
+    parser.add_argument("--sentences", type=int, default=10, help="sentences per practice session")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--synthetic", type=int, default=20000, help="index size when Gutenberg is not installed")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    scorer = EmotionScorer(corpus.vocab)
+    rng = np.random.default_rng(0)
+    try:
+        source = list(gutenberg_sentences())
+    except LookupError:
+        # Word mixes of sentence-like lengths stand in for Austen
+        source = [s.replace(" ,", ",") for s in corpus.render(*corpus.sample(args.synthetic, rng, 4, 30))]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        start = time.perf_counter()
+        index = build(source, workdir)
+        build_s = time.perf_counter() - start
+        print(f"index: {len(index)} sentences built in {build_s:.1f} s; per emotion {index.meta['per_emotion']}")
+
+        print(f"{'filter':<22} {'generate+filter ms':>19} {'matched':>8} {'index ms':>9} {'matched':>8}")
+        for emotion, max_time in [(None, 15.0), (EMOTIONS[4], 5.0), (EMOTIONS[0], 3.0), (EMOTIONS[3], 15.0)]:
+            start = time.perf_counter()
+            old = [len(generate_matching(corpus, scorer, args.sentences, emotion, max_time, rng)) for _ in range(5)]
+            old_ms = (time.perf_counter() - start) / 5 * 1000
+            start = time.perf_counter()
+            new = [len(index.sample(args.sentences, [emotion] if emotion else None, max_time, rng))
+                   for _ in range(args.requests)]
+            new_ms = (time.perf_counter() - start) / args.requests * 1000
+            label = f"{emotion or 'any'} <= {max_time:g} s"
+            print(f"{label:<22} {old_ms:>19.1f} {np.mean(old):>8.1f} {new_ms:>9.3f} {np.mean(new):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import argparse
+import random
+import tempfile
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.bench_emotion_scorer import load_corpus
+from practice_session import PracticeSession, SCORED
+from question_pipeline import QuizStream
+from sentence_index import build
+from session_memory import measure
+from synonym_bank import SynonymBank
+
+
+# Before: a dict-backed task holding its own copy of the sentence
+class DictTask:
+    def __init__(self, sentence, emotion, allowed_time):
+        self.sentence = sentence
+        self.emotion = emotion
+        self.allowed_time = allowed_time
+        self.state = SCORED
+        self.text = None
+        self.speaking_time = None
+        self.partial = None
+        self.future = None
+        self.attempts = 0
+
+
+# Before: bank questions as dicts with every synonym copied out, answers written into them
+def dict_question(bank, headword, rng):
+    start, end = bank.syn_offsets[headword], bank.syn_offsets[headword + 1]
+    word = bank.words[headword]
+    return {"question": f"What is another word for '{word}'?",
+            "answer": bank.words[bank.syn_ids[rng.randrange(start, end)]].lower(), "word": word,
+            "synonyms": [bank.words[j] for j in bank.syn_ids[start:end]]}
+
+
+def emotion_before(index, n, rng):
+    tasks = [DictTask(*item) for item in index.sample(n, rng=rng)]
+    for task in tasks:
+        task.text, task.speaking_time = task.sentence.lower(), 3.2
+    return {"practice": tasks, "current_sentence": tasks[-1].sentence, "last_pronounced": tasks[-1].sentence}
+
+
+def emotion_after(index, n, rng):
+    practice = PracticeSession(index.sample_rows(n, rng=rng), None, texts=index.text)
+    for task in practice.tasks:
+        task.state, task.text, task.speaking_time = SCORED, task.sentence.lower(), 3.2
+    return {"practice": practice}
+
+
+def quiz_before(bank, n, rng):
+    picks = [rng.randrange(len(bank.headwords)) for _ in range(2 * n)]
+    quiz = QuizStream.ready([dict_question(bank, bank.headwords[i], rng) for i in picks[:n]])
+    for question in quiz.questions:
+        question.update(user_answer=question["answer"].upper().lower(), relevance=87.5, points=10)
+    next_quiz = QuizStream.ready([dict_question(bank, bank.headwords[i], rng) for i in picks[n:]])
+    return {"questions": quiz.questions, "quiz": quiz, "next_quiz": next_quiz}
+
+
+def quiz_after(bank, n, rng):
+    quiz = QuizStream.ready(bank.questions(n, seed=rng.random()))
+    answers = [(question.answer.upper().lower(), 87.5, 10) for question in quiz.questions]
+    return {"questions": quiz.questions, "quiz": quiz, "next_quiz": None, "answers": answers}
+
+
+def synthetic_bank(rng, headwords=20000, vocab=60000):
+    words = [f"w{i}{''.join(rng.choices('abcdefghij', k=4))}" for i in range(vocab)]
+    return SynonymBank.from_pairs({words[i]: rng.sample(words, rng.randint(2, 12)) for i in range(headwords)})
+
+
+def allocated(make, count):
+    tracemalloc.start()
+    sessions = [make() for _ in range(count)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del sessions
+    return size / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Session state bytes: copied strings and dicts vs slotted records of shared ids")
+    parser.add_argument("--sentences", type=int, default=10, help="emotion practice sentences per session")
+    parser.add_argument("--questions", type=int, default=10, help="quiz questions per session")
+    parser.add_argument("--sessions", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    bank = synthetic_bank(rng)
+    corpus = load_corpus()
+    source = [s.replace(" ,", ",") for s in corpus.render(*corpus.sample(5000, np.random.default_rng(0), 4, 30))]
+    with tempfile.TemporaryDirectory() as workdir:
+        index = build(source, workdir)
+        shared = set()
+        measure([bank, index], seen=shared)
+
+        print(f"{args.sentences} emotion sentences, {args.questions} quiz questions, {args.sessions} sessions")
+        print(f"{'page state':<16} {'before B':>9} {'after B':>8} {'before MB':>10} {'after MB':>9} {'saved':>6}")
+        for name, before, after, shared_with, n, page_rng in [
+            ("emotion", emotion_before, emotion_after, index, args.sentences, np.random.default_rng(1)),
+            ("synonym quiz", quiz_before, quiz_after, bank, args.questions, rng),
+        ]:
+            old = np.median([measure([before(shared_with, n, page_rng)], exclude=shared)[0] for _ in range(50)])
+            new = np.median([measure([after(shared_with, n, page_rng)], exclude=shared)[0] for _ in range(50)])
+            old_mb = allocated(lambda: before(shared_with, n, page_rng), args.sessions) * args.sessions / 2 ** 20
+            new_mb = allocated(lambda: after(shared_with, n, page_rng), args.sessions) * args.sessions / 2 ** 20
+            print(f"{name:<16} {old:>9.0f} {new:>8.0f} {old_mb:>10.2f} {new_mb:>9.2f} {1 - new_mb / old_mb:>6.0%}")
+        print("(B: measured per session, shared bank and index excluded; MB: allocated for all sessions, tracemalloc)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import functools
+import os
+import threading
+import time
+
+import numpy as np
+
+import speech_upload
+from alignment import align
+from benchmarks.fixtures import ensure_fixtures
+from speech_stream import OfflineBackend
+from speech_upload import PoolBusy, RecognitionPool
+
+
+# Closed loop: every session records, waits for its score, then records the next answer
+def run_sessions(sessions, answers, answer_fn):
+    latencies, rejected = [], [0]
+    lock = threading.Lock()
+
+    def session():
+        for _ in range(answers):
+            start = time.perf_counter()
+            try:
+                answer_fn()
+            except PoolBusy:
+                with lock:
+                    rejected[0] += 1
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=session) for _ in range(sessions)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, rejected[0], time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Uploaded answers: in-process threads vs the recognition process pool")
+    parser.add_argument("--sessions", type=int, default=8, help="concurrent users")
+    parser.add_argument("--answers", type=int, default=10, help="answers per user")
+    parser.add_argument("--cpu-cost", type=float, default=0.05, help="stand-in recognizer CPU time per answer (s)")
+    parser.add_argument("--workers", type=int, nargs="*", help="pool sizes (default 1 2 4 and the CPU count)")
+    args = parser.parse_args()
+
+    path = ensure_fixtures()["sentence"]
+    with open(path, "rb") as f:
+        audio = f.read()
+    with open(os.path.splitext(path)[0] + ".txt", encoding="utf-8") as f:
+        reference = f.read().strip()
+    factory = functools.partial(OfflineBackend.for_wav, path, cpu_cost=args.cpu_cost)
+    workers = args.workers or sorted({1, 2, 4, os.cpu_count() or 1})
+
+    runs = []
+    # Before: every session thread decodes, recognizes and aligns in the server process
+    speech_upload._init_worker(factory)
+    runs.append(("threads", *run_sessions(args.sessions, args.answers,
+                                          lambda: speech_upload._process(audio, align, (reference,)))))
+    for n in workers:
+        pool = RecognitionPool(workers=n, backend_factory=factory).warm_up()
+        label = f"pool x{n}"
+        runs.append((label, *run_sessions(args.sessions, args.answers,
+                                          lambda: pool.recognize(audio, align, (reference,)))))
+        pool.close()
+
+    print(f"{args.sessions} sessions x {args.answers} answers, {args.cpu_cost * 1000:.0f} ms recognizer CPU per answer, "
+          f"{os.cpu_count()} CPUs")
+    print(f"{'backend':<10} {'answers/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'rejected':>9}")
+    for label, latencies, rejected, elapsed in runs:
+        p50, p95 = np.percentile(latencies, [50, 95]) * 1000 if latencies else (float("nan"),) * 2
+        print(f"{label:<10} {len(latencies) / elapsed:>10.1f} {p50:>8.0f} {p95:>8.0f} {rejected:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import argparse
+import time
+
+import speech_recognition as sr
+
+from benchmarks.fixtures import ensure_fixtures
+from speech_stream import OfflineBackend, WavFileSource, capture_and_recognize
+
+
+# Old path: Recognizer.listen() until pause_threshold of silence, then one blocking recognize call
+def blocking_listen(path, backend):
+    recognizer = sr.Recognizer()
+    with sr.AudioFile(path) as source:
+        start = time.perf_counter()
+        audio = recognizer.listen(source)
+        listened = time.perf_counter()
+    backend.start(audio.sample_rate)
+    text = backend.finish()
+    return text, recognizer.pause_threshold + time.perf_counter() - listened, listened - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-of-speech to result latency: streaming vs blocking listen")
+    parser.add_argument("--latency", type=float, default=0.3, help="stand-in recognizer latency (s)")
+    parser.add_argument("--realtime", action="store_true", help="pace WAV frames like a live microphone")
+    args = parser.parse_args()
+
+    print(f"{'fixture':<14} {'path':<10} {'first partial s':>15} {'endpoint s':>10} {'eos->text s':>11}  text ok")
+    for name, path in ensure_fixtures().items():
+        text, eos_latency, _ = blocking_listen(path, OfflineBackend.for_wav(path, latency=args.latency))
+        print(f"{name:<14} {'blocking':<10} {'-':>15} {'-':>10} {eos_latency:>11.3f}  {bool(text)}")
+
+        partial_times = []
+        start = time.perf_counter()
+        with WavFileSource(path, realtime=args.realtime) as source:
+            utterance = capture_and_recognize(source, OfflineBackend.for_wav(path, latency=args.latency),
+                                              on_partial=lambda text: partial_times.append(time.perf_counter()))
+        first = partial_times[0] - start if partial_times else float("nan")
+        print(f"{name:<14} {'streaming':<10} {first:>15.3f} {utterance.endpoint_delay:>10.3f} "
+              f"{utterance.latency:>11.3f}  {bool(utterance.text)}"
+              f"  ({utterance.speech_start:.2f}-{utterance.speech_end:.2f} s, {len(utterance.partials)} partials)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import json
+import subprocess
+import sys
+
+PAGES = [
+    "fluency_practice.py",
+    "emotion_based_speaking.py",
+    "single_word_spark.py",
+    "sentence_speech_challenge.py",
+]
+
+# Runs in a fresh interpreter so every page pays its own cold imports
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+if sys.argv[2] == "warm":
+    import startup
+    startup.warm_up()
+    for name in startup.LOADERS:
+        try:
+            startup.get(name)
+        except Exception:
+            pass
+ready = time.perf_counter()
+app = AppTest.from_file(sys.argv[1], default_timeout=300)
+app.run()
+first = time.perf_counter()
+app.run()
+rerun = time.perf_counter()
+print(json.dumps({
+    "setup_s": ready - start,
+    "first_paint_s": first - ready,
+    "rerun_s": rerun - first,
+    "errors": [" ".join(str(e.value).split())[:120] for e in app.exception],
+}))
+"""
+
+
+def run_page(page, mode):
+    out = subprocess.run([sys.executable, "-c", CHILD, page, mode], capture_output=True, text=True)
+    if out.returncode != 0:
+        return {"errors": [out.stderr.strip().splitlines()[-1]]}
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold import/first-paint and rerun time per page")
+    parser.add_argument("--pages", nargs="+", default=PAGES)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    results = {}
+    for page in args.pages:
+        # cold: nothing loaded yet; warm: app.py's warm_up() already finished
+        results[page] = {mode: run_page(page, mode) for mode in ("cold", "warm")}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'page':<30} {'cold paint s':>12} {'warm paint s':>12} {'rerun s':>8}")
+    for page, modes in results.items():
+        cold, warm = modes["cold"], modes["warm"]
+        print(f"{page:<30} {cold.get('first_paint_s', float('nan')):>12.2f} "
+              f"{warm.get('first_paint_s', float('nan')):>12.2f} {cold.get('rerun_s', float('nan')):>8.3f}")
+        for error in cold["errors"] + warm["errors"]:
+            print(f"    error: {error}")
+
+
+if __name__ == "__main__":
+    main()
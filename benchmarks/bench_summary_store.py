@@ -0,0 +1,82 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+import requests
+
+from benchmarks.fake_services import LOREM_WORDS, FakeWikipedia, make_sentence
+from summary_store import SummaryStore, build_from_jsonl
+
+
+# Old path: a fresh client and a network round trip for every rerun of the page
+def api_fetch(api_url, topic):
+    params = {"action": "query", "format": "json", "prop": "extracts", "exintro": 1,
+              "explaintext": 1, "redirects": 1, "titles": topic}
+    resp = requests.get(api_url, params=params, timeout=10)
+    pages = resp.json()["query"]["pages"]
+    return next(iter(pages.values())).get("extract")
+
+
+def make_dump(path, count, rng):
+    titles = set()
+    while len(titles) < count:
+        titles.add(" ".join(rng.choice(LOREM_WORDS) for _ in range(rng.randint(1, 4))).title() + f" {rng.randrange(10 ** 4)}")
+    titles = sorted(titles)
+    with open(path, "w", encoding="utf-8") as f:
+        for title in titles:
+            summary = " ".join(make_sentence(rng) for _ in range(rng.randint(4, 8)))
+            f.write(json.dumps({"title": title, "summary": summary, "views": rng.randrange(10 ** 6)}) + "\n")
+    return titles
+
+
+def timed(fn, items):
+    times = []
+    for item in items:
+        start = time.perf_counter()
+        fn(item)
+        times.append(time.perf_counter() - start)
+    return np.array(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Topic lookup and typeahead: live API vs memory-mapped store")
+    parser.add_argument("--titles", type=int, default=200000)
+    parser.add_argument("--lookups", type=int, default=5000)
+    parser.add_argument("--api-lookups", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="Wikipedia stand-in latency (s)")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as workdir, FakeWikipedia(latency=args.latency) as wiki:
+        dump = os.path.join(workdir, "dump.jsonl")
+        titles = make_dump(dump, args.titles, rng)
+        start = time.perf_counter()
+        build_from_jsonl([dump], os.path.join(workdir, "store"))
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        store = SummaryStore(os.path.join(workdir, "store"))
+        opened = time.perf_counter() - start
+        topics = [rng.choice(titles) for _ in range(args.lookups)]
+        prefixes = [t[:rng.randint(1, 6)].lower() for t in topics]
+
+        results = {
+            "api fetch": timed(lambda t: api_fetch(wiki.api_url, t), topics[:args.api_lookups]),
+            "store get": timed(store.get, topics),
+            "store suggest": timed(store.suggest, prefixes),
+        }
+        size = sum(os.path.getsize(os.path.join(workdir, "store", name)) for name in os.listdir(os.path.join(workdir, "store")))
+
+    print(f"{args.titles} titles, {size / 2 ** 20:.1f} MB on disk, built in {build:.1f} s, opened in {opened * 1e3:.2f} ms")
+    print(f"{'path':<14} {'p50 us':>10} {'p95 us':>10} {'p99 us':>10}")
+    for name, times in results.items():
+        p50, p95, p99 = np.percentile(times, [50, 95, 99]) * 1e6
+        print(f"{name:<14} {p50:>10.1f} {p95:>10.1f} {p99:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
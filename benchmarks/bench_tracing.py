@@ -0,0 +1,77 @@
+import argparse
+import threading
+import time
+
+import tracing
+from benchmarks.fake_services import FakeSentenceModel, FakeWikipedia
+from sentence_reservoir import make_session
+
+
+def per_call(fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n
+
+
+def traced_version(fn, stage):
+    def wrapper():
+        with tracing.span(stage):
+            fn()
+    return wrapper
+
+
+# Overhead of a span relative to the stage it wraps; each pair is interleaved and the
+# best of several rounds is kept so scheduler noise does not dominate
+def compare(name, fn, n, rounds):
+    traced = traced_version(fn, f"bench_{name}")
+    plain_s = min(per_call(fn, n) for _ in range(rounds))
+    traced_s = min(per_call(traced, n) for _ in range(rounds))
+    return {"stage": name, "plain_us": plain_s * 1e6, "traced_us": traced_s * 1e6,
+            "overhead_pct": (traced_s - plain_s) / plain_s * 100}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Span overhead per stage (target: < 1% of the stage it wraps)")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=4, help="concurrent spans on one stage for the contention row")
+    args = parser.parse_args()
+
+    model = FakeSentenceModel(call_cost=0.004, text_cost=0.0005)
+    session = make_session(1)
+    with FakeWikipedia() as wiki:
+        rows = [
+            # Wikipedia/Datamuse-style round-trip to the local stand-in
+            compare("http_local", lambda: session.get(wiki.api_url, params={"action": "query"}), 200, args.rounds),
+            compare("encode", lambda: model.encode(["a fresh answer", "another guess"]), 50, args.rounds),
+            compare("recognize", lambda: time.sleep(0.05), 10, args.rounds),
+        ]
+
+    empty = min(per_call(traced_version(lambda: None, "bench_empty"), 100000) for _ in range(args.rounds))
+
+    # Many sessions recording into one histogram at once
+    def hammer():
+        span = tracing.span
+        for _ in range(50000):
+            with span("bench_contended"):
+                pass
+    threads = [threading.Thread(target=hammer) for _ in range(args.threads)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    contended = (time.perf_counter() - start) / (50000 * args.threads)
+
+    # "measured" is traced vs plain wall time (noisy); "span cost" is the empty-span time over the stage time
+    print(f"{'stage':<18} {'plain us':>10} {'traced us':>10} {'measured':>9} {'span cost':>10}")
+    for row in rows:
+        print(f"{row['stage']:<18} {row['plain_us']:>10.1f} {row['traced_us']:>10.1f} {row['overhead_pct']:>8.2f}% "
+              f"{empty * 1e6 / row['plain_us'] * 100:>9.3f}%")
+    print(f"empty span: {empty * 1e6:.2f} us, {args.threads} threads on one stage: {contended * 1e6:.2f} us per span")
+    stats = tracing.snapshot()["bench_encode"]
+    print(f"encode p50/p95/p99 ms: {stats['p50_s'] * 1e3:.2f} / {stats['p95_s'] * 1e3:.2f} / {stats['p99_s'] * 1e3:.2f}")
+
+
+if __name__ == "__main__":
+    main()
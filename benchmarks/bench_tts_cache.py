@@ -0,0 +1,74 @@
+import argparse
+import io
+import random
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.fake_services import FakeTTS, make_sentence
+from tts_cache import GTTSSynthesizer, TTSCache
+
+
+# Sessions clicking "Pronounce" on sentences drawn from a shared practice pool
+def simulate(pronounce, sessions, clicks, pool, seed):
+    latencies = []
+    lock = threading.Lock()
+
+    def session(i):
+        rng = random.Random(seed * 1000 + i)
+        for _ in range(clicks):
+            start = time.perf_counter()
+            pronounce(rng.choice(pool))
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pronounce latency: synthesize per click vs TTS cache")
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--clicks", type=int, default=20)
+    parser.add_argument("--pool", type=int, default=40, help="distinct sentences shared by the sessions")
+    parser.add_argument("--latency", type=float, default=0.2, help="stand-in synthesis latency (s)")
+    args = parser.parse_args()
+
+    FakeTTS.latency = args.latency
+    rng = random.Random(0)
+    pool = [make_sentence(rng) for _ in range(args.pool)]
+
+    def per_click(text):
+        buffer = io.BytesIO()
+        FakeTTS(text=text, lang="en").write_to_fp(buffer)
+        return buffer.getvalue()
+
+    print(f"{'path':<10} {'total s':>8} {'p50 ms':>8} {'p95 ms':>8}  stats")
+    total, latencies = simulate(per_click, args.sessions, args.clicks, pool, seed=1)
+    print(f"{'per click':<10} {total:>8.2f} {np.percentile(latencies, 50) * 1e3:>8.1f} "
+          f"{np.percentile(latencies, 95) * 1e3:>8.1f}  synth calls: {len(latencies)}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TTSCache(GTTSSynthesizer(FakeTTS), cache_dir=tmp)
+        total, latencies = simulate(cache.get, args.sessions, args.clicks, pool, seed=1)
+        print(f"{'cached':<10} {total:>8.2f} {np.percentile(latencies, 50) * 1e3:>8.1f} "
+              f"{np.percentile(latencies, 95) * 1e3:>8.1f}  {cache.stats}")
+        cache.close()
+
+        # Restart: a fresh process finds every sentence in the disk tier
+        cache = TTSCache(GTTSSynthesizer(FakeTTS), cache_dir=tmp)
+        total, latencies = simulate(cache.get, args.sessions, args.clicks, pool, seed=2)
+        print(f"{'restart':<10} {total:>8.2f} {np.percentile(latencies, 50) * 1e3:>8.1f} "
+              f"{np.percentile(latencies, 95) * 1e3:>8.1f}  {cache.stats}")
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
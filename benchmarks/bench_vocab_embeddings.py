@@ -0,0 +1,85 @@
+import argparse
+import os
+import random
+import string
+import tempfile
+import time
+
+from benchmarks.fake_services import FakeSentenceModel
+from speech_coverage import unit_rows
+from embedding_cache import EmbeddingCache
+from synonym_bank import SynonymBank
+from vocab_embeddings import build
+
+
+def make_bank(rng, groups, group_size):
+    synonyms_by_word = {}
+    for _ in range(groups):
+        group = {"".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10))) for _ in range(group_size)}
+        for word in group:
+            synonyms_by_word.setdefault(word, set()).update(group - {word})
+    return SynonymBank.from_pairs(synonyms_by_word)
+
+
+# Before: the transformer on the answer and the one chosen synonym, per answer
+def model_pair(model, question, answer):
+    vectors = unit_rows(model.encode([answer, question.answer]))
+    return float(vectors[1] @ vectors[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synonym answer scoring: model per answer vs vocabulary table")
+    parser.add_argument("--groups", type=int, default=20000, help="synonym groups in the synthetic bank")
+    parser.add_argument("--group-size", type=int, default=4)
+    parser.add_argument("--answers", type=int, default=2000)
+    parser.add_argument("--oov-rate", type=float, default=0.1, help="share of answers outside the vocabulary")
+    parser.add_argument("--call-cost", type=float, default=0.004, help="fake model cost per encode call (s)")
+    parser.add_argument("--text-cost", type=float, default=0.0005, help="fake model cost per text (s)")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    bank = make_bank(rng, args.groups, args.group_size)
+    model = FakeSentenceModel(call_cost=args.call_cost, text_cost=args.text_cost)
+    questions = bank.questions(args.answers, seed=1)
+    answers = [rng.choice(q.synonyms) if rng.random() >= args.oov_rate else f"{rng.choice(q.synonyms)}ish"
+               for q in questions]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        fast = FakeSentenceModel(call_cost=0, text_cost=0)  # the one-off build is timed separately
+        start = time.perf_counter()
+        table = build(bank, fast.encode, "bench", workdir)
+        build_s = time.perf_counter() - start
+        table_mb = os.path.getsize(os.path.join(workdir, "bench", "vectors.npy")) / 2 ** 20
+
+        cache = EmbeddingCache("bench", cache_dir=None, memory_bytes=2 ** 40)
+
+        def cached(question, answer):
+            vectors = unit_rows(cache.encode([answer, question.answer] + question.synonyms, model.encode))
+            return float((vectors[1:] @ vectors[0]).max())
+
+        paths = [
+            ("model, 1 synonym", lambda q, a: model_pair(model, q, a)),
+            ("cache, all synonyms", cached),
+            ("table, all synonyms", lambda q, a: table.best_similarity(a, [q.answer] + q.synonyms, model.encode)),
+        ]
+        rows = []
+        for name, fn in paths:
+            calls = model.calls
+            start = time.perf_counter()
+            for question, answer in zip(questions, answers):
+                fn(question, answer)
+            elapsed = time.perf_counter() - start
+            rows.append((name, len(questions) / elapsed, (model.calls - calls) / len(questions)))
+        # What holding the same vocabulary in the float32 in-memory cache would take
+        cache_mb = cache._memory_used / len(cache._memory) * len(bank.words) / 2 ** 20
+
+    print(f"bank: {len(bank.words)} words, {len(bank)} headwords, {args.oov_rate:.0%} of answers out of vocabulary")
+    print(f"table: {table_mb:.1f} MB float16, memory-mapped and shared by every worker, built in {build_s:.1f} s; "
+          f"the same vocabulary in the in-memory float32 cache: {cache_mb:.1f} MB per process")
+    print(f"{'path':<22} {'answers/s':>10} {'model calls/answer':>19}")
+    for name, rate, calls in rows:
+        print(f"{name:<22} {rate:>10.0f} {calls:>19.2f}")
+
+
+if __name__ == "__main__":
+    main()
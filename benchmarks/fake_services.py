@@ -0,0 +1,202 @@
+import io
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+# Local stand-ins for the external services the pages call, so refill and
+# scoring paths can be exercised and timed without the network.
+
+LOREM_WORDS = (
+    "the river city music history science people language island mountain "
+    "festival garden library village football museum winter summer painter "
+    "engine bridge forest market school ocean planet kingdom theatre railway"
+).split()
+
+
+def make_sentence(rng, min_words=6, max_words=14):
+    words = rng.choices(LOREM_WORDS, k=rng.randint(min_words, max_words))
+    return " ".join(words).capitalize() + "."
+
+
+# Base server: runs on a background thread with injectable latency and failures
+class FakeService:
+    def __init__(self, latency=0.0, failure_rate=0.0, seed=0, host="127.0.0.1", port=0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self._lock = threading.Lock()
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                status, payload = service._dispatch(url.path, params)
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _dispatch(self, path, params):
+        with self._lock:
+            self.requests += 1
+            fail = self.rng.random() < self.failure_rate
+        if self.latency:
+            time.sleep(self.latency)
+        if fail:
+            return 503, {"error": "injected failure"}
+        return self.handle(path, params)
+
+    def handle(self, path, params):
+        return 404, {}
+
+
+# MediaWiki action API: generator=random with intro extracts, or the intro of one title.
+# Titles starting with "Missing" do not exist.
+class FakeWikipedia(FakeService):
+    @property
+    def api_url(self):
+        return f"{self.url}/w/api.php"
+
+    def handle(self, path, params):
+        if path != "/w/api.php":
+            return 404, {}
+        if "titles" in params:
+            return self._summary(params["titles"])
+        if params.get("generator") != "random":
+            return 400, {"error": "unsupported query"}
+        with self._lock:
+            count = int(params.get("grnlimit", 1))
+            num_sentences = int(params.get("exsentences", 5))
+            pages = {}
+            for _ in range(count):
+                page_id = self.rng.randint(1, 10 ** 7)
+                extract = " ".join(make_sentence(self.rng) for _ in range(num_sentences))
+                pages[str(page_id)] = {"pageid": page_id, "ns": 0, "title": f"Page {page_id}", "extract": extract}
+        return 200, {"batchcomplete": "", "query": {"pages": pages}}
+
+    def _summary(self, title):
+        if title.startswith("Missing"):
+            return 200, {"query": {"pages": {"-1": {"ns": 0, "title": title, "missing": ""}}}}
+        rng = random.Random(zlib.crc32(title.encode("utf-8")))
+        page_id = rng.randint(1, 10 ** 7)
+        extract = " ".join(make_sentence(rng) for _ in range(rng.randint(4, 8)))
+        return 200, {"batchcomplete": "", "query": {"pages": {
+            str(page_id): {"pageid": page_id, "ns": 0, "title": title, "extract": extract}}}}
+
+
+# Datamuse /words: sp=<letter>* spelling queries and rel_syn synonym lookups over a
+# fixed synthetic vocabulary; about one word in five has no synonyms
+class FakeDatamuse(FakeService):
+    def __init__(self, vocab_size=2000, **kwargs):
+        super().__init__(**kwargs)
+        rng = random.Random(1)
+        letters = "abcdefghijklmnopqrstuvwxyz"
+        self.vocab = sorted({rng.choice(letters) + "".join(rng.choices(letters, k=rng.randint(3, 8)))
+                             for _ in range(vocab_size)})
+        self.synonyms = {word: rng.sample(self.vocab, rng.randint(1, 6)) if rng.random() > 0.2 else []
+                         for word in self.vocab}
+
+    @property
+    def api_url(self):
+        return f"{self.url}/words"
+
+    def handle(self, path, params):
+        if path != "/words":
+            return 404, {}
+        limit = int(params.get("max", 100))
+        if "rel_syn" in params:
+            words = self.synonyms.get(params["rel_syn"], [])
+        elif params.get("sp", "").endswith("*"):
+            prefix = params["sp"][:-1]
+            words = [w for w in self.vocab if w.startswith(prefix)]
+        else:
+            return 400, {"error": "unsupported query"}
+        return 200, [{"word": w, "score": 1000 - i} for i, w in enumerate(words[:limit])]
+
+
+# gTTS-compatible stand-in: same constructor and write_to_fp()/save(), with a
+# latency per call plus per character and injectable failures
+class FakeTTS:
+    latency = 0.05
+    char_latency = 0.0005
+    failure_rate = 0.0
+    rng = random.Random(0)
+
+    def __init__(self, text, lang="en", **kwargs):
+        self.text = text
+        self.lang = lang
+
+    def write_to_fp(self, fp):
+        time.sleep(self.latency + self.char_latency * len(self.text))
+        if self.rng.random() < self.failure_rate:
+            raise RuntimeError("injected TTS failure")
+        fp.write(b"ID3" + zlib.compress(self.text.encode("utf-8")) * 8)
+
+    def save(self, path):
+        buffer = io.BytesIO()
+        self.write_to_fp(buffer)
+        with open(path, "wb") as f:
+            f.write(buffer.getvalue())
+
+
+# Stand-in for SentenceTransformer: a fixed cost per encode call plus a smaller
+# cost per text, with calls serialized the way torch saturates the CPU
+class FakeSentenceModel:
+    def __init__(self, dim=384, call_cost=0.004, text_cost=0.0005):
+        self.dim = dim
+        self.call_cost = call_cost
+        self.text_cost = text_cost
+        self.calls = 0
+        self.texts = 0
+        self._lock = threading.Lock()
+
+    def encode(self, texts, **kwargs):
+        with self._lock:
+            self.calls += 1
+            self.texts += len(texts)
+            time.sleep(self.call_cost + self.text_cost * len(texts))
+        vectors = np.empty((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            rng = np.random.default_rng(zlib.crc32(text.encode("utf-8")))
+            vectors[i] = rng.standard_normal(self.dim)
+        return vectors
@@ -0,0 +1,55 @@
+import os
+import wave
+
+import numpy as np
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+# Speech-like test audio: low background noise, then syllable-rate modulated bursts
+def synth_speech(speech_seconds, lead_silence=0.6, tail_silence=1.2, sample_rate=16000,
+                 level=3000, noise_level=60, seed=0):
+    rng = np.random.default_rng(seed)
+    total = int((lead_silence + speech_seconds + tail_silence) * sample_rate)
+    audio = rng.normal(0, noise_level, total)
+    start = int(lead_silence * sample_rate)
+    t = np.arange(int(speech_seconds * sample_rate)) / sample_rate
+    envelope = 0.55 + 0.45 * np.sin(2 * np.pi * 4 * t)  # ~4 syllables per second
+    voice = np.sin(2 * np.pi * 180 * t) + 0.5 * np.sin(2 * np.pi * 360 * t) + 0.3 * rng.normal(0, 1, len(t))
+    audio[start:start + len(t)] += level * envelope * voice / 1.8
+    return np.clip(audio, -32768, 32767).astype(np.int16)
+
+
+def write_wav(path, samples, sample_rate=16000):
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(samples.tobytes())
+
+
+# A WAV plus the sidecar transcript OfflineBackend.for_wav() reads
+def write_utterance(path, transcript, words_per_second=2.5, **kwargs):
+    write_wav(path, synth_speech(max(len(transcript.split()) / words_per_second, 0.5), **kwargs))
+    with open(os.path.splitext(path)[0] + ".txt", "w", encoding="utf-8") as f:
+        f.write(transcript)
+    return path
+
+
+DEFAULT_UTTERANCES = {
+    "short_answer": "happy",
+    "sentence": "the quick brown fox jumps over the lazy dog near the river bank",
+    "paragraph": " ".join(["the museum opened its doors to visitors from every part of the city"] * 3),
+}
+
+
+# Generate the standard fixture set (only files that are missing)
+def ensure_fixtures(directory=FIXTURE_DIR):
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for i, (name, transcript) in enumerate(DEFAULT_UTTERANCES.items()):
+        path = os.path.join(directory, f"{name}.wav")
+        if not os.path.exists(path):
+            write_utterance(path, transcript, seed=i)
+        paths[name] = path
+    return paths
@@ -0,0 +1,320 @@
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+# End-to-end load test: drives each page's core functions from N concurrent sessions against
+# local stand-ins for Wikipedia, Datamuse, speech recognition, gTTS and the Sentence-BERT model.
+# Every scenario runs in its own interpreter so peak RSS is per scenario.
+#
+#   python -m benchmarks.load_suite --sessions 8 --answers 10 --out results.json
+#   python -m benchmarks.load_suite --baseline last_release.json
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIOS = ["fluency", "sentence", "single_word", "emotion"]
+TOPICS = ["Solar System", "Jazz", "Photosynthesis", "Roman Empire", "Volcano", "Chess"]
+
+
+def percentiles(values):
+    if not values:
+        return {"count": 0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"count": len(values), "p50_s": p50, "p95_s": p95, "p99_s": p99, "max_s": max(values)}
+
+
+# ---- child side: one scenario in this process ----
+
+def setup_environment(args, workdir):
+    from benchmarks.fake_services import FakeDatamuse, FakeSentenceModel, FakeTTS, FakeWikipedia
+
+    services = [
+        FakeWikipedia(latency=args.http_latency, failure_rate=args.http_failure_rate, seed=1).start(),
+        FakeDatamuse(latency=args.http_latency, failure_rate=args.http_failure_rate, seed=2).start(),
+    ]
+    os.environ["WIKIPEDIA_API_URL"] = services[0].api_url
+    os.environ["DATAMUSE_API_URL"] = services[1].api_url
+    os.environ["MODEL_PRECISION"] = args.precision
+    os.environ.setdefault("MODEL_PARITY_FILE", os.path.join(REPO, ".cache", "model_parity.json"))
+    FakeTTS.latency = args.tts_latency
+    FakeTTS.failure_rate = args.tts_failure_rate
+
+    # Caches, spills and saved audio land in a scratch directory, never in the real .cache/
+    sys.path.insert(0, REPO)
+    os.chdir(workdir)
+
+    import embedding_cache
+    import startup
+    import tts_cache
+    if not args.real_model:
+        startup.LOADERS["minilm"] = lambda: FakeSentenceModel(call_cost=args.encode_cost)
+    embedding_cache.get_cache(startup.MODEL_ID, cache_dir=os.path.join(workdir, "embeddings"))
+    # Both TTS engines synthesize through the gTTS stand-in
+    for engine in tts_cache.SYNTHESIZERS:
+        tts_cache.get_tts(engine, synthesizer=tts_cache.GTTSSynthesizer(FakeTTS), cache_dir=os.path.join(workdir, "tts"))
+    return services
+
+
+def capture(fixture, args, rng):
+    import tracing
+    from speech_stream import OfflineBackend, WavFileSource, capture_and_recognize
+
+    backend = OfflineBackend.for_wav(fixture, latency=args.stt_latency, failure_rate=args.stt_failure_rate,
+                                     seed=rng.random())
+    with tracing.span("capture"):
+        with WavFileSource(fixture, realtime=args.realtime) as source:
+            return capture_and_recognize(source, backend, timeout=10).text
+
+
+# Each scenario returns (start_session, answer): start_session(rng) builds per-session
+# state the way the page does when a session begins, answer(state, rng) is one answer.
+def fluency_scenario(fixtures, args):
+    import fluency_practice as page
+
+    def start_session(rng):
+        sentences = page.get_random_sentences(args.sentences)
+        if not sentences:
+            raise RuntimeError("no sentences from the reservoir")
+        return sentences
+
+    def answer(sentences, rng):
+        sentence = rng.choice(sentences)
+        allowed = page.calculate_speaking_time(sentence)
+        page.pronounce_current_sentence(sentence)
+        said = capture(fixtures["sentence"], args, rng)
+        return allowed, said
+
+    return start_session, answer
+
+
+def sentence_scenario(fixtures, args):
+    import sentence_speech_challenge as page
+
+    def start_session(rng):
+        summary, index = page.load_topic(rng.choice(TOPICS))
+        if not summary:
+            raise RuntimeError("no summary")
+        return summary, index
+
+    def answer(topic, rng):
+        summary, index = topic
+        said = capture(fixtures["paragraph"], args, rng)
+        coverage = page.score_speech(said, page.load_reference_matrix(summary))
+        return coverage.score, page.generate_feedback(said, index), page.improve_speech(said, summary)
+
+    return start_session, answer
+
+
+def single_word_scenario(fixtures, args):
+    import single_word_spark as page
+
+    if args.synonyms == "datamuse":
+        page.question_bank = None  # exercise the Datamuse path instead of the offline bank
+
+    def start_session(rng):
+        questions = page.get_synonym_questions(args.sentences)
+        if not questions:
+            raise RuntimeError("no synonym questions")
+        return questions
+
+    def answer(questions, rng):
+        question = rng.choice(questions)
+        said = capture(fixtures["short_answer"], args, rng).lower()
+        return page.score_relevance(page.check_answer_relevance(said, question))
+
+    return start_session, answer
+
+
+def emotion_scenario(fixtures, args):
+    import emotion_based_speaking as page
+    import streamlit as st
+
+    lock = threading.Lock()  # session_state is a single shared dict outside a real server
+
+    def start_session(rng):
+        with lock:
+            page.run_speaking_practice(args.sentences)
+            return [(t.sentence, t.allowed_time) for t in st.session_state.practice.tasks]
+
+    def answer(sentences, rng):
+        sentence, allowed = rng.choice(sentences)
+        page.pronounce_speech(sentence)
+        said = capture(fixtures["sentence"], args, rng)
+        return page.provide_feedback(len(said.split()) / 3, allowed)
+
+    return start_session, answer
+
+
+SCENARIO_FUNCTIONS = {
+    "fluency": fluency_scenario,
+    "sentence": sentence_scenario,
+    "single_word": single_word_scenario,
+    "emotion": emotion_scenario,
+}
+
+
+def run_scenario(args):
+    from benchmarks.fixtures import ensure_fixtures
+
+    fixtures = ensure_fixtures()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with tempfile.TemporaryDirectory() as workdir:
+        services = setup_environment(args, workdir)
+        import tracing
+        try:
+            start_session, answer = SCENARIO_FUNCTIONS[args.scenario](fixtures, args)
+            tracing.reset()
+
+            session_times, answer_times, errors = [], [], Counter()
+            lock = threading.Lock()
+
+            def session(index):
+                rng = random.Random(args.seed * 1000 + index)
+                try:
+                    t0 = time.perf_counter()
+                    state = start_session(rng)
+                    with lock:
+                        session_times.append(time.perf_counter() - t0)
+                except Exception as e:
+                    with lock:
+                        errors[f"session: {type(e).__name__}"] += 1
+                    return
+                for _ in range(args.answers):
+                    t0 = time.perf_counter()
+                    try:
+                        answer(state, rng)
+                    except Exception as e:
+                        with lock:
+                            errors[type(e).__name__] += 1
+                        continue
+                    with lock:
+                        answer_times.append(time.perf_counter() - t0)
+
+            threads = [threading.Thread(target=session, args=(i,)) for i in range(args.sessions)]
+            start = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            duration = time.perf_counter() - start
+        finally:
+            for service in services:
+                service.stop()
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    scale = 1 if sys.platform == "darwin" else 1024  # ru_maxrss is bytes on macOS, KiB on Linux
+    return {
+        "sessions": args.sessions,
+        "answers": len(answer_times),
+        "errors": dict(errors),
+        "duration_s": duration,
+        "throughput_answers_s": len(answer_times) / duration if duration else 0.0,
+        "session_start": percentiles(session_times),
+        "answer": percentiles(answer_times),
+        "stages": tracing.snapshot(),
+        "peak_rss_mb": rss * scale / 2 ** 20,
+        "import_rss_mb": rss_before * scale / 2 ** 20,
+    }
+
+
+# ---- parent side: one child per scenario, merged into one report ----
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO, capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_child(scenario, argv):
+    cmd = [sys.executable, "-m", "benchmarks.load_suite", "--child", scenario] + argv
+    out = subprocess.run(cmd, cwd=REPO, capture_output=True, text=True)
+    lines = out.stdout.strip().splitlines()
+    if out.returncode != 0 or not lines:
+        tail = (out.stderr.strip().splitlines() or ["no output"])[-1]
+        return {"error": tail}
+    return json.loads(lines[-1])
+
+
+def print_report(report, baseline=None):
+    print(f"{'scenario':<12} {'answers/s':>10} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} {'errors':>7} {'rss MB':>7}")
+    for name, result in report["scenarios"].items():
+        if "error" in result:
+            print(f"{name:<12} failed: {result['error']}")
+            continue
+        answer = result["answer"]
+        line = (f"{name:<12} {result['throughput_answers_s']:>10.2f} {answer.get('p50_s', float('nan')):>7.3f} "
+                f"{answer.get('p95_s', float('nan')):>7.3f} {answer.get('p99_s', float('nan')):>7.3f} "
+                f"{sum(result['errors'].values()):>7} {result['peak_rss_mb']:>7.0f}")
+        old = (baseline or {}).get("scenarios", {}).get(name, {})
+        if "answer" in old and old["answer"].get("count") and answer.get("count"):
+            line += (f"   vs baseline: {result['throughput_answers_s'] / old['throughput_answers_s'] - 1:+.0%} tput, "
+                     f"{answer['p95_s'] / old['answer']['p95_s'] - 1:+.0%} p95, "
+                     f"{result['peak_rss_mb'] - old['peak_rss_mb']:+.0f} MB")
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end load test of the practice pages")
+    parser.add_argument("--scenarios", nargs="+", default=SCENARIOS, choices=SCENARIOS)
+    parser.add_argument("--sessions", type=int, default=8, help="concurrent sessions per scenario")
+    parser.add_argument("--answers", type=int, default=10, help="answers per session")
+    parser.add_argument("--sentences", type=int, default=5, help="sentences/questions per session")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--http-latency", type=float, default=0.05, help="Wikipedia/Datamuse stand-in latency (s)")
+    parser.add_argument("--http-failure-rate", type=float, default=0.0)
+    parser.add_argument("--stt-latency", type=float, default=0.3, help="speech recognition stand-in latency (s)")
+    parser.add_argument("--stt-failure-rate", type=float, default=0.0)
+    parser.add_argument("--tts-latency", type=float, default=0.05)
+    parser.add_argument("--tts-failure-rate", type=float, default=0.0)
+    parser.add_argument("--encode-cost", type=float, default=0.004, help="fake model cost per encode call (s)")
+    parser.add_argument("--real-model", action="store_true", help="load the real Sentence-BERT model")
+    parser.add_argument("--precision", choices=["float32", "int8"], default="float32",
+                        help="real model precision (int8 needs a passing benchmarks.model_parity run)")
+    parser.add_argument("--synonyms", choices=["datamuse", "bank"], default="datamuse")
+    parser.add_argument("--realtime", action="store_true", help="pace WAV fixtures like a live microphone")
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--baseline", help="earlier JSON report to compare against")
+    parser.add_argument("--child", choices=SCENARIOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        args.scenario = args.child
+        try:
+            result = run_scenario(args)
+        except Exception as e:  # e.g. missing NLTK data: report it and let the other scenarios run
+            result = {"error": f"{type(e).__name__}: {' '.join(str(e).replace('*', '').split())[:200]}"}
+        print(json.dumps(result))
+        return
+
+    forward = sys.argv[1:]
+    report = {
+        "suite": "load",
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("out", "baseline", "child")},
+        "scenarios": {name: run_child(name, forward) for name in args.scenarios},
+    }
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
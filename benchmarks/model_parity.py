@@ -0,0 +1,124 @@
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from atomic_files import write_bytes
+from embedding_cache import cosine_similarity
+
+# Score parity between the float32 and int8 Sentence-BERT models on a fixed evaluation set.
+# Exits non-zero when a cosine similarity moves by more than --tolerance or a Single Word Spark
+# answer lands in a different point bucket. The outcome is recorded in startup.PARITY_FILE, and
+# the app only honors MODEL_PRECISION=int8 after a passing run.
+#
+#   python -m benchmarks.model_parity --threads 4
+
+# (spoken answer, expected synonym): exact, close, loose and unrelated answers
+WORD_PAIRS = [
+    ("happy", "happy"), ("joyful", "happy"), ("glad", "happy"), ("cheerful", "happy"), ("sad", "happy"),
+    ("large", "big"), ("huge", "big"), ("enormous", "big"), ("tiny", "big"), ("table", "big"),
+    ("quick", "fast"), ("rapid", "fast"), ("speedy", "fast"), ("slow", "fast"), ("window", "fast"),
+    ("begin", "start"), ("commence", "start"), ("launch", "start"), ("finish", "start"), ("banana", "start"),
+    ("smart", "intelligent"), ("clever", "intelligent"), ("bright", "intelligent"), ("stupid", "intelligent"),
+    ("angry", "furious"), ("mad", "furious"), ("irate", "furious"), ("calm", "furious"),
+    ("difficult", "hard"), ("tough", "hard"), ("challenging", "hard"), ("easy", "hard"), ("cloud", "hard"),
+    ("house", "home"), ("dwelling", "home"), ("residence", "home"), ("office", "home"),
+    ("answer", "reply"), ("respond", "reply"), ("response", "reply"), ("question", "reply"),
+    ("buy", "purchase"), ("acquire", "purchase"), ("sell", "purchase"), ("river", "purchase"),
+    ("pretty", "beautiful"), ("lovely", "beautiful"), ("gorgeous", "beautiful"), ("ugly", "beautiful"),
+    ("", "empty"), ("uh I think it is glad", "happy"), ("the big one", "large"),
+]
+
+# (speech, reference) pairs shaped like the Sentence Speech Challenge
+SENTENCE_PAIRS = [
+    ("The solar system has eight planets that orbit the sun.",
+     "The Solar System is the gravitationally bound system of the Sun and the objects that orbit it, "
+     "including eight planets."),
+    ("Jazz started in New Orleans and uses a lot of improvisation.",
+     "Jazz is a music genre that originated in the African-American communities of New Orleans. "
+     "It is characterized by swing and blue notes, complex chords and improvisation."),
+    ("Plants use sunlight to make food from water and carbon dioxide.",
+     "Photosynthesis is a process used by plants to convert light energy into chemical energy "
+     "that fuels their activities, using water and carbon dioxide."),
+    ("I like to play football with my friends on the weekend.",
+     "The Roman Empire was the post-Republican period of ancient Rome, ruling large territorial holdings "
+     "around the Mediterranean Sea."),
+    ("A volcano is a mountain where lava comes out.",
+     "A volcano is a rupture in the crust of a planetary-mass object that allows hot lava, volcanic ash, "
+     "and gases to escape from a magma chamber below the surface."),
+    ("Chess is a board game for two people.",
+     "Chess is a board game for two players, played on a chequered board with 64 squares arranged in an 8x8 grid."),
+    ("um so the the empire was big and it had many many soldiers",
+     "The Roman Empire was the post-Republican period of ancient Rome, ruling large territorial holdings "
+     "around the Mediterranean Sea."),
+]
+
+
+def similarities(model, pairs):
+    texts = sorted({text for pair in pairs for text in pair if text})
+    vectors = dict(zip(texts, model.encode(texts)))
+    # Same rules as the pages: an empty answer scores 0, others are cosine * 100 rounded to 2 places
+    return np.array([round(cosine_similarity(vectors[a], vectors[b]) * 100, 2) if a and b else 0.0
+                     for a, b in pairs])
+
+
+# The gate startup checks before loading int8
+def record(path, report, passed):
+    import startup
+    import torch
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    summary = {name: {"max_diff": result["max_diff"], "bucket_changes": len(result["bucket_changes"])}
+               for name, result in report["sets"].items()}
+    write_bytes(path, json.dumps({"model": startup.MODEL_NAME, "precision": "int8", "passed": passed,
+                                  "tolerance": report["tolerance"], "torch": torch.__version__,
+                                  "sets": summary}).encode("utf-8"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="float32 vs int8 Sentence-BERT score parity")
+    parser.add_argument("--tolerance", type=float, default=2.0, help="max similarity change, in percentage points")
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    import startup
+    from quiz_scoring import score_relevance
+
+    reference = startup.load_sentence_model("float32", args.threads)
+    quantized = startup.load_sentence_model("int8", args.threads)
+
+    report = {"tolerance": args.tolerance, "sets": {}}
+    failed = False
+    for name, pairs in (("words", WORD_PAIRS), ("sentences", SENTENCE_PAIRS)):
+        old, new = similarities(reference, pairs), similarities(quantized, pairs)
+        diff = np.abs(new - old)
+        drifted = [{"pair": pairs[i], "float32": old[i], "int8": new[i]} for i in np.flatnonzero(diff > args.tolerance)]
+        moved = []
+        if name == "words":
+            moved = [{"pair": pairs[i], "float32": old[i], "int8": new[i],
+                      "points": [score_relevance(old[i]), score_relevance(new[i])]}
+                     for i in range(len(pairs)) if score_relevance(old[i]) != score_relevance(new[i])]
+        failed |= bool(drifted or moved)
+        report["sets"][name] = {"pairs": len(pairs), "max_diff": float(diff.max()), "mean_diff": float(diff.mean()),
+                                "over_tolerance": drifted, "bucket_changes": moved}
+
+    if args.json:
+        print(json.dumps(report, indent=2, default=float))
+    else:
+        for name, result in report["sets"].items():
+            print(f"{name:<10} {result['pairs']:>3} pairs  max diff {result['max_diff']:.2f}  "
+                  f"mean diff {result['mean_diff']:.2f}  over tolerance {len(result['over_tolerance'])}  "
+                  f"bucket changes {len(result['bucket_changes'])}")
+            for item in result["over_tolerance"] + result["bucket_changes"]:
+                print(f"    {item['pair']}: {item['float32']:.2f} -> {item['int8']:.2f}")
+        print("PASS" if not failed else "FAIL")
+    record(startup.PARITY_FILE, report, not failed)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import sys
+
+import numpy as np
+from textblob import TextBlob
+
+from benchmarks.bench_emotion_scorer import load_corpus
+from emotion_corpus import Corpus
+from emotion_scorer import EmotionScorer, emotion_label
+
+# Parity between the batched emotion scorer and TextBlob, sentence by sentence. Exits non-zero
+# when a sentence lands in a different emotion bucket or a fast-path polarity differs.
+#
+#   python -m benchmarks.scorer_parity --seeds 5
+
+# Word sequences for each rule the batch replays or routes to TextBlob: modifier chains, chains
+# broken by unknown words, negations, "!", emoticons and abbreviations before the full stop
+EDGE_CASES = [
+    "good", "bad", "the day", "very good", "very very good", "really terrible idea",
+    "extremely happy but very sad", "very xyzzy good", "very an good", "good bad good bad",
+    "not good", "never happy", "no bad news", "good !", "happy :)", "sad :(", "so (!) good",
+    "mr knightley was good", "she was a", "don t be sad", "emma was most agreeable",
+    "harriet was not unhappy", "the weather was lovely and the company delightful",
+    "it was a sad , dreadful , miserable business", "perfectly wonderful -- quite charming",
+]
+
+
+def edge_batch():
+    corpus = Corpus.from_words(word for sentence in EDGE_CASES for word in sentence.split())
+    offsets = np.zeros(len(EDGE_CASES) + 1, dtype=np.int64)
+    np.cumsum([len(sentence.split()) for sentence in EDGE_CASES], out=offsets[1:])
+    return corpus, corpus.token_ids, offsets
+
+
+# Sentences whose bucket or fast-path polarity differs from TextBlob
+def compare(corpus, ids, offsets, tolerance):
+    scorer = EmotionScorer(corpus.vocab)
+    sentences = corpus.render(ids, offsets)
+    labels = scorer.score_batch(ids, offsets, sentences)
+    polarity, fallback = scorer.polarity_batch(ids, offsets)
+    failures = []
+    for i, sentence in enumerate(sentences):
+        reference = TextBlob(sentence).sentiment.polarity
+        if labels[i] != emotion_label(reference):
+            failures.append((sentence, labels[i], emotion_label(reference)))
+        elif not fallback[i] and abs(polarity[i] - reference) > tolerance:
+            failures.append((sentence, round(float(polarity[i]), 6), round(reference, 6)))
+    return len(sentences), int(fallback.sum()), failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched emotion scorer vs TextBlob parity")
+    parser.add_argument("--sentences", type=int, default=2000, help="sampled sentences per seed")
+    parser.add_argument("--seeds", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=1e-9, help="max fast-path polarity difference")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    runs = [("edge cases", *edge_batch())]
+    for seed in range(args.seeds):
+        runs.append((f"seed {seed}", corpus, *corpus.sample(args.sentences, np.random.default_rng(seed))))
+
+    failed = False
+    for name, run_corpus, ids, offsets in runs:
+        count, routed, failures = compare(run_corpus, ids, offsets, args.tolerance)
+        failed |= bool(failures)
+        print(f"{name:<12} {count:>5} sentences  {routed:>4} via TextBlob  {len(failures)} differ")
+        for sentence, got, expected in failures[:5]:
+            print(f"    {sentence!r}: {got} vs {expected}")
+    print("PASS" if not failed else "FAIL")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+import collections
+import hashlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows: give each process its own cache directory
+
+DEFAULT_CACHE_DIR = os.path.join(".cache", "embeddings")
+DIGEST_SIZE = 16
+
+
+# Cosine similarity of two 1-D embeddings
+def cosine_similarity(a, b):
+    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b) or 1.0))
+
+
+# Content address for a text under a given model
+def text_key(model_name, text):
+    return hashlib.blake2b(f"{model_name}\0{text}".encode("utf-8"), digest_size=DIGEST_SIZE).digest()
+
+
+# Append-only memory-mapped vector file plus a digest index, one row per text. Several processes
+# can share a directory: a row is claimed under an exclusive lock on index.bin, as the index
+# length at that moment, and rows other processes added are picked up from the index.
+class DiskStore:
+    def __init__(self, directory, dtype="float16", grow_rows=4096):
+        self.directory = directory
+        self.dtype = np.dtype(dtype)
+        self.grow_rows = grow_rows
+        self.dim = None
+        self.rows = {}
+        self._indexed = 0  # index records read so far
+        self._vectors = None
+        self._capacity = 0
+        os.makedirs(directory, exist_ok=True)
+        self._meta_path = os.path.join(directory, "meta.json")
+        self._index_path = os.path.join(directory, "index.bin")
+        self._vectors_path = os.path.join(directory, "vectors.bin")
+        self._load()
+
+    def _load(self):
+        if self._read_meta():
+            self._refresh()
+
+    def _read_meta(self):
+        if not os.path.exists(self._meta_path):
+            return False
+        with open(self._meta_path) as f:
+            meta = json.load(f)
+        if np.dtype(meta["dtype"]) != self.dtype:
+            raise ValueError(f"{self.directory} holds {meta['dtype']} vectors, not {self.dtype}")
+        self.dim = meta["dim"]
+        return True
+
+    # Read index records appended since the last read, by this or another process. A torn
+    # trailing record (crash mid-append) is ignored.
+    def _refresh(self):
+        try:
+            with open(self._index_path, "rb") as f:
+                f.seek(self._indexed * DIGEST_SIZE)
+                index = f.read()
+        except FileNotFoundError:
+            return
+        count = len(index) // DIGEST_SIZE
+        if count and self.dim is None:
+            self._read_meta()
+        for i in range(count):
+            self.rows[index[i * DIGEST_SIZE:(i + 1) * DIGEST_SIZE]] = self._indexed + i
+        self._indexed += count
+        if self._indexed > self._capacity:
+            self._map(self._indexed)  # the writer grew the file before listing the rows
+
+    # Grows the file only with the index locked; readers map what the writers already allocated
+    def _map(self, min_rows):
+        row_bytes = self.dim * self.dtype.itemsize
+        size = os.path.getsize(self._vectors_path) if os.path.exists(self._vectors_path) else 0
+        capacity = max(size // row_bytes, min_rows)
+        if capacity * row_bytes > size:
+            with open(self._vectors_path, "ab") as f:
+                f.truncate(capacity * row_bytes)
+        self._vectors = np.memmap(self._vectors_path, dtype=self.dtype, mode="r+", shape=(capacity, self.dim))
+        self._capacity = capacity
+
+    def get(self, key):
+        row = self.rows.get(key)
+        if row is None and self._index_grew():
+            self._refresh()  # another process may have added it
+            row = self.rows.get(key)
+        if row is None:
+            return None
+        return np.array(self._vectors[row], dtype=np.float32)
+
+    def _index_grew(self):
+        try:
+            return os.path.getsize(self._index_path) >= (self._indexed + 1) * DIGEST_SIZE
+        except OSError:
+            return False
+
+    def put(self, key, vector):
+        if key in self.rows:
+            return
+        with open(self._index_path, "ab") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                self._append(f, key, vector)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    # Called with the index locked: the row is the index length now, not a per-process count
+    def _append(self, index, key, vector):
+        if self.dim is None and not self._read_meta():
+            self.dim = int(vector.shape[0])
+            with open(self._meta_path + ".tmp", "w") as f:
+                json.dump({"dim": self.dim, "dtype": self.dtype.name}, f)
+            os.replace(self._meta_path + ".tmp", self._meta_path)
+        if self._vectors is None:
+            self._map(self.grow_rows)
+        self._refresh()
+        if key in self.rows:
+            return
+        size = os.fstat(index.fileno()).st_size
+        row = size // DIGEST_SIZE
+        if size % DIGEST_SIZE:
+            index.truncate(row * DIGEST_SIZE)  # drop a torn record so keys stay aligned to rows
+        if row >= self._capacity:
+            self._vectors.flush()
+            self._map(max(row + 1, self._capacity + self.grow_rows))
+        self._vectors[row] = vector
+        # Vector first, then index, so a listed digest always has its row written
+        index.write(key)
+        index.flush()
+        self.rows[key] = row
+        self._indexed = row + 1
+
+    def flush(self):
+        if self._vectors is not None:
+            self._vectors.flush()
+
+
+# In-memory LRU bounded by bytes, in front of the memory-mapped disk tier
+class EmbeddingCache:
+    def __init__(self, model_name, cache_dir=DEFAULT_CACHE_DIR, dtype="float16", memory_bytes=64 * 1024 * 1024):
+        self.model_name = model_name
+        self.dtype = np.dtype(dtype)
+        self.memory_bytes = memory_bytes
+        self._memory = collections.OrderedDict()
+        self._memory_used = 0
+        self._lock = threading.Lock()
+        self.disk = None
+        if cache_dir:
+            safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in model_name)
+            self.disk = DiskStore(os.path.join(cache_dir, f"{safe_name}-{self.dtype.name}"), dtype=self.dtype)
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "encode_seconds": 0.0}
+
+    def _remember(self, key, vector):
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = vector
+        self._memory_used += vector.nbytes
+        while self._memory_used > self.memory_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_used -= evicted.nbytes
+            self.stats["evictions"] += 1
+
+    def _lookup(self, key):
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return vector
+        if self.disk is not None:
+            vector = self.disk.get(key)
+            if vector is not None:
+                self.stats["disk_hits"] += 1
+                self._remember(key, vector)
+                return vector
+        return None
+
+    # Embed texts, calling encode_fn once with only the texts not seen before
+    def encode(self, texts, encode_fn):
+        vectors = [None] * len(texts)
+        missing = collections.OrderedDict()
+        with self._lock:
+            for i, text in enumerate(texts):
+                key = text_key(self.model_name, text)
+                vectors[i] = self._lookup(key)
+                if vectors[i] is None:
+                    missing.setdefault(key, []).append(i)
+            self.stats["misses"] += len(missing)
+
+        if missing:
+            start = time.perf_counter()
+            encoded = np.asarray(encode_fn([texts[idx[0]] for idx in missing.values()]), dtype=np.float32)
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.stats["encode_seconds"] += elapsed
+                for (key, idx), vector in zip(missing.items(), encoded):
+                    # Round through the storage dtype so hits and misses agree exactly
+                    vector = vector.astype(self.dtype).astype(np.float32)
+                    self._remember(key, vector)
+                    if self.disk is not None:
+                        self.disk.put(key, vector)
+                    for i in idx:
+                        vectors[i] = vector
+        return np.stack(vectors)
+
+    def hit_rate(self):
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+    def flush(self):
+        with self._lock:
+            if self.disk is not None:
+                self.disk.flush()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+# One cache per model per process, so pages sharing a model share the files
+def get_cache(model_name, **kwargs):
+    with _caches_lock:
+        cache = _caches.get(model_name)
+        if cache is None:
+            cache = _caches[model_name] = EmbeddingCache(model_name, **kwargs)
+        return cache
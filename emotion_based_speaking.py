@@ -1,49 +1,58 @@
 import streamlit as st
-import speech_recognition as sr
-from textblob import TextBlob
 import nltk
-import random
-import time
-from gtts import gTTS
-import os
-
-# Ensure NLTK data is downloaded
-nltk.download('punkt')
-nltk.download('gutenberg')
-
-# Load dataset from NLTK
-from nltk.corpus import gutenberg
-words = list(gutenberg.words('austen-emma.txt'))
-
-# Initialize session state
-if "sentences" not in st.session_state:
-    st.session_state.sentences = []
-
-if "current_sentence" not in st.session_state:
-    st.session_state.current_sentence = ""
-
-if "last_pronounced" not in st.session_state:
-    st.session_state.last_pronounced = ""
-
-# Function to generate a dynamic sentence
-def generate_sentence():
-    sentence_length = random.randint(8, 15)
-    sentence = " ".join(random.sample(words, sentence_length)) + "."
-    return sentence.capitalize()
-
-# Function to determine emotion
-def detect_emotion(sentence):
-    analysis = TextBlob(sentence).sentiment.polarity
-    if analysis > 0.5:
-        return "Happy 😊"
-    elif 0.1 < analysis <= 0.5:
-        return "Motivated 💪"
-    elif -0.1 <= analysis <= 0.1:
-        return "Neutral 😐"
-    elif -0.5 < analysis < -0.1:
-        return "Sad 😔"
-    else:
-        return "Angry 😠"
+from functools import partial
+import startup
+import audio_capture
+import tracing
+import tts_cache
+import speech_upload
+import session_memory
+from results_store import get_results, current_learner
+from emotion_corpus import load_gutenberg
+from emotion_scorer import EMOTIONS, EmotionScorer
+from practice_session import PracticeSession, PENDING, SCORED, make_executor
+
+# Ensure NLTK data is downloaded (checked once per process)
+startup.ensure_nltk_data('punkt')
+
+# Load dataset from NLTK once per process as a vocabulary + int32 token ids
+@st.cache_resource
+def load_corpus():
+    return load_gutenberg('austen-emma.txt')
+
+corpus = session_memory.share("Gutenberg corpus", load_corpus())
+
+# Sentiment lexicon precomputed per corpus token for batch emotion scoring
+@st.cache_resource
+def load_emotion_scorer():
+    return EmotionScorer(corpus.vocab)
+
+emotion_scorer = session_memory.share("emotion scorer", load_emotion_scorer())
+
+# Real sentences from Austen, pre-scored by emotion and speaking time; opened (or built once)
+# in the background, None until ready
+def load_sentence_index():
+    future = startup.resource("sentence_index")
+    if future.done() and future.exception() is None:
+        return session_memory.share("sentence index", future.result())
+    return None
+
+load_sentence_index()
+
+# gTTS audio cached in memory by text, synthesized on one shared worker
+speech_cache = session_memory.share("gTTS audio", tts_cache.get_tts("gtts"))
+
+# Scored attempts are saved in the background for the progress page
+results = session_memory.share("results store", get_results())
+
+# Speech capture runs on this worker, never on the script thread
+@st.cache_resource
+def load_capture_executor():
+    return session_memory.share("capture executor", make_executor())
+
+# Initialize session state: only the practice session, whose tasks point into the shared index
+if "practice" not in st.session_state:
+    st.session_state.practice = None
 
 # Function to calculate speaking time
 def calculate_speaking_time(sentence):
@@ -51,22 +60,31 @@ def calculate_speaking_time(sentence):
     avg_read_speed = 3  # Average 3 words per second
     return min(len(words) / avg_read_speed, 15)  # Max limit of 15 sec per sentence
 
-# Function to recognize user speech
-def recognize_speech(timeout_duration):
-    recognizer = sr.Recognizer()
-    with sr.Microphone() as source:
-        st.info(f"🎤 Listening... (Max {timeout_duration} sec)")
-        try:
-            start_time = time.time()
-            audio = recognizer.listen(source, timeout=timeout_duration)
-            end_time = time.time()
-            text = recognizer.recognize_google(audio)
-            speaking_time = round(end_time - start_time, 2)
-            return text, speaking_time
-        except sr.UnknownValueError:
-            return "Error: Could not understand speech", None
-        except sr.RequestError:
-            return "Error: Speech recognition service unavailable", None
+# Active sentence only: starts its capture and polls it without blocking the page
+@st.fragment(run_every=0.5)
+def record_active_sentence(practice, idx):
+    task = practice.tasks[idx]
+    if speech_upload.BROWSER:
+        # Recorded in the browser, recognized on the shared speech pool
+        if task.state == PENDING:
+            audio = speech_upload.new_recording(f"🎙️ Record sentence {idx+1}", key=f"record_{idx}_{task.attempts}")
+            if audio is None:
+                return
+            try:
+                practice.start_with(speech_upload.get_pool().submit(audio))
+            except speech_upload.PoolBusy:
+                st.warning("⚠️ The server is busy. Please record again in a moment.")
+                return
+    else:
+        practice.start(tracing.traced("capture")(audio_capture.capture_utterance))
+    if practice.poll():
+        st.rerun()  # Full rerun shows the result and moves on to the next sentence
+    if speech_upload.BROWSER:
+        st.info("⏳ Recognizing your recording...")
+        return
+    st.info(f"🎤 Listening... (Max {round(task.allowed_time, 2)} sec)")
+    if task.partial:
+        st.write(f"🎧 {task.partial}...")  # Words recognized so far
 
 # Function to provide feedback
 def provide_feedback(actual_time, allowed_time):
@@ -78,49 +96,89 @@ def provide_feedback(actual_time, allowed_time):
     else:
         return "✅ Your speaking speed is well-balanced!"
 
-# Function to play speech using gTTS
+# Save one scored sentence with its speaking time and rate
+def save_attempt(learner, task):
+    wpm = len(task.text.split()) / task.speaking_time * 60 if task.speaking_time else None
+    results.record(learner, "emotion", item=task.sentence, answer=task.text, wpm=wpm, seconds=task.speaking_time)
+
+# Function to play speech using gTTS: played in the browser, repeats come from the cache
 def pronounce_speech(text):
     if text:
-        tts = gTTS(text=text, lang='en')
-        tts.save("speech.mp3")
-        os.system("start speech.mp3")  # Windows
-        # os.system("mpg321 speech.mp3")  # Linux/macOS
-        st.session_state.last_pronounced = text  # Store last pronounced speech
-
-# Function to run the practice session
-def run_speaking_practice(num_sentences):
-    st.session_state.sentences = []
-    
-    for i in range(num_sentences):
-        sentence = generate_sentence()
-        emotion = detect_emotion(sentence)
-        allowed_time = calculate_speaking_time(sentence)
-
-        st.session_state.sentences.append((sentence, emotion, allowed_time))
+        try:
+            audio = speech_cache.get(text)
+        except Exception:
+            st.error("⚠️ Could not generate speech. Please try again.")
+            return
+        st.audio(audio, format=speech_cache.mime, autoplay=True)
+
+# Function to run the practice session: indexed sentences matching the filter, no NLP per request.
+# Tasks keep index rows; the sentence text is read from the mapped index when shown.
+def run_speaking_practice(num_sentences, emotion=None, max_time=None):
+    index = load_sentence_index()
+    texts = None
+    if index is not None:
+        items = index.sample_rows(num_sentences, [emotion] if emotion else None, max_time)
+        texts = index.text
+        if not items:
+            st.warning("⚠️ No sentences match that emotion and time limit. Try a longer time limit.")
+            return
+    else:
+        # Index still being prepared: generated sentences, scored now
+        ids, offsets = corpus.sample(num_sentences)
+        sentences = corpus.render(ids, offsets)
+        with tracing.span("emotion_score"):
+            emotions = emotion_scorer.score_batch(ids, offsets, sentences)
+        items = [(sentence, emotion, calculate_speaking_time(sentence)) for sentence, emotion in zip(sentences, emotions)]
+
+    st.session_state.practice = PracticeSession(items, load_capture_executor(), on_scored=partial(save_attempt, current_learner()),
+                                                texts=texts)
 
 # UI starts here
 st.title("🗣️ Speech Training & Emotion Recognition App")
 
 num_sentences = st.number_input("Enter the number of sentences to practice (Max 50):", min_value=1, max_value=50, value=3)
 
-if st.button("Start Practice Session"):
-    run_speaking_practice(num_sentences)
-
-for idx, (sentence, emotion, allowed_time) in enumerate(st.session_state.sentences):
-    st.subheader(f"Sentence {idx+1}/{len(st.session_state.sentences)}")
-    st.write(f"**Sentence:** {sentence}")
-    st.write(f"**Emotion to convey:** {emotion}")
-    st.write(f"⏳ **You have {round(allowed_time, 2)} seconds to read this aloud.**")
-
-    if st.button(f"🔊 Pronounce Sentence {idx+1}", key=f"pronounce_{idx}"):
-        pronounce_speech(sentence)
+# Choose the emotion and how long each sentence may take
+index = load_sentence_index()
+col1, col2 = st.columns(2)
+emotion = col1.selectbox("Emotion to practice", ["Any"] + EMOTIONS)
+max_time = col2.slider("Max seconds per sentence", min_value=2.0, max_value=15.0, value=15.0, step=0.5)
+emotion = None if emotion == "Any" else emotion
+if index is not None:
+    st.caption(f"📚 Matching sentences: {index.count_matching([emotion] if emotion else None, max_time)}")
+else:
+    st.caption("⏳ Preparing the sentence library; until then sentences are generated and the filter is not applied.")
 
-    user_speech, actual_time = recognize_speech(allowed_time)
-
-    st.write(f"✅ **You said:** {user_speech}")
-    if actual_time:
-        st.write(f"⏱ **Time Taken:** {actual_time} seconds")
-        feedback = provide_feedback(actual_time, allowed_time)
-        st.write(f"📢 **Feedback:** {feedback}")
-
-    st.write("---")  # Divider between sentences
+if st.button("Start Practice Session"):
+    run_speaking_practice(num_sentences, emotion, max_time)
+
+practice = st.session_state.practice
+if practice is not None:
+    practice.poll()
+    active = practice.active
+    for idx, task in enumerate(practice.tasks):
+        st.subheader(f"Sentence {idx+1}/{len(practice.tasks)}")
+        st.write(f"**Sentence:** {task.sentence}")
+        st.write(f"**Emotion to convey:** {task.emotion}")
+        st.write(f"⏳ **You have {round(task.allowed_time, 2)} seconds to read this aloud.**")
+
+        if st.button(f"🔊 Pronounce Sentence {idx+1}", key=f"pronounce_{idx}"):
+            pronounce_speech(task.sentence)
+
+        # Scored sentences render their stored result; only the active one records
+        if task.state == SCORED:
+            st.write(f"✅ **You said:** {task.text}")
+            if task.speaking_time:
+                st.write(f"⏱ **Time Taken:** {task.speaking_time} seconds")
+                feedback = provide_feedback(task.speaking_time, task.allowed_time)
+                st.write(f"📢 **Feedback:** {feedback}")
+            st.button("🔁 Try Again", key=f"retry_{idx}", on_click=practice.retry, args=(idx,))
+        elif idx == active:
+            record_active_sentence(practice, idx)
+        else:
+            st.write("⏸️ Waiting for the earlier sentences.")
+
+        st.write("---")  # Divider between sentences
+
+    if active is None:
+        st.success("🎉 Practice session complete!")
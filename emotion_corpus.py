@@ -0,0 +1,45 @@
+import sys
+
+import numpy as np
+
+
+# Word corpus stored once per process: interned vocabulary + int32 token ids
+class Corpus:
+    def __init__(self, vocab, token_ids):
+        self.vocab = vocab
+        self.token_ids = token_ids
+
+    @classmethod
+    def from_words(cls, words):
+        ids = {}
+        token_ids = np.fromiter((ids.setdefault(w, len(ids)) for w in words), dtype=np.int32)
+        return cls([sys.intern(w) for w in ids], token_ids)
+
+    def __len__(self):
+        return len(self.token_ids)
+
+    # Draw n sentences of 8-15 corpus words in one vectorized pass; returns (ids, offsets)
+    def sample(self, n, rng=None, min_length=8, max_length=15):
+        rng = rng if rng is not None else np.random.default_rng()
+        lengths = rng.integers(min_length, max_length + 1, size=n)
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        positions = rng.integers(0, len(self.token_ids), size=int(offsets[-1]))
+        return self.token_ids[positions], offsets
+
+    # Same text shape as the old generate_sentence(): words joined, full stop, capitalized
+    def render(self, ids, offsets):
+        vocab = self.vocab
+        words = [vocab[i] for i in ids.tolist()]
+        bounds = offsets.tolist()
+        return [(" ".join(words[start:end]) + ".").capitalize() for start, end in zip(bounds, bounds[1:])]
+
+    def generate_sentences(self, n, rng=None):
+        return self.render(*self.sample(n, rng))
+
+
+def load_gutenberg(fileid='austen-emma.txt'):
+    from startup import ensure_nltk_data
+    ensure_nltk_data('gutenberg')
+    from nltk.corpus import gutenberg
+    return Corpus.from_words(gutenberg.words(fileid))
@@ -0,0 +1,108 @@
+import numpy as np
+from textblob import TextBlob
+from textblob.en import sentiment as pattern_sentiment
+
+EMOTIONS = ["Happy 😊", "Motivated 💪", "Neutral 😐", "Sad 😔", "Angry 😠"]
+
+
+# Same buckets and thresholds the emotion page has always used
+def emotion_label(polarity):
+    if polarity > 0.5:
+        return EMOTIONS[0]
+    elif 0.1 < polarity <= 0.5:
+        return EMOTIONS[1]
+    elif -0.1 <= polarity <= 0.1:
+        return EMOTIONS[2]
+    elif -0.5 < polarity < -0.1:
+        return EMOTIONS[3]
+    else:
+        return EMOTIONS[4]
+
+
+def emotion_labels(polarity):
+    buckets = np.select(
+        [polarity > 0.5,
+         (0.1 < polarity) & (polarity <= 0.5),
+         (-0.1 <= polarity) & (polarity <= 0.1),
+         (-0.5 < polarity) & (polarity < -0.1)],
+        [0, 1, 2, 3], default=4)
+    return [EMOTIONS[b] for b in buckets.tolist()]
+
+
+# TextBlob's pattern lexicon precomputed per corpus token id.
+# Plain words, punctuation and adverb modifiers ("very good") are replayed column
+# by column over the whole batch; sentences with negations, exclamations,
+# emoticons or words the tokenizer would split go through TextBlob instead.
+class EmotionScorer:
+    def __init__(self, vocab):
+        size = len(vocab) + 1  # last row is padding
+        self.polarity = np.zeros(size, dtype=np.float64)
+        self.intensity = np.ones(size, dtype=np.float64)
+        self.known = np.zeros(size, dtype=bool)
+        self.modifier = np.zeros(size, dtype=bool)
+        self.long_unknown = np.zeros(size, dtype=bool)
+        self.special = np.zeros(size, dtype=bool)
+        self.special_last = np.zeros(size, dtype=bool)
+        tokenize = pattern_sentiment.tokenizer
+        for i, word in enumerate(vocab):
+            w = word.lower()
+            entry = pattern_sentiment.get(w)
+            if entry is not None:
+                self.known[i] = True
+                self.polarity[i], _, self.intensity[i] = entry[None]
+                self.modifier[i] = any(pos in entry for pos in pattern_sentiment.modifiers)
+            else:
+                self.long_unknown[i] = len(w) > 2
+            # Negations, "!" and emoticons have their own rules in pattern
+            self.special[i] = (
+                w in pattern_sentiment.negations
+                or w == "!"
+                or tokenize(w) != [w]
+                or (entry is None and pattern_sentiment.assessments([(w, None)]) != [])
+            )
+            # The full stop is glued to the last word; abbreviations like "a." keep it
+            self.special_last[i] = self.special[i] or tokenize(w + ".") != [w + " ."]
+
+    # Polarity for every sentence in one padded gather, plus a mask of sentences needing TextBlob
+    def polarity_batch(self, ids, offsets):
+        pad = len(self.polarity) - 1
+        lengths = np.diff(offsets)
+        rows = len(lengths)
+        width = int(lengths.max()) if rows else 0
+        columns = np.arange(width)
+        inside = columns < lengths[:, None]
+        positions = np.minimum(offsets[:-1, None] + columns, max(len(ids) - 1, 0))
+        tokens = np.where(inside, ids[positions] if len(ids) else pad, pad)
+
+        last = tokens[np.arange(rows), np.maximum(lengths - 1, 0)]
+        fallback = self.special[tokens].any(axis=1) | self.special_last[last]
+
+        # Replay pattern's assessments() for every sentence at once. A known word
+        # after a modifier merges into the previous assessment with its polarity
+        # scaled by the modifier's intensity; longer unknown words break the chain.
+        # Finished assessments are summed in sentence order, as pattern does.
+        total = np.zeros(rows, dtype=np.float64)
+        pending = np.zeros(rows, dtype=np.float64)
+        last_intensity = np.ones(rows, dtype=np.float64)
+        count = np.zeros(rows, dtype=np.int64)
+        modified = np.zeros(rows, dtype=bool)
+        for j in range(width):
+            t = tokens[:, j]
+            known = self.known[t]
+            p, i = self.polarity[t], self.intensity[t]
+            new = known & ~modified
+            merge = known & modified
+            total += np.where(new & (count > 0), pending, 0.0)
+            pending = np.where(new, p, np.where(merge, np.clip(p * last_intensity, -1.0, 1.0), pending))
+            last_intensity = np.where(known, i, last_intensity)
+            count += new
+            modified = np.where(known, self.modifier[t], modified & ~self.long_unknown[t])
+        total += np.where(count > 0, pending, 0.0)
+        return total / np.maximum(count, 1), fallback
+
+    # Emotion labels for a batch; only the sentences flagged by polarity_batch run through TextBlob
+    def score_batch(self, ids, offsets, sentences):
+        polarity, fallback = self.polarity_batch(ids, offsets)
+        for i in np.flatnonzero(fallback).tolist():
+            polarity[i] = TextBlob(sentences[i]).sentiment.polarity
+        return emotion_labels(polarity)
@@ -0,0 +1,105 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+# Shared encode queue that coalesces small requests from many sessions into one batch
+class EncodeService:
+    def __init__(self, encode_fn, max_batch=32, max_wait=0.01, max_queue=4096, batching=True):
+        self.encode_fn = encode_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batching = batching
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self.stats = {"batches": 0, "texts": 0, "requests": 0}
+        self._thread = None
+        if batching:
+            self._thread = threading.Thread(target=self._run, name="encode-service", daemon=True)
+            self._thread.start()
+
+    # Queue texts for encoding; the future resolves to a (len(texts), dim) float32 array
+    def submit(self, texts):
+        future = Future()
+        texts = list(texts)
+        if self._closed:
+            raise RuntimeError("EncodeService is closed")
+        if not self.batching or not texts:
+            try:
+                future.set_result(self._encode(texts))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        self._queue.put((texts, future))
+        return future
+
+    def encode(self, texts, timeout=None):
+        return self.submit(texts).result(timeout)
+
+    def close(self):
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+
+    def _encode(self, texts):
+        self.stats["batches"] += 1
+        self.stats["texts"] += len(texts)
+        self.stats["requests"] += 1
+        return np.asarray(self.encode_fn(texts), dtype=np.float32)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            pending = [item]
+            size = len(item[0])
+            deadline = time.monotonic() + self.max_wait
+            # Flush on max_batch texts or when the oldest request has waited max_wait
+            while size < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                pending.append(item)
+                size += len(item[0])
+            self._flush(pending)
+
+    def _flush(self, pending):
+        texts = [text for item_texts, _ in pending for text in item_texts]
+        try:
+            vectors = np.asarray(self.encode_fn(texts), dtype=np.float32)
+        except Exception as e:
+            for _, future in pending:
+                future.set_exception(e)
+            return
+        self.stats["batches"] += 1
+        self.stats["texts"] += len(texts)
+        self.stats["requests"] += len(pending)
+        start = 0
+        for item_texts, future in pending:
+            future.set_result(vectors[start:start + len(item_texts)])
+            start += len(item_texts)
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+# One service per model name per process, so every page feeds the same batches
+def get_service(model_name, encode_fn, **kwargs):
+    with _services_lock:
+        service = _services.get(model_name)
+        if service is None:
+            service = _services[model_name] = EncodeService(encode_fn, **kwargs)
+        return service
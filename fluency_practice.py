@@ -1,41 +1,45 @@
-import time
 import nltk
 import streamlit as st
 import speech_recognition as sr
-import wikipedia
-import random
-import pyttsx3
-import threading
+import startup
+import audio_capture
+import tracing
+import tts_cache
+import speech_upload
+import session_memory
+from results_store import get_results, current_learner
+from alignment import align, SUBSTITUTION, DELETION, INSERTION
+from sentence_reservoir import SentenceReservoir
+
+# Download necessary NLTK data (checked once per process)
+startup.ensure_nltk_data('punkt')
+
+# ✅ pyttsx3 audio cached by sentence; the engine runs on one worker thread (warmed up by app.py)
+speech_cache = session_memory.share("pyttsx3 audio", tts_cache.get_tts("pyttsx3"))
+
+# ✅ Function to pronounce the current sentence in the browser
+def pronounce_current_sentence(sentence):
+    try:
+        audio = speech_cache.get(sentence)
+    except Exception:
+        st.error("⚠️ Could not generate speech. Please try again.")
+        return
+    st.audio(audio, format=speech_cache.mime, autoplay=True)
 
-# Download necessary NLTK data
-nltk.download('punkt')
+# ✅ Shared Wikipedia sentence reservoir, refilled by background workers
+@st.cache_resource
+def load_sentence_reservoir():
+    return SentenceReservoir().start()
 
-# Initialize the Text-to-Speech (TTS) engine
-engine = pyttsx3.init()
-engine.setProperty('rate', 150)  # Adjust speech speed
-engine.setProperty('volume', 1)  # Set volume
+sentence_reservoir = session_memory.share("sentence reservoir", load_sentence_reservoir())
 
-# ✅ Function to pronounce the current sentence in a separate thread
-def pronounce_current_sentence(sentence):
-    def speak():
-        engine.say(sentence)
-        engine.runAndWait()
-    
-    tts_thread = threading.Thread(target=speak)
-    tts_thread.start()
+# ✅ Attempts are saved in the background; the progress page reads the running totals
+results = session_memory.share("results store", get_results())
 
 # ✅ Function to fetch random sentences from Wikipedia
+@tracing.traced("wikipedia")
 def get_random_sentences(num_sentences):
-    sentences = []
-    while len(sentences) < num_sentences:
-        try:
-            random_title = wikipedia.random()
-            summary = wikipedia.summary(random_title, sentences=5)
-            extracted_sentences = nltk.tokenize.sent_tokenize(summary)
-            sentences.extend(extracted_sentences)
-        except Exception:
-            continue  # Try again if an error occurs
-    return sentences[:num_sentences]
+    return sentence_reservoir.pop(num_sentences)
 
 # ✅ Function to calculate speaking time
 def calculate_speaking_time(sentence):
@@ -43,25 +47,48 @@ def calculate_speaking_time(sentence):
     avg_read_speed = 3  # Average 3 words per second
     return min(len(words) / avg_read_speed, 15)
 
-# ✅ Function to recognize speech
+# ✅ Function to recognize speech; returns the text and the measured speaking time (None on errors)
 def recognize_speech(timeout_duration):
-    recognizer = sr.Recognizer()
-    with sr.Microphone() as source:
-        st.info(f"🎤 Speak now... (Listening for {timeout_duration} seconds)")
-        try:
-            audio = recognizer.listen(source, timeout=timeout_duration)
-            text = recognizer.recognize_google(audio)
-            return text
-        except sr.UnknownValueError:
-            return "❌ Error: Could not understand speech."
-        except sr.RequestError:
-            return "⚠️ Error: Speech recognition service unavailable."
+    st.info(f"🎤 Speak now... (Listening for {timeout_duration} seconds)")
+    partial = st.empty()  # ✅ Shows the words recognized so far
+    try:
+        with tracing.span("capture"):
+            utterance = audio_capture.capture_utterance(timeout=timeout_duration, on_partial=lambda text: partial.write(f"🎧 {text}..."))
+        return utterance.text, utterance.duration  # ✅ From the detected start and end of speech
+    except sr.WaitTimeoutError:
+        return "⚠️ Error: No speech detected.", None
+    except sr.UnknownValueError:
+        return "❌ Error: Could not understand speech.", None
+    except sr.RequestError:
+        return "⚠️ Error: Speech recognition service unavailable.", None
+
+# ✅ Browser recording: recognition and the word alignment both run on the shared speech pool
+def recognize_upload(audio, sentence):
+    try:
+        utterance, alignment = speech_upload.get_pool().recognize(audio, align, (sentence,))
+        return utterance.text, utterance.duration, alignment
+    except sr.WaitTimeoutError:
+        return "⚠️ Error: No speech detected.", None, None
+    except sr.UnknownValueError:
+        return "❌ Error: Could not understand speech.", None, None
+    except speech_upload.PoolBusy:
+        return "⚠️ Error: The server is busy, please record again.", None, None
+    except sr.RequestError:
+        return "⚠️ Error: Speech recognition service unavailable.", None, None
+
+# ✅ Save one scored attempt: accuracy, speaking rate and the words missed or said differently
+def save_attempt(sentence, answer, alignment, speaking_time):
+    results.record(current_learner(), "fluency", item=sentence, answer=answer,
+                   accuracy=alignment.accuracy, wpm=len(alignment.hypothesis) / speaking_time * 60,
+                   seconds=speaking_time, errors=[ref for ref, _ in alignment.of(SUBSTITUTION) + alignment.of(DELETION)])
 
 # ✅ Initialize Streamlit Session State
 if "sentences" not in st.session_state:
     st.session_state.sentences = []
     st.session_state.current_index = 0
     st.session_state.result = None
+    st.session_state.speaking_time = None
+    st.session_state.alignment = None
     st.session_state.allowed_time = 0
 
 # ✅ Streamlit UI
@@ -73,11 +100,15 @@ if not st.session_state.sentences:
     num_sentences = st.number_input("Enter the number of sentences to practice (Max 10):", min_value=1, max_value=10, value=5)
     
     if st.button("Start Practice"):
-        st.session_state.sentences = get_random_sentences(num_sentences)
-        st.session_state.current_index = 0
-        st.session_state.result = None
-        st.session_state.allowed_time = calculate_speaking_time(st.session_state.sentences[0])
-        st.rerun()
+        sentences = get_random_sentences(num_sentences)
+        if sentences:
+            st.session_state.sentences = sentences
+            st.session_state.current_index = 0
+            st.session_state.result = None
+            st.session_state.allowed_time = calculate_speaking_time(sentences[0])
+            st.rerun()
+        else:
+            st.error("⚠️ Could not fetch sentences from Wikipedia. Please try again.")
 
 # ✅ Only proceed if sentences exist
 if st.session_state.sentences:
@@ -89,22 +120,46 @@ if st.session_state.sentences:
         pronounce_current_sentence(current_sentence)
 
     # ✅ Speech Recognition
-    if st.button("🎙️ Start Speaking"):
-        st.session_state.result = recognize_speech(st.session_state.allowed_time)
+    answered = False
+    if speech_upload.BROWSER:
+        audio = speech_upload.new_recording("🎙️ Record your answer", key=f"answer_{st.session_state.current_index}")
+        if audio is not None:
+            with st.spinner("⏳ Recognizing..."):
+                st.session_state.result, st.session_state.speaking_time, st.session_state.alignment = \
+                    recognize_upload(audio, current_sentence)
+            answered = True
+    elif st.button("🎙️ Start Speaking"):
+        st.session_state.result, st.session_state.speaking_time = recognize_speech(st.session_state.allowed_time)
+        st.session_state.alignment = None
+        if st.session_state.speaking_time:
+            st.session_state.alignment = align(current_sentence, st.session_state.result)  # ✅ Once per answer
+        answered = True
+    if answered and st.session_state.speaking_time:
+        save_attempt(current_sentence, st.session_state.result, st.session_state.alignment, st.session_state.speaking_time)
 
     # ✅ Display Speech Recognition Result & Feedback
     if st.session_state.result:
         st.write(f"✅ **You said:** {st.session_state.result}")
 
-        # ✅ Accuracy Calculation
-        correct_words = set(nltk.word_tokenize(current_sentence.lower()))
-        spoken_words = set(nltk.word_tokenize(st.session_state.result.lower()))
-        accuracy = (len(correct_words & spoken_words) / len(correct_words)) * 100
-
-        # ✅ Speed Analysis
-        time_taken = len(spoken_words) / 3  # Approximate time taken
-        speed = len(spoken_words) / time_taken  # Words per second
-        normal_speed = len(correct_words) / st.session_state.allowed_time
+    if st.session_state.result and st.session_state.speaking_time:
+        # ✅ Word-level alignment: accuracy counts words said correctly and in order
+        alignment = st.session_state.alignment
+        accuracy = alignment.accuracy * 100
+
+        substituted = alignment.of(SUBSTITUTION)
+        if substituted:
+            st.write("🔁 Said differently: " + ", ".join(f"*{ref}* → {hyp}" for ref, hyp in substituted[:5]))
+        missed = alignment.of(DELETION)
+        if missed:
+            st.write("➖ Missed: " + ", ".join(ref for ref, _ in missed[:5]))
+        extra = alignment.of(INSERTION)
+        if extra:
+            st.write("➕ Extra: " + ", ".join(hyp for _, hyp in extra[:5]))
+
+        # ✅ Speed Analysis from the measured speaking time
+        time_taken = st.session_state.speaking_time
+        speed = len(alignment.hypothesis) / time_taken  # Words per second
+        normal_speed = len(alignment.reference) / st.session_state.allowed_time
 
         if speed > normal_speed * 1.3:
             st.write("⚠️ You are speaking too fast! Try to slow down.")
@@ -118,7 +173,7 @@ if st.session_state.sentences:
         if extra_time > 0:
             st.write(f"⏳ You took {round(extra_time, 2)} seconds extra.")
 
-        st.write(f"🎯 Accuracy: {round(accuracy, 2)}%")
+        st.write(f"🎯 Accuracy: {round(accuracy, 2)}% · Word error rate: {round(alignment.wer * 100, 2)}%")
 
     # ✅ Next Sentence Button
     if st.button("➡️ Next Sentence"):
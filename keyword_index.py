@@ -0,0 +1,74 @@
+import re
+import string
+import threading
+
+import startup
+
+# Built once: punctuation is stripped with one translate() and tokens are whitespace runs. This
+# approximates nltk.word_tokenize on punctuation-free text; unlike it, words such as "cannot"
+# and "gonna" stay whole instead of becoming "can not" and "gon na".
+PUNCTUATION_TABLE = str.maketrans("", "", string.punctuation)
+TOKEN_RE = re.compile(r"\S+")
+MIN_KEYWORD_LENGTH = 3
+
+_stopwords = None
+_stopwords_lock = threading.Lock()
+
+
+def stopwords():
+    global _stopwords
+    if _stopwords is None:
+        with _stopwords_lock:
+            if _stopwords is None:
+                startup.ensure_nltk_data('stopwords')
+                import nltk
+                _stopwords = frozenset(nltk.corpus.stopwords.words('english'))
+    return _stopwords
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.translate(PUNCTUATION_TABLE).lower())
+
+
+def is_keyword(token, stop):
+    return len(token) >= MIN_KEYWORD_LENGTH and token not in stop
+
+
+def extract_keywords(text):
+    stop = stopwords()
+    return frozenset(token for token in tokenize(text) if is_keyword(token, stop))
+
+
+# Keywords of one text with their term frequencies and token positions, built once per text
+class KeywordIndex:
+    def __init__(self, text):
+        stop = stopwords()
+        self.word_count = len(text.split())
+        self.tf = {}
+        self.positions = {}
+        for position, token in enumerate(tokenize(text)):
+            if is_keyword(token, stop):
+                self.tf[token] = self.tf.get(token, 0) + 1
+                self.positions.setdefault(token, []).append(position)
+        self.keywords = frozenset(self.tf)
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def __contains__(self, term):
+        return term in self.keywords
+
+    # Most frequent first, then in order of first appearance
+    def ranked(self, terms):
+        return sorted(terms, key=lambda term: (-self.tf[term], self.positions[term][0]))
+
+    # Reference keywords the other text never used
+    def missing(self, other):
+        return self.ranked(self.keywords - other.keywords)
+
+    # Keywords of this text absent from the reference
+    def extra(self, reference):
+        return self.ranked(self.keywords - reference.keywords)
+
+    def coverage(self, other):
+        return len(self.keywords & other.keywords) / len(self.keywords) if self.keywords else 0.0
@@ -0,0 +1,87 @@
+import os
+import streamlit as st
+import tracing
+import startup
+import session_memory
+
+# ✅ Hidden admin page (/metrics): per-stage latency from the in-process histograms. Anyone with the
+# URL can read it; resetting the metrics needs METRICS_ADMIN_ACTIONS=1 on the server.
+ADMIN_ACTIONS = os.environ.get("METRICS_ADMIN_ACTIONS") == "1"
+
+st.title("📊 Stage Latency")
+
+snapshot = tracing.snapshot()
+if not snapshot:
+    st.info("No spans recorded yet. Use the practice pages to generate traffic.")
+else:
+    rows = [
+        {
+            "stage": stage,
+            "count": s["count"],
+            "errors": s["errors"],
+            "p50 ms": round(s["p50_s"] * 1000, 1),
+            "p95 ms": round(s["p95_s"] * 1000, 1),
+            "p99 ms": round(s["p99_s"] * 1000, 1),
+            "max ms": round(s["max_s"] * 1000, 1),
+        }
+        for stage, s in snapshot.items()
+    ]
+    st.dataframe(rows, hide_index=True, width="stretch")
+
+# ✅ Same data for scrapers and scripts
+exporter = tracing.exporter()
+if exporter and exporter.get("port"):
+    st.write(f"JSON: `http://127.0.0.1:{exporter['port']}/metrics.json` · Prometheus: `http://127.0.0.1:{exporter['port']}/metrics`")
+if exporter and exporter.get("path"):
+    st.write(f"Prometheus text file: `{exporter['path']}`")
+
+col1, col2, col3 = st.columns(3)
+col1.download_button("⬇️ JSON", tracing.to_json(), file_name="metrics.json", mime="application/json")
+col2.download_button("⬇️ Prometheus", tracing.to_prometheus(), file_name="metrics.prom", mime="text/plain")
+if ADMIN_ACTIONS and col3.button("🔄 Reset"):
+    tracing.reset()
+    st.rerun()
+
+if not tracing.ENABLED:
+    st.warning("Tracing is disabled (TRACING=0).")
+
+# ✅ Memory budget: what the shared resources cost once per process, and what each session adds
+st.header("🧠 Memory")
+
+for name, obj in startup.loaded().items():
+    session_memory.share(name, obj)  # ✅ Models and pools warmed up by app.py
+memory = session_memory.report()
+mb = 2 ** 20
+sessions = memory["sessions"]
+per_session = sorted(s["heap_bytes"] for s in sessions)[len(sessions) // 2] if sessions else 0
+
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Process RSS", f"{memory['rss_bytes'] / mb:.0f} MB")
+col2.metric("Shared resources", f"{memory['shared_bytes'] / mb:.1f} MB")
+col3.metric("Sessions", len(sessions), f"{memory['session_bytes'] / mb:.2f} MB in total", delta_color="off")
+col4.metric("Per session (median)", f"{per_session / 1024:.1f} KB")
+
+st.dataframe([
+    {"resource": r["resource"], "type": r["type"], "heap MB": round(r["heap_bytes"] / mb, 2),
+     "mapped MB": round(r["mapped_bytes"] / mb, 2)}
+    for r in sorted(memory["resources"], key=lambda r: -r["heap_bytes"])
+], hide_index=True, width="stretch")
+st.caption("Shared objects are counted once, under the first resource that reaches them. Mapped files are paged in by the OS "
+           "and shared between worker processes.")
+
+if sessions:
+    st.dataframe([
+        {"session": s["session"], "idle s": s["idle_s"], "measured s ago": s["measured_s"], "resets": s["resets"],
+         "KB": round(s["heap_bytes"] / 1024, 1), "keys": s["keys"], "largest": s["largest"]}
+        for s in sorted(sessions, key=lambda s: -s["heap_bytes"])
+    ], hide_index=True, width="stretch")
+st.caption(f"Each session measures the state it holds when it next runs, at most every {memory['measure_seconds']} s; "
+           "shared resources are re-measured as often.")
+
+if memory["idle_minutes"] > 0:
+    st.write(f"Sessions idle for {memory['idle_minutes']:g} minutes (SESSION_IDLE_MINUTES) start over on their next run: "
+             f"{memory['resets']} so far.")
+else:
+    st.write("Idle sessions are not reset (SESSION_IDLE_MINUTES=0).")
+st.caption("Resetting is not a memory limit: an idle tab left open keeps its state until it runs again. Closed tabs are "
+           "freed by Streamlit once disconnected for server.disconnectedSessionTTL.")
@@ -0,0 +1,122 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import speech_recognition as sr
+
+PENDING = "pending"
+RECORDING = "recording"
+SCORED = "scored"
+
+
+# One practice sentence: pending -> recording -> scored. Many are kept per session, so a
+# task is a slotted record; with texts (row id -> sentence) it holds a row of a shared
+# corpus instead of its own copy of the sentence.
+class SentenceTask:
+    __slots__ = ("item", "emotion", "allowed_time", "state", "text", "speaking_time", "partial",
+                 "future", "attempts", "texts")
+
+    def __init__(self, item, emotion, allowed_time, texts=None):
+        self.item = item
+        self.texts = texts
+        self.emotion = emotion
+        self.allowed_time = allowed_time
+        self.state = PENDING
+        self.text = None
+        self.speaking_time = None
+        self.partial = None
+        self.future = None
+        self.attempts = 0  # bumped on retry, so a fresh recorder is shown
+
+    @property
+    def sentence(self):
+        return self.texts(self.item) if self.texts else self.item
+
+
+# Practice sentences worked through in order. Only the active (first unscored) sentence
+# records; capture runs on the executor (or the speech pool, for uploads) so the script
+# thread never blocks on audio. on_scored(task) is called once per scored attempt. Items are
+# (sentence, emotion, allowed time), or (row, emotion, allowed time) with texts(row) -> sentence.
+class PracticeSession:
+    def __init__(self, items, executor, on_scored=None, texts=None):
+        self.tasks = [SentenceTask(*item, texts=texts) for item in items]
+        self.executor = executor
+        self.on_scored = on_scored
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        for i, task in enumerate(self.tasks):
+            if task.state != SCORED:
+                return i
+        return None
+
+    @property
+    def done(self):
+        return self.active is None
+
+    # Start recording the active sentence; capture_fn(timeout, on_partial) returns a speech_stream.Utterance
+    def start(self, capture_fn):
+        def submit(task):
+            def on_partial(text):
+                task.partial = text
+            return self.executor.submit(capture_fn, timeout=task.allowed_time, on_partial=on_partial)
+        return self._begin(submit)
+
+    # Score an answer recorded elsewhere (browser upload); future resolves to a speech_stream.Utterance
+    def start_with(self, future):
+        return self._begin(lambda task: future)
+
+    def _begin(self, make_future):
+        i = self.active
+        if i is None:
+            return None
+        task = self.tasks[i]
+        with self._lock:
+            if task.state == PENDING:
+                task.state = RECORDING
+                task.partial = None
+                task.future = make_future(task)
+        return task
+
+    # Move finished captures to scored; returns True if any sentence changed state
+    def poll(self):
+        scored = []
+        with self._lock:
+            for task in self.tasks:
+                if task.state == RECORDING and task.future.done():
+                    task.text, task.speaking_time = _outcome(task.future)
+                    task.state = SCORED
+                    task.future = None
+                    scored.append(task)
+        if self.on_scored:
+            for task in scored:
+                self.on_scored(task)
+        return bool(scored)
+
+    # Send a scored sentence back to pending so it can be recorded again
+    def retry(self, i):
+        with self._lock:
+            task = self.tasks[i]
+            if task.state == SCORED and not any(t.state == RECORDING for t in self.tasks):
+                task.state = PENDING
+                task.text = task.speaking_time = task.partial = None
+                task.attempts += 1
+
+
+def _outcome(future):
+    try:
+        utterance = future.result()
+        return utterance.text, round(utterance.duration, 2)
+    except sr.WaitTimeoutError:
+        return "Error: No speech detected", None
+    except sr.UnknownValueError:
+        return "Error: Could not understand speech", None
+    except sr.RequestError:
+        return "Error: Speech recognition service unavailable", None
+    except Exception as e:
+        return f"Error: {e}", None
+
+
+# Capture is serialized by the audio service anyway; one worker keeps sessions in order
+def make_executor():
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="practice-capture")
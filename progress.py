@@ -0,0 +1,64 @@
+import time
+import streamlit as st
+from results_store import get_results, current_learner
+
+PAGE_NAMES = {
+    "fluency": "🗣️ Fluency Practice",
+    "emotion": "🎭 Emotion-Based Speaking",
+    "single_word": "💡 Single Word Spark",
+    "sentence": "📝 Sentence Speech Challenge",
+}
+
+results = get_results()
+
+# ✅ Progress from the precomputed totals: a few rows per learner however many attempts are stored
+st.title("📈 My Progress")
+learner = current_learner()
+st.write(f"Learner: **{learner}**")
+
+results.flush()  # ✅ Include the answers given moments ago
+totals = results.totals(learner)
+if not totals:
+    st.info("No attempts saved yet. Practice on any page and your results will appear here.")
+    st.stop()
+
+for page, total in totals.items():
+    st.subheader(PAGE_NAMES.get(page, page))
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Attempts", total["attempts"])
+    if total["accuracy"] is not None:
+        col2.metric("Recent accuracy", f"{total['accuracy_rolling'] * 100:.0f}%",
+                    delta=f"{(total['accuracy_rolling'] - total['accuracy']) * 100:+.0f}% vs overall")
+    if total["wpm"] is not None:
+        col3.metric("Recent words/min", f"{total['wpm_rolling']:.0f}",
+                    delta=f"{total['wpm_rolling'] - total['wpm']:+.0f} vs overall")
+    if total["points"]:
+        col4.metric("Points", total["points"])
+
+# ✅ Daily accuracy over the last 30 days
+daily = results.daily(learner)
+if daily:
+    chart = {}
+    for row in daily:
+        if row["accuracy"] is not None:
+            chart.setdefault(row["day"], {})[PAGE_NAMES.get(row["page"], row["page"])] = round(row["accuracy"] * 100, 1)
+    if chart:
+        st.subheader("📅 Daily Accuracy (%)")
+        st.line_chart([{"day": day, **values} for day, values in chart.items()], x="day")
+
+# ✅ Words missed most often across all pages
+errors = results.top_errors(learner)
+if errors:
+    st.subheader("🧩 Words to Practice")
+    st.dataframe({"Word": [w for w, _ in errors], "Times missed": [n for _, n in errors]}, hide_index=True, width="stretch")
+
+recent = results.recent(learner)
+if recent:
+    st.subheader("🕘 Recent Attempts")
+    st.dataframe([{
+        "When": time.strftime("%Y-%m-%d %H:%M", time.localtime(row["ts"])),
+        "Page": PAGE_NAMES.get(row["page"], row["page"]),
+        "Item": row["item"],
+        "You said": row["answer"],
+        "Accuracy %": None if row["accuracy"] is None else round(row["accuracy"] * 100, 1),
+    } for row in recent], hide_index=True, width="stretch")
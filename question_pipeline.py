@@ -0,0 +1,201 @@
+import asyncio
+import os
+import random
+import string
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import tracing
+from sentence_reservoir import RETRY_STATUS, make_session
+
+# Point this at a local stand-in (see benchmarks/fake_services.py) to run offline
+DATAMUSE_API_URL = os.environ.get("DATAMUSE_API_URL", "https://api.datamuse.com/words")
+
+
+# A Datamuse question; slotted, as every session keeps a quiz of them
+class Question:
+    __slots__ = ("word", "answer", "synonyms")
+
+    def __init__(self, word, answer, synonyms):
+        self.word = word
+        self.answer = answer
+        self.synonyms = synonyms
+
+    @property
+    def question(self):
+        return f"What is another word for '{self.word}'?"
+
+
+# Questions of one quiz in the order they became ready. The pipeline appends from its
+# event loop; the page reads with get(i), which waits only for question i.
+class QuizStream:
+    def __init__(self, amount):
+        self.amount = amount
+        self.questions = []
+        self.finished = False
+        self.started = time.perf_counter()
+        self.first_ready = None
+        self._cond = threading.Condition()
+
+    # A quiz whose questions are already known (the offline synonym bank)
+    @classmethod
+    def ready(cls, questions):
+        stream = cls(len(questions))
+        for question in questions:
+            stream._put(question)
+        stream._finish()
+        return stream
+
+    def _put(self, question):
+        with self._cond:
+            if self.first_ready is None:
+                self.first_ready = time.perf_counter() - self.started
+            self.questions.append(question)
+            self._cond.notify_all()
+
+    def _finish(self):
+        with self._cond:
+            self.finished = True
+            self._cond.notify_all()
+
+    # Question i, waiting up to timeout for it; None if the quiz ended with fewer questions
+    def get(self, i, timeout=30):
+        with self._cond:
+            self._cond.wait_for(lambda: len(self.questions) > i or self.finished, timeout)
+            return self.questions[i] if i < len(self.questions) else None
+
+    # Every question, waiting up to timeout for the rest
+    def wait(self, timeout=30):
+        with self._cond:
+            self._cond.wait_for(lambda: self.finished, timeout)
+            return list(self.questions)
+
+    @property
+    def complete(self):
+        return self.finished and len(self.questions) >= self.amount
+
+
+# Datamuse synonym questions from an asyncio loop on a background thread. Blocking
+# requests calls run on a small executor over one keep-alive connection pool; the word
+# lists per letter are fetched once per process and shared, and every question of a quiz
+# is generated concurrently, so the first question is ready after about two round-trips.
+class QuestionPipeline:
+    def __init__(self, api_url=DATAMUSE_API_URL, concurrency=8, words_per_letter=50, synonyms_per_word=10,
+                 attempts_per_question=10, max_retries=2, backoff=0.25, request_timeout=10, session=None):
+        self.api_url = api_url
+        self.concurrency = concurrency
+        self.words_per_letter = words_per_letter
+        self.synonyms_per_word = synonyms_per_word
+        self.attempts_per_question = attempts_per_question
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.request_timeout = request_timeout
+        self.session = session or make_session(concurrency)
+        self._executor = ThreadPoolExecutor(concurrency, thread_name_prefix="datamuse")
+        self._word_lists = {}  # letter -> asyncio.Task, only touched on the loop thread
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "retries": 0, "failures": 0, "questions": 0, "quizzes": 0}
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, name="question-pipeline", daemon=True).start()
+
+    # Start generating a quiz; returns at once with a stream the questions arrive in
+    def quiz(self, amount, seed=None):
+        stream = QuizStream(amount)
+        self._count("quizzes")
+        asyncio.run_coroutine_threadsafe(self._fill(stream, random.Random(seed)), self._loop)
+        return stream
+
+    def close(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.stats[key] += n
+
+    async def _fill(self, stream, rng):
+        used = set()
+        try:
+            tasks = [asyncio.ensure_future(self._question(rng, used)) for _ in range(stream.amount)]
+            for next_done in asyncio.as_completed(tasks):
+                question = await next_done
+                if question is not None:
+                    if not stream.questions and tracing.ENABLED:
+                        tracing.histogram("datamuse_first_question").record(time.perf_counter() - stream.started)
+                    self._count("questions")
+                    stream._put(question)
+        finally:
+            stream._finish()
+
+    # One question: a word from a random letter's list, then its synonyms. A word without
+    # synonyms is skipped for another word from the already fetched list.
+    async def _question(self, rng, used):
+        for _ in range(self.attempts_per_question):
+            letter = rng.choice(string.ascii_lowercase)
+            try:
+                words = await self._words(letter)
+            except requests.RequestException:
+                continue
+            candidates = [w for w in words if w not in used]
+            if not candidates:
+                continue
+            word = rng.choice(candidates)
+            used.add(word)
+            try:
+                synonyms = await self._fetch({"rel_syn": word, "max": self.synonyms_per_word})
+            except requests.RequestException:
+                continue
+            if synonyms:
+                return Question(word, rng.choice(synonyms)["word"].lower(), tuple(s["word"].lower() for s in synonyms))
+        return None
+
+    async def _words(self, letter):
+        task = self._word_lists.get(letter)
+        if task is None:
+            task = self._word_lists[letter] = asyncio.ensure_future(
+                self._fetch({"sp": f"{letter}*", "max": self.words_per_letter}))
+        try:
+            words = await task
+        except requests.RequestException:
+            if self._word_lists.get(letter) is task:
+                del self._word_lists[letter]  # fetched again by the next question that draws it
+            raise
+        return [w["word"] for w in words]
+
+    async def _fetch(self, params):
+        return await self._loop.run_in_executor(self._executor, self._get, params)
+
+    # GET with bounded retries and jittered exponential backoff, like the sentence reservoir
+    def _get(self, params):
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count("retries")
+                time.sleep(self.backoff * (2 ** (attempt - 1)) * (1 + random.random()))
+            self._count("requests")
+            try:
+                with tracing.span("datamuse_http"):
+                    resp = self.session.get(self.api_url, params=params, timeout=self.request_timeout)
+            except requests.RequestException:
+                continue
+            if resp.status_code == 200:
+                return resp.json()
+            if resp.status_code not in RETRY_STATUS:
+                break
+        self._count("failures")
+        raise requests.RequestException(f"Datamuse request failed after {attempt + 1} attempts")
+
+
+_pipelines = {}
+_pipelines_lock = threading.Lock()
+
+
+# One pipeline (loop, executor and connection pool) per API URL per process
+def get_pipeline(api_url=DATAMUSE_API_URL, **kwargs):
+    with _pipelines_lock:
+        pipeline = _pipelines.get(api_url)
+        if pipeline is None:
+            pipeline = _pipelines[api_url] = QuestionPipeline(api_url, **kwargs)
+        return pipeline
@@ -0,0 +1,15 @@
+# Single Word Spark points for an answer's similarity to the expected synonym, in percent.
+# Kept free of Streamlit so the parity harness can import it without running the page.
+def score_relevance(relevance):
+    if relevance >= 90:
+        return 15
+    elif relevance >= 80:
+        return 10
+    elif relevance >= 70:
+        return 8
+    elif relevance >= 60:
+        return 5
+    elif relevance >= 50:
+        return 3
+    else:
+        return 0
@@ -0,0 +1,307 @@
+import argparse
+import atexit
+import collections
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_PATH = os.environ.get("RESULTS_DB") or os.path.join(".cache", "results.db")
+ROLLING = 0.2  # weight of the newest attempt in the rolling averages, roughly the last 10 attempts
+HISTORY_DAYS = 30
+
+log = logging.getLogger(__name__)
+
+# attempts is the append-only log; totals, daily and word_errors are maintained as each batch
+# lands, so the progress page reads a handful of rows however long the history is
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    learner TEXT NOT NULL,
+    page TEXT NOT NULL,
+    item TEXT,
+    answer TEXT,
+    accuracy REAL,
+    wpm REAL,
+    seconds REAL,
+    points INTEGER
+);
+CREATE INDEX IF NOT EXISTS attempts_by_learner ON attempts (learner, id);
+CREATE TABLE IF NOT EXISTS totals (
+    learner TEXT NOT NULL,
+    page TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    accuracy_n INTEGER NOT NULL,
+    accuracy_sum REAL NOT NULL,
+    accuracy_rolling REAL,
+    wpm_n INTEGER NOT NULL,
+    wpm_sum REAL NOT NULL,
+    wpm_rolling REAL,
+    points INTEGER NOT NULL,
+    last_ts REAL NOT NULL,
+    PRIMARY KEY (learner, page)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS daily (
+    learner TEXT NOT NULL,
+    day TEXT NOT NULL,
+    page TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    accuracy_n INTEGER NOT NULL,
+    accuracy_sum REAL NOT NULL,
+    points INTEGER NOT NULL,
+    PRIMARY KEY (learner, day, page)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS word_errors (
+    learner TEXT NOT NULL,
+    word TEXT NOT NULL,
+    errors INTEGER NOT NULL,
+    PRIMARY KEY (learner, word)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS word_errors_top ON word_errors (learner, errors DESC);
+"""
+
+TOTAL_COLUMNS = ("attempts", "accuracy_n", "accuracy_sum", "accuracy_rolling",
+                 "wpm_n", "wpm_sum", "wpm_rolling", "points", "last_ts")
+
+
+def _rolling(current, value):
+    if value is None:
+        return current
+    return value if current is None else current + ROLLING * (value - current)
+
+
+def _day(ts):
+    return time.strftime("%Y-%m-%d", time.localtime(ts))
+
+
+# Append-only attempt log in SQLite (WAL) with incrementally maintained aggregates. record() only
+# appends to an in-memory buffer; a writer thread commits the buffer every flush_interval seconds,
+# or as soon as batch_size attempts are waiting, in one transaction.
+class ResultsStore:
+    def __init__(self, path=DEFAULT_PATH, flush_interval=0.5, batch_size=1000):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=10, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")  # durable at checkpoints; a crash loses at most the last commits
+        self._db.executescript(SCHEMA)
+        self._pending = collections.deque()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._readers = threading.local()
+        self.stats = {"recorded": 0, "flushed": 0, "batches": 0, "flush_seconds": 0.0, "failures": 0,
+                      "dropped": 0}
+        self._writer = threading.Thread(target=self._run, name="results-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    # Request-thread cost: one list append. errors are the words the learner got wrong.
+    def record(self, learner, page, item=None, answer=None, accuracy=None, wpm=None, seconds=None,
+               points=None, errors=(), ts=None):
+        row = (ts or time.time(), learner, page, item, answer, accuracy, wpm, seconds, points,
+               tuple(word.lower() for word in errors))
+        with self._lock:
+            self._pending.append(row)
+            self.stats["recorded"] += 1
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                while self.flush(self.batch_size):
+                    pass
+            except Exception:
+                # The batch went back to the buffer (sqlite errors) and is retried next round; the
+                # writer never stops, or record() would buffer forever
+                self.stats["failures"] += 1
+                log.exception("results writer: flush failed, retrying in %s s", self.flush_interval)
+
+    # Commit up to `limit` buffered attempts (all by default) in one transaction; returns how many.
+    # A database error puts the batch back and raises. An attempt _apply cannot handle (say a
+    # non-numeric accuracy) is found by committing the batch row by row, and dropped.
+    def flush(self, limit=None):
+        with self._write_lock:
+            with self._lock:
+                batch = [self._pending.popleft() for _ in range(min(len(self._pending), limit or len(self._pending)))]
+            if not batch:
+                return 0
+            start = time.perf_counter()
+            saved = len(batch)
+            try:
+                self._commit(batch)
+            except sqlite3.Error:
+                self._requeue(batch)
+                raise
+            except Exception:
+                self.stats["failures"] += 1
+                log.exception("results writer: batch of %d could not be applied, saving row by row", len(batch))
+                for i, row in enumerate(batch):
+                    try:
+                        self._commit([row])
+                    except sqlite3.Error:
+                        self._requeue(batch[i:])
+                        raise
+                    except Exception:
+                        saved -= 1
+                        self.stats["dropped"] += 1
+                        log.exception("results writer: dropped attempt %r", row)
+            self.stats["flushed"] += saved
+            self.stats["batches"] += 1
+            self.stats["flush_seconds"] += time.perf_counter() - start
+            return len(batch)
+
+    def _commit(self, batch):
+        try:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._apply(batch)
+            self._db.execute("COMMIT")
+        except BaseException:
+            if self._db.in_transaction:
+                self._db.execute("ROLLBACK")
+            raise
+
+    def _requeue(self, batch):
+        with self._lock:
+            self._pending.extendleft(reversed(batch))
+
+    def _apply(self, batch):
+        db = self._db
+        db.executemany("INSERT INTO attempts (ts, learner, page, item, answer, accuracy, wpm, seconds, points) "
+                       "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", [row[:9] for row in batch])
+
+        totals = {}
+        daily = {}
+        errors = collections.Counter()
+        for ts, learner, page, _, _, accuracy, wpm, _, points, words in batch:
+            key = (learner, page)
+            total = totals.get(key)
+            if total is None:
+                found = db.execute(f"SELECT {', '.join(TOTAL_COLUMNS)} FROM totals WHERE learner = ? AND page = ?",
+                                   key).fetchone()
+                total = totals[key] = list(found or (0, 0, 0.0, None, 0, 0.0, None, 0, ts))
+            total[0] += 1
+            if accuracy is not None:
+                total[1] += 1
+                total[2] += accuracy
+                total[3] = _rolling(total[3], accuracy)
+            if wpm is not None:
+                total[4] += 1
+                total[5] += wpm
+                total[6] = _rolling(total[6], wpm)
+            total[7] += points or 0
+            total[8] = max(total[8], ts)
+
+            day = daily.setdefault((learner, _day(ts), page), [0, 0, 0.0, 0])
+            day[0] += 1
+            if accuracy is not None:
+                day[1] += 1
+                day[2] += accuracy
+            day[3] += points or 0
+            for word in words:
+                errors[learner, word] += 1
+
+        db.executemany(f"INSERT OR REPLACE INTO totals (learner, page, {', '.join(TOTAL_COLUMNS)}) "
+                       f"VALUES ({', '.join('?' * (len(TOTAL_COLUMNS) + 2))})",
+                       [(*key, *total) for key, total in totals.items()])
+        db.executemany("INSERT INTO daily VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (learner, day, page) DO UPDATE SET "
+                       "attempts = attempts + excluded.attempts, accuracy_n = accuracy_n + excluded.accuracy_n, "
+                       "accuracy_sum = accuracy_sum + excluded.accuracy_sum, points = points + excluded.points",
+                       [(*key, *day) for key, day in daily.items()])
+        db.executemany("INSERT INTO word_errors VALUES (?, ?, ?) ON CONFLICT (learner, word) DO UPDATE SET "
+                       "errors = errors + excluded.errors",
+                       [(*key, count) for key, count in errors.items()])
+
+    # One read-only connection per reading thread; WAL readers never wait for the writer
+    def _reader(self):
+        db = getattr(self._readers, "db", None)
+        if db is None:
+            db = self._readers.db = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, timeout=10)
+            db.row_factory = sqlite3.Row
+        return db
+
+    # Per page: attempts, mean and rolling accuracy/WPM, points
+    def totals(self, learner):
+        rows = self._reader().execute("SELECT * FROM totals WHERE learner = ? ORDER BY page", (learner,))
+        return {row["page"]: {
+            "attempts": row["attempts"],
+            "accuracy": row["accuracy_sum"] / row["accuracy_n"] if row["accuracy_n"] else None,
+            "accuracy_rolling": row["accuracy_rolling"],
+            "wpm": row["wpm_sum"] / row["wpm_n"] if row["wpm_n"] else None,
+            "wpm_rolling": row["wpm_rolling"],
+            "points": row["points"],
+            "last_ts": row["last_ts"],
+        } for row in rows}
+
+    # Attempts and mean accuracy per day and page, for the last `days` days
+    def daily(self, learner, days=HISTORY_DAYS):
+        since = _day(time.time() - days * 86400)
+        rows = self._reader().execute(
+            "SELECT day, page, attempts, accuracy_sum / NULLIF(accuracy_n, 0) AS accuracy, points "
+            "FROM daily WHERE learner = ? AND day > ? ORDER BY day", (learner, since))
+        return [dict(row) for row in rows]
+
+    def top_errors(self, learner, limit=10):
+        rows = self._reader().execute(
+            "SELECT word, errors FROM word_errors WHERE learner = ? ORDER BY errors DESC LIMIT ?", (learner, limit))
+        return [(row["word"], row["errors"]) for row in rows]
+
+    def recent(self, learner, limit=10):
+        rows = self._reader().execute(
+            "SELECT ts, page, item, answer, accuracy, wpm, points FROM attempts WHERE learner = ? "
+            "ORDER BY id DESC LIMIT ?", (learner, limit))
+        return [dict(row) for row in rows]
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._writer.join(timeout=5)
+        self.flush()
+        self._db.close()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+# One store (and writer thread) per database file per process, shared by every page
+def get_results(path=DEFAULT_PATH, **kwargs):
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = ResultsStore(path, **kwargs)
+        return store
+
+
+# The learner's name travels in the URL (?learner=...), so it survives a refresh
+def current_learner():
+    import streamlit as st
+    return st.query_params.get("learner") or "guest"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Practice results store")
+    parser.add_argument("--db", default=DEFAULT_PATH)
+    parser.add_argument("learner", help="show this learner's progress")
+    args = parser.parse_args()
+    store = ResultsStore(args.db)
+    for page, total in store.totals(args.learner).items():
+        print(page, total)
+    print("top errors:", store.top_errors(args.learner))
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import argparse
+import json
+import os
+
+import numpy as np
+
+from atomic_files import file_lock, save_array, write_bytes
+from emotion_scorer import EMOTIONS, emotion_label
+
+DEFAULT_INDEX_DIR = os.path.join(".cache", "sentences")
+DEFAULT_SOURCES = ("austen-emma.txt", "austen-persuasion.txt", "austen-sense.txt")
+WORDS_PER_SECOND = 3  # same reading speed as calculate_speaking_time()
+MAX_SPEAKING_TIME = 15
+TIME_STEP = 0.5  # resolution of the speaking-time bins
+TIME_EDGES = np.arange(0, MAX_SPEAKING_TIME + TIME_STEP, TIME_STEP)
+MIN_WORDS = 4
+MAX_WORDS = 40
+SENTENCE_END = (".", "!", "?", '"', "'")
+
+
+# What calculate_speaking_time() returns for a sentence with this many tokens
+def speaking_time(token_count):
+    return min(token_count / WORDS_PER_SECOND, MAX_SPEAKING_TIME)
+
+
+# One line of text, or None for headings, fragments and very long sentences
+def clean_sentence(sentence):
+    text = " ".join(sentence.split())
+    if text.count('"') % 2:
+        text = " ".join(text.replace('"', " ").split())  # a quote opened or closed in another sentence
+    words = text.split()
+    if not MIN_WORDS <= len(words) <= MAX_WORDS or not text.endswith(SENTENCE_END):
+        return None
+    if "[" in text or text.isupper() or not text[0].isalpha() and text[0] != '"':
+        return None
+    return text
+
+
+# Real corpus sentences sorted by (emotion, speaking time), memory-mapped:
+#   text.bin + text_offsets.npy    sentences, UTF-8
+#   polarity.npy                   TextBlob polarity, float32
+#   time.npy                       speaking time in seconds, float32
+#   emotion_offsets.npy            sentences of EMOTIONS[e] are [emotion_offsets[e], emotion_offsets[e + 1])
+#   time_offsets.npy               (emotion, bin): end of the sentences of that emotion taking at
+#                                  most TIME_EDGES[bin] seconds
+# An (emotion, max time) filter is two table reads; drawing n sentences is n random row numbers.
+class SentenceIndex:
+    def __init__(self, directory=DEFAULT_INDEX_DIR):
+        self.directory = directory
+        with open(self._path("meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.count = self.meta["count"]
+        self._text = np.memmap(self._path("text.bin"), dtype=np.uint8, mode="r") if self.count else b""
+        self._text_offsets = np.load(self._path("text_offsets.npy"), mmap_mode="r")
+        self.polarity = np.load(self._path("polarity.npy"), mmap_mode="r")
+        self.times = np.load(self._path("time.npy"), mmap_mode="r")
+        self.emotion_offsets = np.load(self._path("emotion_offsets.npy"))
+        self.time_offsets = np.load(self._path("time_offsets.npy"))
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def __len__(self):
+        return self.count
+
+    def text(self, i):
+        return bytes(self._text[self._text_offsets[i]:self._text_offsets[i + 1]]).decode("utf-8")
+
+    # Row range [start, end) of one emotion's sentences that take at most max_time seconds
+    def range(self, emotion, max_time=None):
+        e = EMOTIONS.index(emotion)
+        start = int(self.emotion_offsets[e])
+        if max_time is None or max_time >= MAX_SPEAKING_TIME:
+            return start, int(self.emotion_offsets[e + 1])
+        k = int(np.floor(max_time / TIME_STEP + 1e-9))
+        return start, int(self.time_offsets[e, max(k, 0)])
+
+    def count_matching(self, emotions=None, max_time=None):
+        return sum(end - start for start, end in (self.range(e, max_time) for e in emotions or EMOTIONS))
+
+    # Up to n distinct sentences matching the filter, as (row, emotion, speaking time); text(row)
+    # reads a sentence from the mapped file, so sessions can keep rows instead of strings
+    def sample_rows(self, n, emotions=None, max_time=None, rng=None):
+        rng = rng if rng is not None else np.random.default_rng()
+        emotions = list(emotions or EMOTIONS)
+        ranges = [self.range(e, max_time) for e in emotions]
+        sizes = np.array([end - start for start, end in ranges], dtype=np.int64)
+        bounds = np.concatenate(([0], np.cumsum(sizes)))
+        total = int(bounds[-1])
+        if not total:
+            return []
+        picks = rng.choice(total, size=min(n, total), replace=False)
+        which = np.searchsorted(bounds, picks, "right") - 1
+        rows = np.array([ranges[w][0] for w in which.tolist()], dtype=np.int64) + picks - bounds[which]
+        return [(i, emotions[w], float(self.times[i])) for i, w in zip(rows.tolist(), which.tolist())]
+
+    # Same, as (sentence, emotion, speaking time)
+    def sample(self, n, emotions=None, max_time=None, rng=None):
+        return [(self.text(i), emotion, t) for i, emotion, t in self.sample_rows(n, emotions, max_time, rng)]
+
+
+# Score and sort sentences once, then write the columns; meta.json goes last so a reader
+# never opens a half-written index. Builds into one directory are serialized by a lock file.
+def build(sentences, directory=DEFAULT_INDEX_DIR, sources=()):
+    os.makedirs(directory, exist_ok=True)
+    with file_lock(os.path.join(directory, "build.lock")):
+        return _build_locked(sentences, directory, sources)
+
+
+def _build_locked(sentences, directory, sources):
+    import nltk
+    from textblob import TextBlob
+
+    texts = list(dict.fromkeys(s for s in map(clean_sentence, sentences) if s))
+    polarity = np.array([TextBlob(t).sentiment.polarity for t in texts], dtype=np.float32)
+    times = np.array([speaking_time(len(nltk.word_tokenize(t))) for t in texts], dtype=np.float32)
+    emotions = np.array([EMOTIONS.index(emotion_label(p)) for p in polarity.tolist()], dtype=np.int8)
+
+    order = np.lexsort((times, emotions))
+    texts = [texts[i] for i in order.tolist()]
+    polarity, times, emotions = polarity[order], times[order], emotions[order]
+
+    emotion_offsets = np.searchsorted(emotions, np.arange(len(EMOTIONS) + 1), "left").astype(np.int64)
+    time_offsets = np.empty((len(EMOTIONS), len(TIME_EDGES)), dtype=np.int64)
+    for e in range(len(EMOTIONS)):
+        start, end = emotion_offsets[e], emotion_offsets[e + 1]
+        time_offsets[e] = start + np.searchsorted(times[start:end], TIME_EDGES.astype(np.float32), "right")
+
+    encoded = [t.encode("utf-8") for t in texts]
+    text_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=text_offsets[1:])
+
+    meta_path = os.path.join(directory, "meta.json")
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    write_bytes(os.path.join(directory, "text.bin"), b"".join(encoded))
+    for name, array in (("text_offsets", text_offsets), ("polarity", polarity), ("time", times),
+                        ("emotion_offsets", emotion_offsets), ("time_offsets", time_offsets)):
+        save_array(os.path.join(directory, f"{name}.npy"), array)
+    write_bytes(meta_path, json.dumps({
+        "count": len(texts), "sources": list(sources), "time_step": TIME_STEP,
+        "per_emotion": {e: int(emotion_offsets[i + 1] - emotion_offsets[i]) for i, e in enumerate(EMOTIONS)}}).encode("utf-8"))
+    return SentenceIndex(directory)
+
+
+# Sentences of NLTK Gutenberg texts, split by the punkt sentence tokenizer
+def gutenberg_sentences(fileids=DEFAULT_SOURCES):
+    from startup import ensure_nltk_data
+    ensure_nltk_data('gutenberg', 'punkt')
+    import nltk
+    from nltk.corpus import gutenberg
+    for fileid in fileids:
+        yield from nltk.sent_tokenize(gutenberg.raw(fileid))
+
+
+def _open_built(directory, sources):
+    try:
+        index = SentenceIndex(directory)
+    except OSError:
+        return None
+    return index if index.meta["sources"] == list(sources) else None
+
+
+# Open the index if it was built from these sources, otherwise build it. Every app process runs
+# this at startup: the first builds under the lock, the others wait and open its index.
+def load_or_build(directory=DEFAULT_INDEX_DIR, sources=DEFAULT_SOURCES):
+    index = _open_built(directory, sources)
+    if index is not None:
+        return index
+    os.makedirs(directory, exist_ok=True)
+    with file_lock(os.path.join(directory, "build.lock")):
+        return _open_built(directory, sources) or _build_locked(gutenberg_sentences(sources), directory, sources)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the emotion/speaking-time sentence index")
+    parser.add_argument("sources", nargs="*", default=list(DEFAULT_SOURCES), help="NLTK Gutenberg file ids")
+    parser.add_argument("--all", action="store_true", help="every Gutenberg text NLTK ships")
+    parser.add_argument("--dir", default=DEFAULT_INDEX_DIR)
+    args = parser.parse_args()
+
+    sources = args.sources
+    if args.all:
+        from startup import ensure_nltk_data
+        ensure_nltk_data('gutenberg')
+        from nltk.corpus import gutenberg
+        sources = gutenberg.fileids()
+    index = build(gutenberg_sentences(sources), args.dir, sources)
+    print(f"{len(index)} sentences -> {args.dir}")
+    for emotion, count in index.meta["per_emotion"].items():
+        print(f"  {emotion}: {count}")
+
+
+if __name__ == "__main__":
+    main()
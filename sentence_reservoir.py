@@ -0,0 +1,241 @@
+import collections
+import json
+import os
+import random
+import threading
+import time
+
+import nltk
+import requests
+from requests.adapters import HTTPAdapter
+
+import tracing
+
+# Point this at a local stand-in (see benchmarks/fake_services.py) to run offline
+WIKIPEDIA_API_URL = os.environ.get("WIKIPEDIA_API_URL", "https://en.wikipedia.org/w/api.php")
+USER_AGENT = "SpeechPracticeApp/1.0 (muthusingam539@gmail.com)"
+DEFAULT_SPILL_PATH = os.path.join(".cache", "wikipedia_sentences.json")
+
+# Status codes worth retrying; anything else is treated as a hard failure
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+# Pooled keep-alive session shared by all refill workers
+def make_session(pool_size):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+# Process-wide pool of practice sentences kept full by background workers
+class SentenceReservoir:
+    def __init__(self, api_url=WIKIPEDIA_API_URL, capacity=200, low_water=50, workers=4,
+                 pages_per_request=5, sentences_per_page=5, max_retries=3, backoff=0.5, max_backoff=30,
+                 breaker_threshold=5, breaker_seconds=60, request_timeout=10, spill_path=DEFAULT_SPILL_PATH,
+                 session=None):
+        self.api_url = api_url
+        self.capacity = capacity
+        self.low_water = low_water
+        self.workers = workers
+        self.pages_per_request = pages_per_request
+        self.sentences_per_page = sentences_per_page
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker_threshold = breaker_threshold
+        self.breaker_seconds = breaker_seconds
+        self.request_timeout = request_timeout
+        self.spill_path = spill_path
+        self.session = session or make_session(workers)
+
+        self._sentences = collections.deque()
+        self._cond = threading.Condition()
+        self._refilling = True
+        self._stop = threading.Event()
+        self._threads = []
+        self._last_spill = 0.0
+        self._spill_lock = threading.Lock()
+        self._failures = 0  # consecutive failed refills, across workers
+        self._open_until = 0.0  # circuit breaker: no refills before this monotonic time
+        self._probing = False  # a single refill is trying whether the breaker can close
+        self.stats = {"requests": 0, "retries": 0, "failures": 0, "fetched": 0, "served": 0, "breaker_opens": 0,
+                      "spill_failures": 0}
+
+        self._load_spill()
+
+    def __len__(self):
+        with self._cond:
+            return len(self._sentences)
+
+    def start(self):
+        if self._threads:
+            return self
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"sentence-reservoir-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=self.request_timeout)
+        self._threads = []
+        self.spill()
+
+    # Take up to num_sentences, waiting at most timeout seconds for the workers to catch up
+    def pop(self, num_sentences, timeout=30):
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while len(self._sentences) < num_sentences and not self._stop.is_set():
+                self._refilling = True
+                self._cond.notify_all()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            count = min(num_sentences, len(self._sentences))
+            sentences = [self._sentences.popleft() for _ in range(count)]
+            self.stats["served"] += count
+            if len(self._sentences) < self.low_water:
+                self._refilling = True
+                self._cond.notify_all()
+        return sentences
+
+    # Write the current pool to disk so a restarted process starts warm. One spill at a time per
+    # reservoir; the tmp name is per process for other processes sharing the spill file.
+    def spill(self):
+        if not self.spill_path:
+            return
+        with self._spill_lock:
+            with self._cond:
+                snapshot = list(self._sentences)
+            directory = os.path.dirname(self.spill_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.spill_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.spill_path)
+            self._last_spill = time.monotonic()
+
+    def _load_spill(self):
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return
+        try:
+            with open(self.spill_path, encoding="utf-8") as f:
+                sentences = json.load(f)
+        except (OSError, ValueError):
+            return
+        self._sentences.extend(s for s in sentences[:self.capacity] if isinstance(s, str))
+
+    def _count(self, key):
+        with self._cond:
+            self.stats[key] += 1
+
+    # With the breaker open, refills wait until it has been open breaker_seconds; then one refill
+    # probes the API and the others wait for its outcome. Called with _cond held.
+    def _may_refill(self):
+        if self._failures < self.breaker_threshold:
+            return True
+        if self._probing or time.monotonic() < self._open_until:
+            return False
+        self._probing = True
+        return True
+
+    # Called with _cond held; returns how long the failed worker backs off
+    def _refill_failed(self):
+        self._probing = False
+        self._failures += 1
+        self.stats["failures"] += 1
+        if self._failures >= self.breaker_threshold:
+            self._open_until = time.monotonic() + self.breaker_seconds
+            self.stats["breaker_opens"] += 1
+            self._cond.notify_all()
+            return 0
+        # Capped, jittered exponential backoff per consecutive failure
+        return min(self.max_backoff, self.backoff * 2 ** (self._failures - 1)) * (0.5 + random.random() / 2)
+
+    def _worker(self):
+        while not self._stop.is_set():
+            with self._cond:
+                while not self._stop.is_set() and not (self._refilling and self._may_refill()):
+                    wait = self._open_until - time.monotonic() if self._failures >= self.breaker_threshold else None
+                    self._cond.wait(None if wait is None or self._probing else max(wait, 0.01))
+            if self._stop.is_set():
+                return
+
+            try:
+                sentences = self._fetch_sentences()
+            except Exception:
+                with self._cond:
+                    delay = self._refill_failed()
+                self._stop.wait(delay)
+                continue
+
+            with self._cond:
+                self._probing = False
+                self._failures = 0
+                room = self.capacity - len(self._sentences)
+                self._sentences.extend(sentences[:max(room, 0)])
+                if len(self._sentences) >= self.capacity:
+                    self._refilling = False
+                self.stats["fetched"] += len(sentences)
+                self._cond.notify_all()
+                spill = time.monotonic() - self._last_spill > 5
+                if spill:
+                    self._last_spill = time.monotonic()  # claimed here, so one worker spills
+
+            if spill:
+                try:
+                    self.spill()
+                except OSError:
+                    self._count("spill_failures")
+
+    # One round-trip returns intro extracts for several random articles
+    def _fetch_sentences(self):
+        data = self._get({
+            "action": "query",
+            "format": "json",
+            "generator": "random",
+            "grnnamespace": 0,
+            "grnlimit": self.pages_per_request,
+            "prop": "extracts",
+            "exintro": 1,
+            "explaintext": 1,
+            "exsentences": self.sentences_per_page,
+            "exlimit": "max",
+        })
+        sentences = []
+        for page in data.get("query", {}).get("pages", {}).values():
+            summary = page.get("extract")
+            if summary:
+                sentences.extend(s for s in nltk.tokenize.sent_tokenize(summary) if s.strip())
+        return sentences
+
+    # GET with bounded retries and jittered exponential backoff
+    def _get(self, params):
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count("retries")
+                delay = self.backoff * (2 ** (attempt - 1)) * (1 + random.random())
+                if self._stop.wait(delay):
+                    break
+            self._count("requests")
+            try:
+                with tracing.span("wikipedia_http"):
+                    resp = self.session.get(self.api_url, params=params, timeout=self.request_timeout)
+            except requests.RequestException:
+                continue
+            if resp.status_code == 200:
+                return resp.json()
+            if resp.status_code not in RETRY_STATUS:
+                break
+        raise requests.RequestException(f"Wikipedia request failed after {attempt + 1} attempts")
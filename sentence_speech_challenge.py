@@ -1,91 +1,135 @@
 import streamlit as st
 import speech_recognition as sr
-import nltk
-import string
-import wikipediaapi
-from sentence_transformers import SentenceTransformer, util
+import requests
+import startup
+import audio_capture
+import tracing
+import speech_upload
+import session_memory
+from results_store import get_results, current_learner
+from embedding_cache import get_cache
+from encode_service import get_service
+from sentence_reservoir import WIKIPEDIA_API_URL, make_session
+from keyword_index import KeywordIndex
+from summary_store import get_store
+from speech_coverage import ReferenceMatrix, chunk_speech, score_coverage, split_sentences
+
+# ✅ Download NLTK data (checked once per process)
+startup.ensure_nltk_data('stopwords')
+
+# ✅ Load Sentence-BERT model for answer similarity checking (warmed up in the background by app.py)
+def load_model():
+    return startup.get("minilm")
+
+@tracing.traced("encode")  # ✅ Model time only; cache hits never reach here
+def encode_texts(texts):
+    return load_model().encode(texts)
 
-# ✅ Download NLTK data
-nltk.download('stopwords')
-nltk.download('punkt')
+bert_encoder = session_memory.share("encode service", get_service(startup.MODEL_ID, encode_texts))  # ✅ Batches encode calls across sessions
+bert_cache = session_memory.share("embedding cache", get_cache(startup.MODEL_ID))
 
-# ✅ Load Sentence-BERT model for answer similarity checking
+# ✅ Pooled keep-alive session for summary lookups
 @st.cache_resource
-def load_model():
-    return SentenceTransformer('paraphrase-MiniLM-L6-v2')
+def load_wikipedia_session():
+    return make_session(8)
 
-bert_model = load_model()
+wikipedia_session = load_wikipedia_session()
+summary_store = session_memory.share("summary store", get_store())  # ✅ Offline summaries, memory-mapped and shared by every session
+results = session_memory.share("results store", get_results())  # ✅ Scored speeches are saved in the background for the progress page
 
-# ✅ Function to fetch a summary from Wikipedia
+# ✅ Function to fetch a summary (the intro section) from Wikipedia; WIKIPEDIA_API_URL can point at a local stand-in.
+# Returns None if there is no such article, raises on network errors.
+@tracing.traced("wikipedia")
 def fetch_wikipedia_summary(topic):
-    wiki_wiki = wikipediaapi.Wikipedia(
-        language='en',
-        user_agent="SpeechPracticeApp/1.0 (muthusingam539@gmail.com)"
-    )
-
-    page = wiki_wiki.page(topic)
-    if page.exists():
-        return page.summary
-    else:
-        st.error("❌ No Wikipedia article found for the given topic.")
-        return None
-
-# ✅ Function to extract keywords from text
-def extract_keywords(text):
-    stopwords = set(nltk.corpus.stopwords.words('english'))
-    translator = str.maketrans("", "", string.punctuation)
-    cleaned_text = text.translate(translator).lower()
-    tokens = nltk.word_tokenize(cleaned_text)
-    keywords = [word for word in tokens if word not in stopwords and len(word) > 2]
-    return set(keywords)
+    params = {"action": "query", "format": "json", "prop": "extracts", "exintro": 1,
+              "explaintext": 1, "redirects": 1, "titles": topic}
+    resp = wikipedia_session.get(WIKIPEDIA_API_URL, params=params, timeout=10)
+    resp.raise_for_status()
+    pages = resp.json().get("query", {}).get("pages", {})
+    page = next(iter(pages.values()), {})
+    if "missing" not in page and page.get("extract"):
+        return page["extract"].strip()
+    return None
+
+# ✅ Summary and its keyword index, built once per topic (network errors are not cached).
+# The local store answers first; the live API is the fallback and writes through to it.
+@st.cache_resource(max_entries=256, show_spinner=False)
+def load_topic(topic):
+    summary = summary_store.get(topic)
+    if summary is None:
+        summary = fetch_wikipedia_summary(topic)
+        if summary:
+            summary_store.add(topic, summary)
+    return summary, KeywordIndex(summary) if summary else None
+
+# ✅ A picked suggestion becomes the topic
+def pick_topic():
+    st.session_state.topic_query = st.session_state.topic_pick
+    st.session_state.topic_pick = None
 
 # ✅ Function to recognize speech
 def recognize_speech(duration):
-    recognizer = sr.Recognizer()
-    with sr.Microphone() as source:
-        st.info("🎤 Listening... Speak now.")
-        recognizer.adjust_for_ambient_noise(source, duration=1)
-        try:
-            audio = recognizer.listen(source, timeout=duration)
-            text = recognizer.recognize_google(audio)
-            return text
-        except sr.WaitTimeoutError:
-            st.warning("⚠ Time is up! No speech detected.")
-            return None
-        except sr.UnknownValueError:
-            st.warning("❌ Could not understand speech. Try again.")
-            return None
-        except sr.RequestError:
-            st.error("⚠ Speech recognition service is unavailable.")
-            return None
-
-# ✅ Function to compute average embedding
-def average_embedding(text):
-    if not text:
+    st.info("🎤 Listening... Speak now.")
+    partial = st.empty()  # ✅ Live transcript while speaking
+    try:
+        # ✅ The endpointer calibrates to ambient noise from the first frames
+        with tracing.span("capture"):
+            utterance = audio_capture.capture_utterance(timeout=duration, on_partial=lambda text: partial.write(f"🎧 {text}..."))
+        return utterance.text
+    except sr.WaitTimeoutError:
+        st.warning("⚠ Time is up! No speech detected.")
+        return None
+    except sr.UnknownValueError:
+        st.warning("❌ Could not understand speech. Try again.")
+        return None
+    except sr.RequestError:
+        st.error("⚠ Speech recognition service is unavailable.")
         return None
-    embeddings = bert_model.encode([text])
-    return embeddings[0]
 
-# ✅ Function to generate feedback
-def generate_feedback(user_speech, reference_text):
+# ✅ Browser recording: recognized on the shared speech pool, which also builds the speech's keyword index
+def recognize_upload(audio):
+    try:
+        return speech_upload.get_pool().recognize(audio, KeywordIndex)
+    except sr.WaitTimeoutError:
+        st.warning("⚠ No speech detected in the recording.")
+    except sr.UnknownValueError:
+        st.warning("❌ Could not understand speech. Try again.")
+    except speech_upload.PoolBusy:
+        st.warning("⚠ The server is busy. Please record again in a moment.")
+    except sr.RequestError:
+        st.error("⚠ Speech recognition service is unavailable.")
+    return None, None
+
+# ✅ Reference split into sentences and encoded once per topic, so no part of a long summary is truncated
+@st.cache_resource(max_entries=256, show_spinner=False)
+def load_reference_matrix(summary):
+    sentences = split_sentences(summary)
+    return ReferenceMatrix(sentences, bert_cache.encode(sentences, bert_encoder.encode))
+
+# ✅ Function to score speech against every reference sentence; the speech chunks go in one batched encode call
+def score_speech(user_speech, reference_matrix):
+    chunks = chunk_speech(user_speech)
+    vectors = bert_cache.encode(chunks, bert_encoder.encode) if chunks else []
+    return score_coverage(reference_matrix, vectors)
+
+# ✅ Function to generate feedback against the topic's precomputed keyword index
+def generate_feedback(user_speech, reference_index, user_index=None):
     if not user_speech:
         return "⚠ No speech detected. Try speaking clearly and loudly."
 
-    user_keywords = extract_keywords(user_speech)
-    reference_keywords = extract_keywords(reference_text)
-
-    missing_keywords = reference_keywords - user_keywords
-    extra_keywords = user_keywords - reference_keywords
+    user_index = user_index or KeywordIndex(user_speech)
+    missing_keywords = reference_index.missing(user_index)  # ✅ Most frequent in the reference first
+    extra_keywords = user_index.extra(reference_index)
 
     feedback = []
 
     if missing_keywords:
-        feedback.append(f"⚠ Missing important keywords: {', '.join(list(missing_keywords)[:5])}")
+        feedback.append(f"⚠ Missing important keywords: {', '.join(missing_keywords[:5])}")
 
     if extra_keywords:
-        feedback.append(f"🛠 Extra words used that may not be relevant: {', '.join(list(extra_keywords)[:5])}")
+        feedback.append(f"🛠 Extra words used that may not be relevant: {', '.join(extra_keywords[:5])}")
 
-    if len(user_speech.split()) < len(reference_text.split()) * 0.5:
+    if user_index.word_count < reference_index.word_count * 0.5:
         feedback.append("🗣 Your speech is too short. Try elaborating more on the topic.")
 
     if len(feedback) == 0:
@@ -112,43 +156,75 @@ st.title("🗣️ English Speaking Practice with AI Feedback")
 
 # Initialize reference_paragraph before using it
 reference_paragraph = None
+reference_index = None
 
 # ✅ Input topic
-topic = st.text_input("📌 Enter a topic for your practice:")
+topic = st.text_input("📌 Enter a topic for your practice:", key="topic_query")
+
+# ✅ Typeahead from the title index
+suggestions = summary_store.suggest(topic) if topic else []
+if suggestions and suggestions != [topic]:
+    st.pills("💡 Matching topics", suggestions, key="topic_pick", on_change=pick_topic)
 
 if topic:
     # ✅ Fetch Wikipedia Summary
-    reference_paragraph = fetch_wikipedia_summary(topic)
+    try:
+        reference_paragraph, reference_index = load_topic(topic)
+    except (requests.RequestException, ValueError):
+        st.error("⚠ Could not reach Wikipedia. Please try again.")
+    else:
+        if not reference_paragraph:
+            st.error("❌ No Wikipedia article found for the given topic.")
 
     if reference_paragraph:  # Check if summary was found
         st.subheader("📚 Reference Paragraph")
         st.write(reference_paragraph)
 
-    # ✅ Set speaking time
-    duration = st.slider("⏳ Set your speaking time (seconds):", min_value=10, max_value=120, value=30)
-
-    # ✅ Start speaking button
-    if st.button("🎤 Start Speaking"):
-        user_speech = recognize_speech(duration)
-
-        if user_speech:
-            st.subheader("🗣 Your Speech")
-            st.write(user_speech)
-
-            reference_vector = average_embedding(reference_paragraph)
-            user_vector = average_embedding(user_speech)
-
-            if reference_vector is not None and user_vector is not None:
-                similarity = util.cos_sim(reference_vector, user_vector).item() * 100
-                similarity = round(similarity, 2)
-                st.write(f"🔍 Cosine Similarity: **{similarity}%**")
-
-                # ✅ Generate feedback
-                feedback = generate_feedback(user_speech, reference_paragraph)
-                st.subheader("📢 Feedback")
-                st.write(feedback)
-
-                # ✅ Improve speech
-                improved_speech = improve_speech(user_speech, reference_paragraph)
-                st.subheader("✨ Improved Version of Your Speech")
-                st.write(improved_speech)
+    # ✅ Record in the browser, or set the speaking time and listen on the server microphone
+    user_speech = user_index = None
+    if speech_upload.BROWSER:
+        audio = speech_upload.new_recording("🎤 Record your speech", key=f"speech_{topic}")
+        if audio is not None:
+            with st.spinner("⏳ Recognizing..."):
+                utterance, user_index = recognize_upload(audio)
+            user_speech = utterance.text if utterance else None
+    else:
+        duration = st.slider("⏳ Set your speaking time (seconds):", min_value=10, max_value=120, value=30)
+        if st.button("🎤 Start Speaking"):
+            user_speech = recognize_speech(duration)
+
+    if user_speech:
+        st.subheader("🗣 Your Speech")
+        st.write(user_speech)
+
+        startup.wait_for("minilm", "⏳ Loading the Sentence-BERT model...")
+
+        if reference_paragraph:
+            coverage = score_speech(user_speech, load_reference_matrix(reference_paragraph))
+            similarity = round(coverage.score * 100, 2)
+            st.write(f"🔍 Overall Similarity: **{similarity}%**")
+            st.write(f"📊 Covered **{int(coverage.covered.sum())} of {len(coverage.reference)}** reference sentences")
+
+            # ✅ Per-sentence coverage
+            st.dataframe({
+                "Reference sentence": coverage.reference.sentences,
+                "Coverage %": [round(float(c) * 100, 1) for c in coverage.per_sentence],
+            }, width="stretch", hide_index=True)
+
+            if coverage.missed:
+                st.subheader("🧩 Parts You Missed")
+                for sentence in coverage.missed[:3]:
+                    st.write(f"- {sentence}")
+
+            # ✅ Generate feedback
+            user_index = user_index or KeywordIndex(user_speech)
+            feedback = generate_feedback(user_speech, reference_index, user_index)
+            results.record(current_learner(), "sentence", item=topic, answer=user_speech, accuracy=coverage.score,
+                           errors=reference_index.missing(user_index)[:5])
+            st.subheader("📢 Feedback")
+            st.write(feedback)
+
+            # ✅ Improve speech
+            improved_speech = improve_speech(user_speech, reference_paragraph)
+            st.subheader("✨ Improved Version of Your Speech")
+            st.write(improved_speech)
@@ -0,0 +1,171 @@
+import gc
+import mmap
+import os
+import sys
+import threading
+import time
+import types
+
+import numpy as np
+
+# Sessions idle this long start over on their next run (0 keeps them forever); results are already saved.
+# This is not a memory limit: an idle tab that stays open keeps its state until it runs again, and
+# a closed tab's state is freed by Streamlit itself (server.disconnectedSessionTTL after it disconnects).
+IDLE_MINUTES = float(os.environ.get("SESSION_IDLE_MINUTES", 30))
+MEASURE_SECONDS = 60  # how often a session's state and the shared resources are re-measured
+
+# Code and module objects are process-wide, never charged to a session or resource
+_OPAQUE = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.CodeType)
+
+_shared = {}  # name -> process-wide object (corpus, model handle, cache, ...)
+_sessions = {}  # session id -> its last run and latest measurement, recorded by the session itself
+_shared_cache = (None, ([], frozenset()))  # (when, (resources, ids they reach))
+_lock = threading.Lock()
+stats = {"resets": 0, "measured": 0}
+
+
+# Name a process-wide object for the memory report; returns it, so pages can wrap their assignment
+def share(name, obj):
+    if obj is not None:
+        with _lock:
+            _shared[name] = obj
+    return obj
+
+
+# Bytes reachable from roots as (heap, mapped), skipping ids in exclude. Arrays count their own
+# buffer once (views walk to their base); memory-mapped files are reported apart, since the OS
+# shares and pages them. Ids walked are added to seen.
+def measure(roots, exclude=frozenset(), seen=None):
+    seen = set() if seen is None else seen
+    torch = sys.modules.get("torch")
+    heap = mapped = 0
+    stack = list(roots)
+    while stack:
+        obj = stack.pop()
+        key = id(obj)
+        if key in seen or key in exclude or isinstance(obj, _OPAQUE):
+            continue
+        seen.add(key)
+        if isinstance(obj, mmap.mmap):
+            mapped += len(obj)
+            continue
+        heap += sys.getsizeof(obj)
+        if isinstance(obj, np.ndarray):
+            if obj.base is not None:
+                stack.append(obj.base)
+            continue
+        if torch is not None and isinstance(obj, torch.Tensor):
+            heap += obj.nelement() * obj.element_size()
+            continue
+        stack.extend(gc.get_referents(obj))
+    return heap, mapped
+
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # peak, in KiB on Linux
+
+
+# Record a script run for the current session and, at most every MEASURE_SECONDS, the size of
+# its own state. A session idle for IDLE_MINUTES has its state cleared here, by its own script
+# before the page runs, and gets True once so it can tell the user. Returns False outside Streamlit.
+def touch():
+    import streamlit as st
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return False
+    now = time.monotonic()
+    with _lock:
+        record = _sessions.get(ctx.session_id)
+        if record is None:
+            _prune(now)
+            record = _sessions[ctx.session_id] = {
+                "last_seen": now, "inactive_since": None, "measured": None, "resets": 0,
+                "heap_bytes": 0, "mapped_bytes": 0, "keys": 0, "largest": ""}
+        expired = IDLE_MINUTES > 0 and now - record["last_seen"] >= IDLE_MINUTES * 60
+        record["last_seen"] = now
+        if expired:
+            record["resets"] += 1
+            stats["resets"] += 1
+        due = expired or record["measured"] is None or now - record["measured"] >= MEASURE_SECONDS
+        if due:
+            record["measured"] = now  # one measurement per interval, even with concurrent reruns
+    if expired:
+        st.session_state.clear()
+    if due:
+        _measure_session(record, st.session_state.to_dict())
+    return expired
+
+
+# Forget sessions Streamlit no longer has. A disconnected session can still reconnect within
+# server.disconnectedSessionTTL, so its record is kept that long after it was first seen inactive.
+# Called with _lock held; outside a Streamlit server (tests, scripts) nothing is pruned.
+def _prune(now):
+    import streamlit as st
+    from streamlit.runtime import Runtime
+    if not Runtime.exists():
+        return
+    runtime = Runtime.instance()
+    ttl = st.get_option("server.disconnectedSessionTTL")
+    for session_id, record in list(_sessions.items()):
+        if runtime.is_active_session(session_id):
+            record["inactive_since"] = None
+        elif record["inactive_since"] is None:
+            record["inactive_since"] = now
+        elif now - record["inactive_since"] > ttl:
+            del _sessions[session_id]
+
+
+def _measure_session(record, values, top_keys=3):
+    exclude = _shared_report()[1]
+    seen = set()
+    sizes = sorted(((key, measure([value], exclude, seen)) for key, value in values.items()), key=lambda kv: -kv[1][0])
+    with _lock:
+        record["heap_bytes"] = sum(heap for _, (heap, _) in sizes)
+        record["mapped_bytes"] = sum(mapped for _, (_, mapped) in sizes)
+        record["keys"] = len(sizes)
+        record["largest"] = ", ".join(f"{key} ({heap / 1024:.1f} KB)" for key, (heap, _) in sizes[:top_keys])
+        stats["measured"] += 1
+
+
+# Bytes per shared resource and the ids they reach, walked at most every MEASURE_SECONDS. A shared
+# object is charged to the first resource that reaches it.
+def _shared_report():
+    global _shared_cache
+    with _lock:
+        measured, cached = _shared_cache
+        if measured is not None and time.monotonic() - measured < MEASURE_SECONDS:
+            return cached
+        shared = list(_shared.items())
+    shared_ids = set()
+    resources = []
+    for name, obj in shared:
+        heap, mapped = measure([obj], seen=shared_ids)
+        resources.append({"resource": name, "type": type(obj).__name__, "heap_bytes": heap, "mapped_bytes": mapped})
+    with _lock:
+        _shared_cache = (time.monotonic(), (resources, frozenset(shared_ids)))
+    return resources, shared_ids
+
+
+# Bytes per shared resource and per live session, from the latest measurements; a session's bytes
+# are what one more session costs, since shared objects are never charged to it
+def report():
+    resources = _shared_report()[0]
+    now = time.monotonic()
+    with _lock:
+        _prune(now)
+        sessions = [{"session": session_id[:8], "idle_s": round(now - record["last_seen"]),
+                     "measured_s": round(now - record["measured"]) if record["measured"] is not None else None,
+                     "resets": record["resets"], "heap_bytes": record["heap_bytes"],
+                     "mapped_bytes": record["mapped_bytes"], "keys": record["keys"], "largest": record["largest"]}
+                    for session_id, record in _sessions.items()]
+        counters = dict(stats)
+    return {"rss_bytes": rss_bytes(), "resources": resources, "sessions": sessions,
+            "shared_bytes": sum(r["heap_bytes"] for r in resources),
+            "session_bytes": sum(s["heap_bytes"] for s in sessions), "idle_minutes": IDLE_MINUTES,
+            "measure_seconds": MEASURE_SECONDS, **counters}
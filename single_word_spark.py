@@ -1,126 +1,171 @@
 import streamlit as st
-import requests
-import random
-import string
 import speech_recognition as sr
-from sentence_transformers import SentenceTransformer, util
-
-# ✅ Cache the model to improve performance
-@st.cache_resource
+import startup
+import audio_capture
+import tracing
+import speech_upload
+import session_memory
+from results_store import get_results, current_learner
+from embedding_cache import get_cache
+from encode_service import get_service
+import vocab_embeddings
+import question_pipeline
+from question_pipeline import QuizStream
+from quiz_scoring import score_relevance  # ✅ Points per similarity bucket
+from speech_coverage import unit_rows
+
+# ✅ Model is loaded once per process, in the background (see startup.py)
 def load_model():
-    return SentenceTransformer('paraphrase-MiniLM-L6-v2')
-
-bert_model = load_model()
-
-# ✅ Function to fetch a synonym question
-def get_datamuse_synonym_question():
-    base_url = "https://api.datamuse.com/words"
-    max_attempts = 10
-
-    for _ in range(max_attempts):
-        letter = random.choice(string.ascii_lowercase)
-        resp = requests.get(base_url, params={"sp": f"{letter}*", "max": 50}, timeout=10)
-        if resp.status_code != 200:
-            continue
-        words_data = resp.json()
-        if not words_data:
-            continue
-        word = random.choice(words_data)["word"]
-
-        syn_resp = requests.get(base_url, params={"rel_syn": word, "max": 10}, timeout=10)
-        if syn_resp.status_code != 200:
-            continue
-        syn_data = syn_resp.json()
-        if syn_data:
-            synonym = random.choice(syn_data)["word"]
-            return {"question": f"What is another word for '{word}'?", "answer": synonym.lower()}
+    return startup.get("minilm")
+
+@tracing.traced("encode")  # ✅ Model time only; cache hits never reach here
+def encode_texts(texts):
+    return load_model().encode(texts)
+
+bert_encoder = session_memory.share("encode service", get_service(startup.MODEL_ID, encode_texts))  # ✅ Batches encode calls across sessions
+bert_cache = session_memory.share("embedding cache", get_cache(startup.MODEL_ID))
+
+# ✅ Offline synonym bank, opened (or built from WordNet once) in the background; None until ready,
+# and quizzes come from Datamuse meanwhile
+def load_synonym_bank():
+    future = startup.resource("synonym_bank")
+    if future.done() and future.exception() is None:
+        return session_memory.share("synonym bank", future.result())
     return None
 
-# ✅ Function to get multiple questions
+load_synonym_bank()
+
+# ✅ Precomputed embeddings of the bank's vocabulary, built offline with `python -m vocab_embeddings`;
+# None until built, and answers are scored with the model meanwhile
+def load_vocab_table():
+    question_bank = load_synonym_bank()
+    if question_bank is None:
+        return None
+    return session_memory.share("vocabulary table", vocab_embeddings.get_table(question_bank, startup.MODEL_ID))
+
+# ✅ The offline bank makes a quiz at once; otherwise questions come from Datamuse
+def from_bank(amount, question_bank=None):
+    if question_bank is None:
+        question_bank = load_synonym_bank()
+    return question_bank is not None and len(question_bank) >= amount
+
+# ✅ A quiz as a stream of questions: the offline bank has them all at once (as word ids into the
+# shared bank); Datamuse questions are generated concurrently in the background and arrive one by one
+def new_quiz(amount):
+    question_bank = load_synonym_bank()
+    if from_bank(amount, question_bank):
+        return QuizStream.ready(question_bank.questions(amount))
+    return session_memory.share("question pipeline", question_pipeline.get_pipeline()).quiz(amount)
+
+# ✅ Function to get multiple questions (all of them, or None if too few could be made)
 def get_synonym_questions(amount=5):
-    questions = []
-    attempts = 0
-    while len(questions) < amount and attempts < amount * 5:
-        q = get_datamuse_synonym_question()
-        if q:
-            questions.append(q)
-        attempts += 1
+    questions = new_quiz(amount).wait()
     return questions if len(questions) >= amount else None
 
 # ✅ Function to recognize speech input with improved accuracy
 def recognize_speech():
-    recognizer = sr.Recognizer()
-    with sr.Microphone() as source:
-        st.info("🎤 Listening... Please speak your answer.")
-        recognizer.adjust_for_ambient_noise(source, duration=0.5)  # ✅ Adjust noise settings
-        try:
-            audio = recognizer.listen(source, timeout=3, phrase_time_limit=3)  # ✅ Reduced timeout for faster response
-            return recognizer.recognize_google(audio).lower()
-        except (sr.WaitTimeoutError, sr.UnknownValueError, sr.RequestError):
-            return None
-
-# ✅ Function to check answer relevance using Sentence-BERT
-def check_answer_relevance(user_answer, correct_answer):
+    st.info("🎤 Listening... Please speak your answer.")
+    try:
+        # ✅ Noise calibration happens on the first frames; the answer ends on silence
+        with tracing.span("capture"):
+            utterance = audio_capture.capture_utterance(timeout=3, phrase_time_limit=3)
+        return utterance.text.lower()
+    except (sr.WaitTimeoutError, sr.UnknownValueError, sr.RequestError):
+        return None
+
+# ✅ Browser recording, recognized on the shared speech pool (PoolBusy is left to the caller)
+def recognize_upload(audio):
+    try:
+        with st.spinner("⏳ Recognizing..."):
+            return speech_upload.get_pool().recognize(audio).text.lower()
+    except speech_upload.PoolBusy:
+        raise
+    except (sr.WaitTimeoutError, sr.UnknownValueError, sr.RequestError):
+        return None
+
+# ✅ Embeddings through the shared cache and batching service, for words outside the vocabulary table
+def encode_words(words):
+    return bert_cache.encode(words, bert_encoder.encode)
+
+# ✅ Function to check answer relevance using Sentence-BERT: the best match over every accepted synonym
+def check_answer_relevance(user_answer, question):
     if not user_answer:
         return 0
-    embeddings = bert_model.encode([user_answer, correct_answer])
-    return round(util.cos_sim(embeddings[0], embeddings[1]).item() * 100, 2)
-
-# ✅ Function to calculate score
-def score_relevance(relevance):
-    if relevance >= 90:
-        return 15
-    elif relevance >= 80:
-        return 10
-    elif relevance >= 70:
-        return 8
-    elif relevance >= 60:
-        return 5
-    elif relevance >= 50:
-        return 3
+    accepted = list(dict.fromkeys([question.answer, *question.synonyms]))
+    table = load_vocab_table()
+    if table is not None:
+        # ✅ In-vocabulary words are a row lookup; the model only runs for unknown words
+        similarity = table.best_similarity(user_answer, accepted, encode_words)
     else:
-        return 0
+        vectors = unit_rows(encode_words([user_answer] + accepted))
+        similarity = float((vectors[1:] @ vectors[0]).max())
+    return round(similarity * 100, 2)
+
+# ✅ Answers are saved in the background for the progress page; a missed word counts as an error
+results = session_memory.share("results store", get_results())
 
-# ✅ Initialize session state
+def save_answer(question, user_answer, relevance, points):
+    results.record(current_learner(), "single_word", item=question.question, answer=user_answer,
+                   accuracy=relevance / 100, points=points, errors=() if points else [question.word])
+
+# ✅ Initialize session state: questions are shared read-only records, each answer is one
+# (answer, relevance, points) tuple
 if "questions" not in st.session_state:
     st.session_state.questions = None
+    st.session_state.answers = []
     st.session_state.current_question = 0
     st.session_state.total_score = 0
     st.session_state.quiz_started = False
     st.session_state.auto_next = False  # ✅ Automatically move to the next question
 
-# ✅ Start the quiz
+# ✅ Start the quiz: the first question shows as soon as it is ready, the rest stream in behind it
 def start_quiz(num_questions):
-    st.session_state.questions = get_synonym_questions(num_questions)
+    quiz = st.session_state.get("next_quiz")
+    if quiz is None or quiz.amount != num_questions:
+        quiz = new_quiz(num_questions)
+    st.session_state.questions = quiz.questions
+    st.session_state.quiz = quiz
+    st.session_state.quiz_size = num_questions
+    st.session_state.next_quiz = None
+    st.session_state.answers = []
     st.session_state.current_question = 0
     st.session_state.total_score = 0
     st.session_state.quiz_started = True
     st.session_state.auto_next = True  # ✅ Start auto mode
-    st.experimental_rerun()
+    st.rerun()
 
 # ✅ Process the answer and move to the next question
 def process_answer():
-    if st.session_state.current_question < len(st.session_state.questions):
+    if st.session_state.current_question < st.session_state.quiz_size:
         question = st.session_state.questions[st.session_state.current_question]
-        user_answer = recognize_speech()
+        if speech_upload.BROWSER:
+            audio = speech_upload.new_recording("🎤 Record your answer", key=f"answer_{st.session_state.current_question}")
+            if audio is None:
+                return  # ✅ Wait for the recording
+            try:
+                user_answer = recognize_upload(audio)
+            except speech_upload.PoolBusy:
+                st.warning("⚠ The server is busy. Please record your answer again.")
+                return  # ✅ A busy server does not cost the question
+        else:
+            user_answer = recognize_speech()
 
         if user_answer:
-            relevance = check_answer_relevance(user_answer, question["answer"])
+            startup.wait_for("minilm", "⏳ Loading the Sentence-BERT model...")
+            relevance = check_answer_relevance(user_answer, question)
             points = score_relevance(relevance)
             st.session_state.total_score += points
 
-            st.session_state.questions[st.session_state.current_question]["user_answer"] = user_answer
-            st.session_state.questions[st.session_state.current_question]["relevance"] = relevance
-            st.session_state.questions[st.session_state.current_question]["points"] = points
+            st.session_state.answers.append((user_answer, relevance, points))
+            save_answer(question, user_answer, relevance, points)
         else:
             st.warning("⚠ No valid answer detected. 0 points.")
-            st.session_state.questions[st.session_state.current_question]["user_answer"] = "No Answer"
-            st.session_state.questions[st.session_state.current_question]["relevance"] = 0
-            st.session_state.questions[st.session_state.current_question]["points"] = 0
+            st.session_state.answers.append(("No Answer", 0, 0))
+            save_answer(question, None, 0, 0)
 
         st.session_state.current_question += 1
-        if st.session_state.current_question < len(st.session_state.questions):
-            st.experimental_rerun()  # ✅ Automatically move to next question
+        if st.session_state.current_question < st.session_state.quiz_size:
+            st.rerun()  # ✅ Automatically move to next question
 
 # ✅ Streamlit UI
 st.title("🎙️ English Speaking Practice Quiz (Synonym Edition)")
@@ -131,30 +176,45 @@ if not st.session_state.quiz_started:
     if st.button("Start Quiz"):
         start_quiz(num_questions)
 
-elif st.session_state.current_question < len(st.session_state.questions):
-    q = st.session_state.questions[st.session_state.current_question]
-    st.subheader(f"🔹 Question {st.session_state.current_question + 1}:")
-    st.write(q['question'])
+elif st.session_state.current_question < st.session_state.quiz_size:
+    with st.spinner("⏳ Preparing the next question..."):
+        q = st.session_state.quiz.get(st.session_state.current_question)
+    if q is None:
+        # ✅ Datamuse could not supply every question: the quiz ends with the ones it did
+        st.session_state.quiz_size = st.session_state.current_question
+        if st.session_state.quiz_size:
+            st.rerun()
+        st.session_state.quiz_started = False
+        st.error("⚠ Could not fetch synonym questions. Please try again.")
+    else:
+        st.subheader(f"🔹 Question {st.session_state.current_question + 1}:")
+        st.write(q.question)
+
+        # ✅ Automatically enable microphone & process answer
+        process_answer()
 
-    # ✅ Automatically enable microphone & process answer
-    process_answer()
+elif st.session_state.current_question == st.session_state.quiz_size:
+    st.success(f"🎉 Quiz Completed! Your Final Score: {st.session_state.total_score} / {st.session_state.quiz_size * 15}")
 
-elif st.session_state.current_question == len(st.session_state.questions):
-    st.success(f"🎉 Quiz Completed! Your Final Score: {st.session_state.total_score} / {len(st.session_state.questions) * 15}")
+    # ✅ A Datamuse quiz for a restart is fetched while the review is read; the bank needs no look-ahead
+    if st.session_state.get("next_quiz") is None and not from_bank(st.session_state.quiz.amount):
+        st.session_state.next_quiz = new_quiz(st.session_state.quiz.amount)
 
     # ✅ Display results
     st.write("### 📚 Review of Questions and Answers:")
-    for i, q in enumerate(st.session_state.questions):
-        st.write(f"**Q{i+1}:** {q['question']}")
-        st.write(f"✅ **Correct Answer:** {q['answer']}")
-        st.write(f"🎤 **Your Answer:** {q.get('user_answer', 'No Answer')}")
-        st.write(f"🔍 **Similarity Score:** {q.get('relevance', 0)}%")
-        st.write(f"🏆 **Points Earned:** {q.get('points', 0)}")
+    for i, (q, (user_answer, relevance, points)) in enumerate(zip(st.session_state.questions, st.session_state.answers)):
+        st.write(f"**Q{i+1}:** {q.question}")
+        st.write(f"✅ **Correct Answer:** {q.answer}")
+        st.write(f"🎤 **Your Answer:** {user_answer}")
+        st.write(f"🔍 **Similarity Score:** {relevance}%")
+        st.write(f"🏆 **Points Earned:** {points}")
         st.write("---")
 
     if st.button("Restart Quiz"):
         st.session_state.quiz_started = False
         st.session_state.questions = None
+        st.session_state.quiz = None
+        st.session_state.answers = []
         st.session_state.current_question = 0
         st.session_state.total_score = 0
-        st.experimental_rerun()
+        st.rerun()
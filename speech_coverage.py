@@ -0,0 +1,94 @@
+import re
+
+import numpy as np
+
+SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+MAX_CHUNK_WORDS = 40  # well inside MiniLM's 128-token window
+SPEECH_WINDOW = 20
+SPEECH_STRIDE = 10
+COVERED = 0.5  # cosine at which a reference sentence counts as covered
+
+
+# Sentences of a text; very long ones are cut into even pieces of at most max_words so nothing is truncated
+def split_sentences(text, max_words=MAX_CHUNK_WORDS):
+    chunks = []
+    for sentence in SENTENCE_END_RE.split(text.strip()):
+        words = sentence.split()
+        if not words:
+            continue
+        pieces = -(-len(words) // max_words)
+        size = -(-len(words) // pieces)
+        for start in range(0, len(words), size):
+            chunks.append(" ".join(words[start:start + size]))
+    return chunks
+
+
+# Transcripts rarely carry punctuation: overlapping word windows, or sentences when punctuated
+def chunk_speech(text, window=SPEECH_WINDOW, stride=SPEECH_STRIDE):
+    if len(SENTENCE_END_RE.split(text.strip())) > 1:
+        return split_sentences(text, window)
+    words = text.split()
+    if len(words) <= window:
+        return [" ".join(words)] if words else []
+    # The last window always reaches the final word
+    return [" ".join(words[start:start + window]) for start in range(0, len(words) - window + stride, stride)]
+
+
+def unit_rows(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+# Reference sentences and their unit embeddings, built once per topic
+class ReferenceMatrix:
+    def __init__(self, sentences, vectors):
+        self.sentences = sentences
+        self.matrix = unit_rows(vectors)
+        self.weights = np.array([len(s.split()) for s in sentences], dtype=np.float32)
+
+    def __len__(self):
+        return len(self.sentences)
+
+
+# One attempt against a reference: similarity[i, j] is reference sentence i vs speech chunk j
+class Coverage:
+    def __init__(self, reference, similarity, threshold=COVERED):
+        self.reference = reference
+        self.similarity = similarity
+        self.threshold = threshold
+        if similarity.shape[1]:
+            self.per_sentence = similarity.max(axis=1)
+            self.best_chunk = similarity.argmax(axis=1)
+        else:
+            self.per_sentence = np.zeros(len(reference), dtype=np.float32)
+            self.best_chunk = np.full(len(reference), -1)
+
+    @property
+    def covered(self):
+        return self.per_sentence >= self.threshold
+
+    # Overall score: coverage of each reference sentence, weighted by its length
+    @property
+    def score(self):
+        if not len(self.reference):
+            return 0.0
+        return float(np.average(np.clip(self.per_sentence, 0, 1), weights=self.reference.weights))
+
+    # How on-topic the speech was: each chunk's best match, averaged
+    @property
+    def relevance(self):
+        return float(np.clip(self.similarity.max(axis=0), 0, 1).mean()) if self.similarity.shape[1] else 0.0
+
+    # Reference sentences not covered, in reading order
+    @property
+    def missed(self):
+        return [self.reference.sentences[i] for i in np.flatnonzero(~self.covered)]
+
+
+def score_coverage(reference, speech_vectors, threshold=COVERED):
+    if len(speech_vectors):
+        speech = unit_rows(speech_vectors)
+    else:
+        speech = np.zeros((0, reference.matrix.shape[1]), dtype=np.float32)
+    return Coverage(reference, reference.matrix @ speech.T, threshold)
@@ -0,0 +1,356 @@
+import io
+import os
+import random
+import time
+import wave
+
+import numpy as np
+import speech_recognition as sr
+
+import tracing
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # 16-bit PCM
+FRAME_MS = 30
+
+
+# Live microphone, read in fixed-size frames
+class MicrophoneSource:
+    def __init__(self, sample_rate=SAMPLE_RATE, frame_ms=FRAME_MS, device_index=None):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.microphone = sr.Microphone(device_index=device_index, sample_rate=sample_rate,
+                                        chunk_size=self.frame_samples)
+        self._source = None
+
+    def __enter__(self):
+        self._source = self.microphone.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        self.microphone.__exit__(*exc)
+        self._source = None
+
+    def frames(self):
+        while True:
+            data = self._source.stream.read(self.frame_samples)
+            yield np.frombuffer(data, dtype=np.int16)
+
+
+# 16-bit mono WAV file, optionally paced like a live microphone and replayed in a loop
+class WavFileSource:
+    def __init__(self, path, frame_ms=FRAME_MS, realtime=False, loop=False):
+        self.path = path
+        self.frame_ms = frame_ms
+        self.realtime = realtime
+        self.loop = loop
+        with wave.open(path, "rb") as f:
+            if f.getsampwidth() != SAMPLE_WIDTH or f.getnchannels() != 1:
+                raise ValueError(f"{path}: expected 16-bit mono PCM")
+            self.sample_rate = f.getframerate()
+            self.samples = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+        self.frame_samples = self.sample_rate * frame_ms // 1000
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def frames(self):
+        start = time.monotonic()
+        offsets = range(0, len(self.samples) - self.frame_samples + 1, self.frame_samples)
+        i = 0
+        while True:
+            for offset in offsets:
+                if self.realtime:
+                    delay = start + i * self.frame_ms / 1000 - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                i += 1
+                yield self.samples[offset:offset + self.frame_samples]
+            if not self.loop:
+                return
+
+
+# Preallocated int16 ring addressed by absolute sample position
+class RingBuffer:
+    def __init__(self, capacity):
+        self.buffer = np.zeros(capacity, dtype=np.int16)
+        self.capacity = capacity
+        self.end = 0  # absolute position one past the newest sample
+
+    @property
+    def start(self):
+        return max(0, self.end - self.capacity)
+
+    def write(self, samples):
+        n = len(samples)
+        if n >= self.capacity:
+            samples, self.end = samples[-self.capacity:], self.end + n - self.capacity
+            n = self.capacity
+        i = self.end % self.capacity
+        first = min(n, self.capacity - i)
+        self.buffer[i:i + first] = samples[:first]
+        self.buffer[:n - first] = samples[first:]
+        self.end += n
+
+    def read(self, start, end):
+        start = max(start, self.start)
+        i, j = start % self.capacity, end % self.capacity
+        if end - start <= 0:
+            return self.buffer[:0].copy()
+        if i < j:
+            return self.buffer[i:j].copy()
+        return np.concatenate((self.buffer[i:], self.buffer[:j]))
+
+
+# Energy-based voice activity detection with a self-calibrating threshold
+class EnergyEndpointer:
+    def __init__(self, frame_ms=FRAME_MS, threshold=None, calibration_ms=240, multiplier=2.5,
+                 min_threshold=150, start_ms=90, end_silence_ms=600, damping=0.05, noise=None):
+        self.frame_ms = frame_ms
+        self.threshold = threshold
+        self.multiplier = multiplier
+        self.min_threshold = min_threshold
+        # A known noise level (e.g. from a running capture service) skips calibration
+        if noise is not None:
+            self.threshold = max(min_threshold, noise * multiplier)
+        self.calibration_frames = max(1, calibration_ms // frame_ms) if self.threshold is None else 0
+        self.start_frames = max(1, start_ms // frame_ms)
+        self.end_frames = max(1, end_silence_ms // frame_ms)
+        self.damping = damping
+        self.noise = noise
+        self.speaking = False
+        self.voiced_run = 0
+        self.silent_run = 0
+        self._calibration = []
+
+    @staticmethod
+    def energy(frame):
+        return float(np.sqrt(np.mean(np.square(frame, dtype=np.float32))))
+
+    def _update_noise(self, energy):
+        self.noise = energy if self.noise is None else (1 - self.damping) * self.noise + self.damping * energy
+        self.threshold = max(self.min_threshold, self.noise * self.multiplier)
+
+    # Returns "start" when speech begins, "end" after end_silence_ms of silence, else None
+    def process(self, frame):
+        energy = self.energy(frame)
+        if len(self._calibration) < self.calibration_frames:
+            self._calibration.append(energy)
+            if len(self._calibration) == self.calibration_frames:
+                self.noise = float(np.mean(self._calibration))
+                self.threshold = max(self.min_threshold, self.noise * self.multiplier)
+            return None
+
+        voiced = energy > self.threshold
+        if not self.speaking:
+            self.voiced_run = self.voiced_run + 1 if voiced else 0
+            if not voiced:
+                self._update_noise(energy)
+            if self.voiced_run >= self.start_frames:
+                self.speaking = True
+                self.silent_run = 0
+                return "start"
+            return None
+
+        self.silent_run = 0 if voiced else self.silent_run + 1
+        if self.silent_run >= self.end_frames:
+            self.speaking = False
+            self.voiced_run = 0
+            return "end"
+        return None
+
+
+# Google Web Speech: no partials, the whole utterance is sent once speech ends
+class GoogleBackend:
+    def __init__(self, language="en-US"):
+        self.language = language
+        self.recognizer = sr.Recognizer()
+
+    def start(self, sample_rate):
+        self.sample_rate = sample_rate
+        self.chunks = []
+
+    def accept(self, samples):
+        self.chunks.append(samples)
+        return None
+
+    def finish(self):
+        audio = sr.AudioData(np.concatenate(self.chunks).tobytes(), self.sample_rate, SAMPLE_WIDTH)
+        return self.recognizer.recognize_google(audio, language=self.language)
+
+
+# Offline stand-in: reveals a known transcript as audio arrives, with injectable latency/failures.
+# cpu_cost is pure-Python work per utterance, like a local decoder holding the GIL.
+class OfflineBackend:
+    def __init__(self, transcript="", words_per_second=2.5, latency=0.0, failure_rate=0.0, seed=None, cpu_cost=0.0):
+        self.transcript = transcript
+        self.words_per_second = words_per_second
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.cpu_cost = cpu_cost
+        self.rng = random.Random(seed)
+
+    # Transcript from a sidecar file: speech.wav -> speech.txt
+    @classmethod
+    def for_wav(cls, path, **kwargs):
+        with open(os.path.splitext(path)[0] + ".txt", encoding="utf-8") as f:
+            return cls(f.read().strip(), **kwargs)
+
+    def start(self, sample_rate):
+        self.sample_rate = sample_rate
+        self.received = 0
+
+    def accept(self, samples):
+        self.received += len(samples)
+        words = self.transcript.split()
+        heard = int(self.received / self.sample_rate * self.words_per_second)
+        return " ".join(words[:heard]) or None
+
+    def finish(self):
+        if self.latency:
+            time.sleep(self.latency)
+        deadline = time.thread_time() + self.cpu_cost
+        while time.thread_time() < deadline:
+            pass
+        if self.rng.random() < self.failure_rate:
+            raise sr.RequestError("injected recognition failure")
+        if not self.transcript:
+            raise sr.UnknownValueError()
+        return self.transcript
+
+
+class Utterance:
+    def __init__(self, text, partials, speech_start, speech_end, endpoint_delay, recognition_latency):
+        self.text = text
+        self.partials = partials
+        self.speech_start = speech_start  # seconds of audio since capture began
+        self.speech_end = speech_end
+        self.endpoint_delay = endpoint_delay  # trailing silence needed to detect the end
+        self.recognition_latency = recognition_latency  # endpoint detected -> final text
+
+    @property
+    def duration(self):
+        return self.speech_end - self.speech_start
+
+    # End of speech -> final result, as the user experiences it
+    @property
+    def latency(self):
+        return self.endpoint_delay + self.recognition_latency
+
+
+# Capture one utterance from a frame source, feeding the backend as it streams in.
+# Raises sr.WaitTimeoutError if no speech starts within timeout seconds, like Recognizer.listen.
+def capture_and_recognize(source, backend, endpointer=None, timeout=None, phrase_time_limit=None,
+                          preroll_ms=300, chunk_ms=250, buffer_seconds=30, on_partial=None):
+    rate = source.sample_rate
+    endpointer = endpointer or EnergyEndpointer(source.frame_ms)
+    ring = RingBuffer(rate * buffer_seconds)
+    chunk = rate * chunk_ms // 1000
+    backend.start(rate)
+
+    partials = []
+    speech_start = None
+    sent = 0
+    event = None
+    for frame in source.frames():
+        ring.write(frame)
+        event = endpointer.process(frame)
+        if speech_start is None:
+            if event == "start":
+                onset = ring.end - endpointer.start_frames * len(frame)
+                speech_start = sent = max(ring.start, onset - rate * preroll_ms // 1000)
+            elif timeout is not None and ring.end >= timeout * rate:
+                raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+            continue
+
+        over_limit = phrase_time_limit is not None and ring.end - speech_start >= phrase_time_limit * rate
+        if ring.end - sent >= chunk or event == "end" or over_limit:
+            partial = backend.accept(ring.read(sent, ring.end))
+            sent = ring.end
+            if partial and (not partials or partial != partials[-1]):
+                partials.append(partial)
+                if on_partial:
+                    on_partial(partial)
+        if event == "end" or over_limit:
+            break
+
+    if speech_start is None:
+        raise sr.WaitTimeoutError("audio ended before any speech was detected")
+    if sent < ring.end:
+        backend.accept(ring.read(sent, ring.end))
+
+    trailing = endpointer.silent_run * source.frame_samples if event == "end" else 0
+    detected = time.monotonic()
+    with tracing.span("recognize"):
+        text = backend.finish()
+    return Utterance(
+        text=text,
+        partials=partials,
+        speech_start=speech_start / rate,
+        speech_end=(ring.end - trailing) / rate,
+        endpoint_delay=trailing / rate,
+        recognition_latency=time.monotonic() - detected,
+    )
+
+
+# Uploaded WAV bytes (e.g. a browser recording) -> int16 mono samples and the sample rate
+def decode_wav(data):
+    with wave.open(io.BytesIO(data), "rb") as f:
+        if f.getsampwidth() != SAMPLE_WIDTH:
+            raise ValueError("expected 16-bit PCM audio")
+        channels, rate = f.getnchannels(), f.getframerate()
+        samples = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+    if channels > 1:
+        samples = samples[:len(samples) // channels * channels].reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return samples, rate
+
+
+# A whole recorded answer: speech bounds from frame energies against the clip's own noise floor,
+# then the voiced part (with some padding) goes to the backend in one piece
+def recognize_clip(samples, sample_rate, backend, frame_ms=FRAME_MS, pad_ms=300):
+    endpointer = EnergyEndpointer(frame_ms)
+    frame = sample_rate * frame_ms // 1000
+    count = len(samples) // frame
+    if count == 0:
+        raise sr.WaitTimeoutError("the recording is empty")
+    frames = samples[:count * frame].reshape(count, frame).astype(np.float32)
+    energy = np.sqrt(np.mean(np.square(frames), axis=1))
+    threshold = max(endpointer.min_threshold, float(np.percentile(energy, 10)) * endpointer.multiplier)
+    voiced = np.flatnonzero(energy > threshold)
+    if len(voiced) == 0:
+        raise sr.WaitTimeoutError("no speech in the recording")
+    speech_start, speech_end = voiced[0] * frame, (voiced[-1] + 1) * frame
+    pad = sample_rate * pad_ms // 1000
+
+    backend.start(sample_rate)
+    backend.accept(samples[max(0, speech_start - pad):speech_end + pad])
+    started = time.monotonic()
+    text = backend.finish()
+    return Utterance(
+        text=text,
+        partials=[],
+        speech_start=speech_start / sample_rate,
+        speech_end=speech_end / sample_rate,
+        endpoint_delay=0.0,
+        recognition_latency=time.monotonic() - started,
+    )
+
+
+# Input and backend for the pages: SPEECH_INPUT_WAV replays a file instead of the
+# microphone, SPEECH_BACKEND=offline uses the stand-in with the WAV's .txt transcript
+def open_source():
+    path = os.environ.get("SPEECH_INPUT_WAV")
+    if path:
+        return WavFileSource(path, realtime=True, loop=True)
+    return MicrophoneSource()
+
+
+def make_backend():
+    if os.environ.get("SPEECH_BACKEND") == "offline":
+        path = os.environ.get("SPEECH_INPUT_WAV")
+        return OfflineBackend.for_wav(path) if path else OfflineBackend()
+    return GoogleBackend()
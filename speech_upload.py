@@ -0,0 +1,171 @@
+import multiprocessing
+import os
+import threading
+import wave
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+import speech_recognition as sr
+
+import speech_stream
+import tracing
+
+# CAPTURE_MODE=browser records each answer in the user's browser (st.audio_input) instead of
+# the server microphone, so any number of users can practice against one server
+CAPTURE_MODE = os.environ.get("CAPTURE_MODE", "server")
+BROWSER = CAPTURE_MODE == "browser"
+SPEECH_WORKERS = int(os.environ.get("SPEECH_WORKERS") or 0) or os.cpu_count() or 1
+
+
+# Backpressure: every worker and queue slot is taken. Pages already report RequestError.
+class PoolBusy(sr.RequestError):
+    pass
+
+
+# A worker died (and the pool was rebuilt) or the answer took too long; pages show their
+# "service unavailable" message and the user records again
+class PoolFailed(sr.RequestError):
+    pass
+
+
+# The upload is not a WAV the decoder can read; pages show "could not understand"
+class BadRecording(sr.UnknownValueError):
+    pass
+
+
+_backend_factory = None
+
+
+def _init_worker(backend_factory):
+    global _backend_factory
+    _backend_factory = backend_factory
+
+
+# Runs in a worker process: decode, recognize, then optionally score the text there as well.
+# Returns the Utterance, or (Utterance, score) when a scorer is given.
+def _process(audio, scorer, args):
+    try:
+        samples, rate = speech_stream.decode_wav(audio)
+    except (ValueError, EOFError, wave.Error) as e:
+        raise BadRecording(f"unreadable recording: {e}")
+    utterance = speech_stream.recognize_clip(samples, rate, _backend_factory())
+    if scorer is None:
+        return utterance
+    return utterance, scorer(utterance.text, *args)
+
+
+def _ready():
+    return os.getpid()
+
+
+# Recognition and text scoring for uploaded answers on a bounded process pool. At most
+# max_pending answers are queued or running; beyond that submit() waits up to `wait` seconds
+# for a slot and then raises PoolBusy. Scorers must be importable top-level callables.
+# Futures only fail with speech_recognition errors (PoolFailed, BadRecording, ...), which the
+# pages already report. A pool whose worker died is replaced before the next answer.
+class RecognitionPool:
+    def __init__(self, workers=SPEECH_WORKERS, max_pending=None, backend_factory=speech_stream.make_backend):
+        self.workers = workers
+        self.max_pending = max_pending or workers * 2
+        self.backend_factory = backend_factory
+        self.executor = self._make_executor()
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self.stats = {"submitted": 0, "rejected": 0, "completed": 0, "failed": 0, "restarts": 0}
+
+    # spawn: workers never inherit the server's threads, sockets or model
+    def _make_executor(self):
+        return ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_worker, initargs=(self.backend_factory,))
+
+    # Replace a broken executor once, however many of its futures report it
+    def _rebuild(self, broken):
+        with self._lock:
+            if self.executor is not broken:
+                return
+            self.executor = self._make_executor()
+            self.stats["restarts"] += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, audio, scorer=None, args=(), wait=2.0):
+        if not self._slots.acquire(timeout=wait):
+            with self._lock:
+                self.stats["rejected"] += 1
+            raise PoolBusy("too many answers are being scored right now, please try again")
+        outer = Future()
+        try:
+            for attempt in range(2):
+                executor = self.executor
+                try:
+                    future = executor.submit(_process, bytes(audio), scorer, tuple(args))
+                    break
+                except BrokenProcessPool:
+                    self._rebuild(executor)  # a worker died since the last answer: one retry on a new pool
+                    if attempt:
+                        raise PoolFailed("the speech workers are restarting, please try again")
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.stats["submitted"] += 1
+        future.add_done_callback(partial(self._finished, outer, executor))
+        return outer
+
+    def _finished(self, outer, executor, future):
+        self._slots.release()
+        error = PoolFailed("the speech workers restarted, please record again") if future.cancelled() else future.exception()
+        with self._lock:
+            self.stats["failed" if error else "completed"] += 1
+        if isinstance(error, BrokenProcessPool):
+            self._rebuild(executor)
+            error = PoolFailed("a speech worker stopped, please record again")
+        if error is not None:
+            outer.set_exception(error)
+        else:
+            outer.set_result(future.result())
+
+    # Blocking form for the pages; the script thread only waits, the work is in the pool
+    def recognize(self, audio, scorer=None, args=(), timeout=60):
+        with tracing.span("recognize"):
+            future = self.submit(audio, scorer, args)
+            try:
+                return future.result(timeout)
+            except TimeoutError:
+                raise PoolFailed(f"no result within {timeout} s, please record again")
+
+    # Start every worker process ahead of the first answer
+    def warm_up(self):
+        for future in [self.executor.submit(_ready) for _ in range(self.workers)]:
+            future.result()
+        return self
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+# One pool per server process, shared by every session and page
+def get_pool(**kwargs):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = RecognitionPool(**kwargs)
+        return _pool
+
+
+# Browser recorder for one answer. Returns the WAV bytes once per new recording, None otherwise,
+# so reruns (buttons, sliders) never resubmit the same audio.
+def new_recording(label, key):
+    import streamlit as st
+    recording = st.audio_input(label, key=key, sample_rate=speech_stream.SAMPLE_RATE)
+    if recording is None:
+        return None
+    seen = f"{key}_seen"
+    if st.session_state.get(seen) == recording.file_id:
+        return None
+    st.session_state[seen] = recording.file_id
+    return recording.getvalue()
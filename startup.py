@@ -0,0 +1,187 @@
+import json
+import os
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+MODEL_NAME = 'paraphrase-MiniLM-L6-v2'
+PRECISIONS = ('float32', 'int8')
+
+# Written by benchmarks.model_parity when int8 scores match float32 on this machine's model
+PARITY_FILE = os.environ.get('MODEL_PARITY_FILE', os.path.join('.cache', 'model_parity.json'))
+
+
+# MODEL_PRECISION=int8 is opt-in and only honored once the parity harness has passed for this
+# model; until then the app stays on float32
+def _model_precision(requested):
+    if requested not in PRECISIONS:
+        raise ValueError(f"unknown MODEL_PRECISION {requested!r}, expected one of {PRECISIONS}")
+    if requested == 'float32':
+        return requested
+    try:
+        with open(PARITY_FILE, encoding='utf-8') as f:
+            parity = json.load(f)
+    except (OSError, ValueError):
+        parity = {}
+    if parity.get('passed') and parity.get('model') == MODEL_NAME and parity.get('precision') == requested:
+        return requested
+    warnings.warn(f"MODEL_PRECISION={requested} ignored: run `python -m benchmarks.model_parity` first "
+                  f"(no passing record in {PARITY_FILE}); loading float32")
+    return 'float32'
+
+
+# CPU inference settings: MODEL_PRECISION=int8 quantizes the linear layers, MODEL_THREADS caps torch's threads
+MODEL_PRECISION = _model_precision(os.environ.get('MODEL_PRECISION', 'float32'))
+MODEL_THREADS = int(os.environ.get('MODEL_THREADS') or 0) or None
+
+# Name for the embedding cache and encode service; int8 vectors never mix with float32 ones
+MODEL_ID = MODEL_NAME if MODEL_PRECISION == 'float32' else f'{MODEL_NAME}-{MODEL_PRECISION}'
+
+# NLTK packages used by the pages and where nltk.data.find() looks for them
+NLTK_RESOURCES = {
+    'punkt': 'tokenizers/punkt',
+    'stopwords': 'corpora/stopwords',
+    'gutenberg': 'corpora/gutenberg',
+    'wordnet': 'corpora/wordnet',
+}
+
+_checked = set()
+_package_locks = {}  # package -> lock held while it is checked or downloaded
+_checked_lock = threading.Lock()
+
+
+# Download NLTK data only if it is missing, and check each package once per process; a failed
+# download is tried again on the next call. Each package has its own lock, so a page waiting for
+# punkt never queues behind the warm-up's wordnet download.
+def ensure_nltk_data(*packages):
+    for package in packages:
+        with _checked_lock:
+            if package in _checked:
+                continue
+            lock = _package_locks.setdefault(package, threading.Lock())
+        with lock:
+            if package in _checked:
+                continue
+            import nltk
+            try:
+                nltk.data.find(NLTK_RESOURCES.get(package, package))
+            except LookupError:
+                if not nltk.download(package, quiet=True):
+                    continue
+            with _checked_lock:
+                _checked.add(package)
+
+
+# Sentence-BERT in the given precision. int8 is dynamic quantization: Linear weights are stored
+# as int8 and activations are quantized per batch, on the CPU.
+def load_sentence_model(precision='float32', threads=None):
+    if precision not in PRECISIONS:
+        raise ValueError(f"unknown model precision {precision!r}, expected one of {PRECISIONS}")
+    import torch
+    from sentence_transformers import SentenceTransformer
+    if threads:
+        torch.set_num_threads(threads)
+    if precision == 'float32':
+        return SentenceTransformer(MODEL_NAME)
+    # fbgemm/x86 kernels on Intel and AMD, qnnpack on ARM
+    engines = torch.backends.quantized.supported_engines
+    if torch.backends.quantized.engine not in engines or torch.backends.quantized.engine == 'none':
+        torch.backends.quantized.engine = next(e for e in ('x86', 'fbgemm', 'qnnpack') if e in engines)
+    model = SentenceTransformer(MODEL_NAME, device='cpu')
+    model.eval()
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+# Heavy resources are built on first request; imports stay inside the loaders
+def _load_sentence_model():
+    return load_sentence_model(MODEL_PRECISION, MODEL_THREADS)
+
+
+# The pyttsx3 engine is created on the TTS cache's worker thread, the only thread that uses it
+def _load_tts_engine():
+    import tts_cache
+    return tts_cache.get_tts("pyttsx3").warm_up()
+
+
+def _load_nltk_data():
+    ensure_nltk_data(*NLTK_RESOURCES)
+
+
+# Synonym quiz bank, built from WordNet the first time (minutes); pages use Datamuse until then
+def _load_synonym_bank():
+    import synonym_bank
+    return synonym_bank.load_or_build()
+
+
+# Austen sentences pre-scored by emotion and speaking time for the emotion page
+def _load_sentence_index():
+    import sentence_index
+    return sentence_index.load_or_build()
+
+
+# Browser capture only: spawns the recognition workers before the first recording arrives
+def _load_speech_pool():
+    import speech_upload
+    return speech_upload.get_pool().warm_up()
+
+
+LOADERS = {
+    "minilm": _load_sentence_model,
+    "tts": _load_tts_engine,
+    "nltk": _load_nltk_data,
+    "speech_pool": _load_speech_pool,
+    "sentence_index": _load_sentence_index,
+    "synonym_bank": _load_synonym_bank,
+}
+
+_executor = ThreadPoolExecutor(max_workers=len(LOADERS), thread_name_prefix="warm-up")
+_futures = {}
+_futures_lock = threading.Lock()
+
+
+# Readiness future for a named resource, starting its loader if nobody has yet. A loader that
+# fails is forgotten, so the next request loads it again (like st.cache_resource, which never
+# caches exceptions).
+def resource(name):
+    with _futures_lock:
+        future = _futures.get(name)
+        if future is not None:
+            return future
+        future = _futures[name] = _executor.submit(LOADERS[name])
+    future.add_done_callback(partial(_forget_failure, name))  # may run now, so outside the lock
+    return future
+
+
+def _forget_failure(name, future):
+    if future.cancelled() or future.exception() is not None:
+        with _futures_lock:
+            if _futures.get(name) is future:
+                del _futures[name]
+
+
+def get(name):
+    return resource(name).result()
+
+
+# Resources that finished loading, by name (for the memory report)
+def loaded():
+    with _futures_lock:
+        futures = dict(_futures)
+    return {name: f.result() for name, f in futures.items() if f.done() and f.exception() is None}
+
+
+# Block the script on a resource, with a spinner only if it is still loading
+def wait_for(name, message="⏳ Loading..."):
+    future = resource(name)
+    if not future.done():
+        import streamlit as st  # only the pages need it; speech pool workers import this module too
+        with st.spinner(message):
+            return future.result()
+    return future.result()
+
+
+# Called once from app.py so the model and TTS engine load while the first page renders
+def warm_up(names=("minilm", "tts", "nltk")):
+    for name in names:
+        resource(name)
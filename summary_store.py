@@ -0,0 +1,274 @@
+import argparse
+import json
+import os
+import threading
+
+import numpy as np
+
+from atomic_files import save_array, write_bytes
+
+DEFAULT_STORE_DIR = os.path.join(".cache", "summaries")
+OVERLAY_NAME = "overlay.jsonl"
+
+
+# Lookup key for a title: case- and whitespace-insensitive
+def title_key(title):
+    return " ".join(title.split()).casefold()
+
+
+# First 8 bytes of a key as a big-endian integer: sorts like the key itself
+def _head(key_bytes):
+    return int.from_bytes(key_bytes[:8].ljust(8, b"\0"), "big")
+
+
+def _blob(strings):
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return b"".join(encoded), offsets
+
+
+def _map(path):
+    # np.memmap cannot map an empty file
+    if os.path.getsize(path) == 0:
+        return np.zeros(0, dtype=np.uint8)
+    return np.memmap(path, dtype=np.uint8, mode="r")
+
+
+# Offline Wikipedia summaries. Built once from a JSONL dump into memory-mapped blobs:
+#   keys.bin + key_offsets.npy        casefolded titles in byte order
+#   heads.npy                         first 8 key bytes as uint64, the top levels of the trie
+#   titles.bin + title_offsets.npy    display titles, same order
+#   text.bin + text_offsets.npy       summaries, same order
+#   rank.npy                          typeahead order (lower first)
+# The sorted key blob is a flattened prefix trie: every trie node is the contiguous range of
+# keys sharing its prefix, found by np.searchsorted over heads.npy and a short binary search
+# among keys with equal heads. Titles fetched live are appended to overlay.jsonl
+# (write-through) and merged into the blobs by compact().
+class SummaryStore:
+    def __init__(self, directory=DEFAULT_STORE_DIR):
+        self.directory = directory
+        self.count = 0
+        self._lock = threading.Lock()
+        self._overlay = {}
+        self._overlay_path = os.path.join(directory, OVERLAY_NAME)
+        self._open()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _open(self):
+        meta_path = self._path("meta.json")
+        self.count = 0
+        self._release()
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                self.count = json.load(f)["count"]
+            self._keys = _map(self._path("keys.bin"))
+            self._titles = _map(self._path("titles.bin"))
+            self._text = _map(self._path("text.bin"))
+            self._key_offsets = np.load(self._path("key_offsets.npy"), mmap_mode="r")
+            self._title_offsets = np.load(self._path("title_offsets.npy"), mmap_mode="r")
+            self._text_offsets = np.load(self._path("text_offsets.npy"), mmap_mode="r")
+            self._rank = np.load(self._path("rank.npy"), mmap_mode="r")
+            self._heads = np.load(self._path("heads.npy"), mmap_mode="r")
+        self._overlay = {}
+        if os.path.exists(self._overlay_path):
+            with open(self._overlay_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # a torn last line from an interrupted write
+                    self._overlay[title_key(record["title"])] = (record["title"], record["summary"])
+
+    def __len__(self):
+        return self.count + len(self._overlay)
+
+    def _key(self, i):
+        return self._keys[self._key_offsets[i]:self._key_offsets[i + 1]].tobytes()
+
+    def _title(self, i):
+        return self._titles[self._title_offsets[i]:self._title_offsets[i + 1]].tobytes().decode("utf-8")
+
+    # First index whose key is >= target (bytes order equals code point order in UTF-8)
+    def _lower_bound(self, target):
+        if not self.count:
+            return 0
+        head = np.uint64(_head(target))
+        lo = int(np.searchsorted(self._heads, head, "left"))
+        hi = int(np.searchsorted(self._heads, head, "right"))
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _find(self, key):
+        target = key.encode("utf-8")
+        i = self._lower_bound(target)
+        return i if i < self.count and self._key(i) == target else None
+
+    # Range [lo, hi) of keys starting with prefix; 0xff never occurs in UTF-8
+    def _prefix_range(self, prefix):
+        target = prefix.encode("utf-8")
+        return self._lower_bound(target), self._lower_bound(target + b"\xff")
+
+    # Summary as a view into the mapped blob, no copy
+    def get_bytes(self, title):
+        key = title_key(title)
+        entry = self._overlay.get(key)
+        if entry is not None:
+            return memoryview(entry[1].encode("utf-8"))
+        i = self._find(key)
+        if i is None:
+            return None
+        return memoryview(self._text)[self._text_offsets[i]:self._text_offsets[i + 1]]
+
+    def get(self, title):
+        view = self.get_bytes(title)
+        return None if view is None else str(view, "utf-8")
+
+    def __contains__(self, title):
+        key = title_key(title)
+        return key in self._overlay or self._find(key) is not None
+
+    # Display titles starting with prefix, best ranked first
+    def suggest(self, prefix, limit=8):
+        key = title_key(prefix)
+        if not key:
+            return []
+        titles = []
+        lo, hi = self._prefix_range(key)
+        if lo < hi:
+            ranks = np.asarray(self._rank[lo:hi])
+            top = np.arange(hi - lo)
+            if hi - lo > limit:
+                top = np.sort(np.argpartition(ranks, limit)[:limit])
+            top = top[np.argsort(ranks[top], kind="stable")]
+            titles = [self._title(lo + int(i)) for i in top]
+        extra = sorted((title for k, (title, _) in self._overlay.items() if k.startswith(key) and self._find(k) is None),
+                       key=len)
+        return (extra + titles)[:limit]
+
+    # Write-through for summaries fetched from the live API
+    def add(self, title, summary):
+        key = title_key(title)
+        with self._lock:
+            if key in self._overlay:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self._overlay_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"title": title, "summary": summary}) + "\n")
+            self._overlay[key] = (title, summary)
+
+    def records(self):
+        for i in range(self.count):
+            text = self._text[self._text_offsets[i]:self._text_offsets[i + 1]].tobytes().decode("utf-8")
+            yield {"title": self._title(i), "summary": text, "rank": int(self._rank[i])}
+        for title, summary in self._overlay.values():
+            yield {"title": title, "summary": summary}
+
+    # Merge the overlay into the mapped blobs and start a fresh overlay
+    def compact(self):
+        with self._lock:
+            records = list(self.records())
+            self._release()
+            write_store(records, self.directory)
+            if os.path.exists(self._overlay_path):
+                os.remove(self._overlay_path)
+            self._open()
+
+    def _release(self):
+        self._keys = self._titles = self._text = None
+        self._key_offsets = self._title_offsets = self._text_offsets = self._rank = self._heads = None
+
+
+# Records are {"title", "summary"} (or "extract"/"text"), optionally "rank" or "views".
+# Duplicate titles keep the first record. Without a rank, shorter titles suggest first.
+def write_store(records, directory=DEFAULT_STORE_DIR):
+    entries = {}
+    for record in records:
+        title = record.get("title")
+        summary = record.get("summary") or record.get("extract") or record.get("text")
+        if not title or not summary:
+            continue
+        key = title_key(title)
+        if key in entries:
+            continue
+        if "rank" in record:
+            rank = int(record["rank"])
+        elif "views" in record:
+            rank = -int(record["views"])
+        else:
+            rank = len(title)
+        entries[key] = (title, summary.strip(), rank)
+
+    keys = sorted(entries, key=lambda k: k.encode("utf-8"))
+    os.makedirs(directory, exist_ok=True)
+    path = lambda name: os.path.join(directory, name)
+    for name, strings in (("keys", keys), ("titles", [entries[k][0] for k in keys]),
+                          ("text", [entries[k][1] for k in keys])):
+        blob, offsets = _blob(strings)
+        write_bytes(path(f"{name}.bin"), blob)
+        prefix = "key" if name == "keys" else name.rstrip("s")
+        save_array(path(f"{prefix}_offsets.npy"), offsets)
+    save_array(path("heads.npy"), np.array([_head(k.encode("utf-8")) for k in keys], dtype=np.uint64))
+    save_array(path("rank.npy"), np.array([entries[k][2] for k in keys], dtype=np.int64))
+    # meta.json last: a store without it is treated as empty
+    write_bytes(path("meta.json"), json.dumps({"count": len(keys)}).encode("utf-8"))
+    return len(keys)
+
+
+def build_from_jsonl(paths, directory=DEFAULT_STORE_DIR):
+    def records():
+        for p in paths:
+            with open(p, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+    return write_store(records(), directory)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+# One store per directory per process; the maps are shared by every session
+def get_store(directory=DEFAULT_STORE_DIR):
+    with _stores_lock:
+        store = _stores.get(directory)
+        if store is None:
+            store = _stores[directory] = SummaryStore(directory)
+        return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline Wikipedia summary store")
+    parser.add_argument("--dir", default=DEFAULT_STORE_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="build from JSONL dumps of {title, summary}")
+    build.add_argument("paths", nargs="+")
+    sub.add_parser("compact", help="merge live-fetched summaries into the store")
+    lookup = sub.add_parser("get")
+    lookup.add_argument("title")
+    suggest = sub.add_parser("suggest")
+    suggest.add_argument("prefix")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        print(f"{build_from_jsonl(args.paths, args.dir)} summaries -> {args.dir}")
+    elif args.command == "compact":
+        store = SummaryStore(args.dir)
+        store.compact()
+        print(f"{len(store)} summaries in {args.dir}")
+    elif args.command == "get":
+        print(SummaryStore(args.dir).get(args.title))
+    else:
+        print("\n".join(SummaryStore(args.dir).suggest(args.prefix)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import argparse
+import json
+import os
+import random
+
+import numpy as np
+
+DEFAULT_BANK_PATH = os.path.join(".cache", "synonym_bank.npz")
+
+
+# A bank question as word ids: sessions keep three references, the words stay in the bank
+class BankQuestion:
+    __slots__ = ("bank", "headword", "answer_id")
+
+    def __init__(self, bank, headword, answer_id):
+        self.bank = bank
+        self.headword = headword
+        self.answer_id = answer_id
+
+    @property
+    def word(self):
+        return self.bank.words[self.headword]
+
+    @property
+    def question(self):
+        return f"What is another word for '{self.word}'?"
+
+    @property
+    def answer(self):
+        return self.bank.words[self.answer_id].lower()
+
+    # Every synonym of the headword is an accepted answer
+    @property
+    def synonyms(self):
+        bank = self.bank
+        return [bank.words[j] for j in bank.syn_ids[bank.syn_offsets[self.headword]:bank.syn_offsets[self.headword + 1]]]
+
+
+# Offline synonym graph: interned words plus a CSR index headword -> synonym ids
+class SynonymBank:
+    def __init__(self, words, syn_offsets, syn_ids):
+        self.words = words
+        self.syn_offsets = syn_offsets
+        self.syn_ids = syn_ids
+        # Only words with at least one synonym can be asked about
+        self.headwords = np.flatnonzero(np.diff(syn_offsets)).astype(np.int32)
+        self.index = {word: i for i, word in enumerate(words)}
+
+    def __len__(self):
+        return len(self.headwords)
+
+    def synonyms(self, word):
+        i = self.index.get(word)
+        if i is None:
+            return []
+        return [self.words[j] for j in self.syn_ids[self.syn_offsets[i]:self.syn_offsets[i + 1]]]
+
+    def _question(self, headword, rng):
+        start, end = self.syn_offsets[headword], self.syn_offsets[headword + 1]
+        return BankQuestion(self, int(headword), int(self.syn_ids[rng.randrange(start, end)]))
+
+    # Same fields as the Datamuse question, drawn in constant time
+    def random_question(self, rng=random):
+        return self._question(self.headwords[rng.randrange(len(self.headwords))], rng)
+
+    # Distinct headwords; pass a seed for a reproducible quiz
+    def questions(self, amount, seed=None):
+        rng = random.Random(seed)
+        picks = rng.sample(range(len(self.headwords)), min(amount, len(self.headwords)))
+        return [self._question(self.headwords[i], rng) for i in picks]
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        encoded = [word.encode("utf-8") for word in self.words]
+        word_offsets = np.zeros(len(encoded) + 1, dtype=np.int32)
+        np.cumsum([len(w) for w in encoded], out=word_offsets[1:])
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path,
+                 word_blob=np.frombuffer(b"".join(encoded), dtype=np.uint8),
+                 word_offsets=word_offsets,
+                 syn_offsets=self.syn_offsets,
+                 syn_ids=self.syn_ids)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            blob = data["word_blob"].tobytes()
+            offsets = data["word_offsets"]
+            words = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+            return cls(words, data["syn_offsets"], data["syn_ids"])
+
+    # Build from {headword: [synonym, ...]}; words are interned once and ids are int32
+    @classmethod
+    def from_pairs(cls, synonyms_by_word):
+        ids = {}
+        for word, synonyms in synonyms_by_word.items():
+            ids.setdefault(word, len(ids))
+            for synonym in sorted(synonyms):
+                ids.setdefault(synonym, len(ids))
+        words = list(ids)
+        syn_offsets = np.zeros(len(words) + 1, dtype=np.int32)
+        rows = [[] for _ in words]
+        for word, synonyms in synonyms_by_word.items():
+            rows[ids[word]] = sorted({ids[s] for s in synonyms if s != word})
+        np.cumsum([len(row) for row in rows], out=syn_offsets[1:])
+        syn_ids = np.fromiter((j for row in rows for j in row), dtype=np.int32, count=int(syn_offsets[-1]))
+        return cls(words, syn_offsets, syn_ids)
+
+
+# Keep single alphabetic words, like the Datamuse "sp=<letter>*" quiz words
+def is_quiz_word(word):
+    return word.isalpha() and word.isascii()
+
+
+# Datamuse dumps: JSON objects mapping a headword to the raw "rel_syn" response list
+def build_from_datamuse(paths):
+    synonyms_by_word = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            dump = json.load(f)
+        for word, results in dump.items():
+            word = word.lower()
+            if not is_quiz_word(word):
+                continue
+            synonyms = [r["word"].lower() for r in results if is_quiz_word(r.get("word", ""))]
+            synonyms_by_word.setdefault(word, set()).update(synonyms)
+    return SynonymBank.from_pairs(synonyms_by_word)
+
+
+def build_from_wordnet():
+    from startup import ensure_nltk_data
+    ensure_nltk_data('wordnet')
+    from nltk.corpus import wordnet
+
+    synonyms_by_word = {}
+    for synset in wordnet.all_synsets():
+        lemmas = {name.lower() for name in synset.lemma_names() if is_quiz_word(name)}
+        for lemma in sorted(lemmas):
+            synonyms_by_word.setdefault(lemma, set()).update(lemmas - {lemma})
+    return SynonymBank.from_pairs(synonyms_by_word)
+
+
+# Load the bank if it was built before, otherwise build it from WordNet and save it
+def load_or_build(path=DEFAULT_BANK_PATH):
+    if os.path.exists(path):
+        return SynonymBank.load(path)
+    bank = build_from_wordnet()
+    bank.save(path)
+    return bank
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the offline synonym question bank")
+    parser.add_argument("--datamuse", nargs="+", metavar="DUMP", help="Datamuse-format JSON dumps")
+    parser.add_argument("--wordnet", action="store_true", help="build from NLTK WordNet")
+    parser.add_argument("-o", "--output", default=DEFAULT_BANK_PATH)
+    args = parser.parse_args()
+
+    if args.datamuse:
+        bank = build_from_datamuse(args.datamuse)
+    elif args.wordnet:
+        bank = build_from_wordnet()
+    else:
+        parser.error("choose --datamuse DUMP... or --wordnet")
+    bank.save(args.output)
+    print(f"{len(bank)} headwords, {len(bank.words)} words, {len(bank.syn_ids)} links -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
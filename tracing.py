@@ -0,0 +1,232 @@
+import json
+import os
+import threading
+import time
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ENABLED = os.environ.get("TRACING", "1") != "0"
+METRIC_NAME = "speech_stage_latency_seconds"
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+# HDR-style latency histogram: integer microseconds in log-linear buckets. Values below
+# 2 * SUB_BUCKETS are exact; above that every power of two is split into SUB_BUCKETS
+# bins, so any recorded value is off by less than 1 / SUB_BUCKETS (< 1%).
+class LatencyHistogram:
+    SUB_BITS = 7
+    SUB_BUCKETS = 1 << SUB_BITS
+
+    def __init__(self, highest_seconds=300):
+        self.highest = int(highest_seconds * 1e6)
+        self.counts = [0] * (self._index(self.highest) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def _index(self, micros):
+        shift = micros.bit_length() - self.SUB_BITS - 1
+        if shift <= 0:
+            return micros
+        return (shift << self.SUB_BITS) + (micros >> shift)
+
+    # Midpoint of the value range a bucket covers, in microseconds
+    def _value(self, index):
+        if index < 2 * self.SUB_BUCKETS:
+            return index
+        shift = (index >> self.SUB_BITS) - 1
+        sub = index - (shift << self.SUB_BITS)
+        return (sub << shift) + (1 << (shift - 1))
+
+    # Hot path: bucket math is inlined, the max is read back from the buckets instead
+    def record(self, seconds, error=False):
+        micros = int(seconds * 1e6)
+        if micros > self.highest:
+            micros = self.highest
+        elif micros < 0:
+            micros = 0
+        shift = micros.bit_length() - self.SUB_BITS - 1
+        index = micros if shift <= 0 else (shift << self.SUB_BITS) + (micros >> shift)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += micros
+            if error:
+                self.errors += 1
+
+    @property
+    def max(self):
+        for index in range(len(self.counts) - 1, -1, -1):
+            if self.counts[index]:
+                return self._value(index)
+        return 0
+
+    # Seconds at each quantile, read in one pass over the buckets
+    def quantiles(self, qs=QUANTILES):
+        with self._lock:
+            counts, count = list(self.counts), self.count
+        if not count:
+            return [0.0] * len(qs)
+        targets = [max(1, int(q * count + 0.5)) for q in qs]
+        values = [None] * len(qs)
+        seen = 0
+        for index, n in enumerate(counts):
+            if not n:
+                continue
+            seen += n
+            for i, target in enumerate(targets):
+                if values[i] is None and seen >= target:
+                    values[i] = self._value(index) / 1e6
+            if values[-1] is not None:
+                break
+        return values
+
+    def summary(self):
+        p50, p95, p99 = self.quantiles()
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_s": self.total / self.count / 1e6 if self.count else 0.0,
+            "p50_s": p50,
+            "p95_s": p95,
+            "p99_s": p99,
+            "max_s": self.max / 1e6,
+        }
+
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+# One histogram per stage name, shared by every session in the process
+def histogram(stage):
+    h = _histograms.get(stage)
+    if h is None:
+        with _histograms_lock:
+            h = _histograms.setdefault(stage, LatencyHistogram())
+    return h
+
+
+# Times a block into its stage's histogram; exceptions are counted and re-raised
+class span:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if ENABLED:
+            histogram(self.stage).record(time.perf_counter() - self.start, error=exc_type is not None)
+        return False
+
+
+# Decorator form of span()
+def traced(stage):
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def snapshot():
+    with _histograms_lock:
+        items = sorted(_histograms.items())
+    return {stage: h.summary() for stage, h in items}
+
+
+def reset():
+    with _histograms_lock:
+        _histograms.clear()
+
+
+def to_json():
+    return json.dumps(snapshot(), indent=2)
+
+
+# Prometheus text exposition format: one summary family labelled by stage
+def to_prometheus():
+    lines = [
+        f"# HELP {METRIC_NAME} Latency of app hot-path stages (microphone, recognition, encoding, fetches, TTS)",
+        f"# TYPE {METRIC_NAME} summary",
+    ]
+    errors = []
+    with _histograms_lock:
+        items = sorted(_histograms.items())
+    for stage, h in items:
+        for q, value in zip(QUANTILES, h.quantiles()):
+            lines.append(f'{METRIC_NAME}{{stage="{stage}",quantile="{q}"}} {value:.6f}')
+        lines.append(f'{METRIC_NAME}_sum{{stage="{stage}"}} {h.total / 1e6:.6f}')
+        lines.append(f'{METRIC_NAME}_count{{stage="{stage}"}} {h.count}')
+        errors.append(f'speech_stage_errors_total{{stage="{stage}"}} {h.errors}')
+    lines += ["# HELP speech_stage_errors_total Stage calls that raised", "# TYPE speech_stage_errors_total counter"]
+    return "\n".join(lines + errors) + "\n"
+
+
+# Atomic replace, so a node_exporter textfile collector never reads a partial file
+def write_prometheus(path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(to_prometheus())
+    os.replace(tmp, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith("/metrics.json"):
+            body, content_type = to_json(), "application/json"
+        elif self.path.startswith("/metrics"):
+            body, content_type = to_prometheus(), "text/plain; version=0.0.4"
+        else:
+            self.send_error(404)
+            return
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+# Serves /metrics (Prometheus) and /metrics.json on port, and/or rewrites a Prometheus
+# text file every interval seconds. Safe to call on every app.py rerun.
+def start_exporter(port=None, path=None, interval=15, host="127.0.0.1"):
+    global _exporter
+    with _exporter_lock:
+        if _exporter is not None:
+            return _exporter
+        _exporter = {"port": None, "path": path}
+        if port not in (None, ""):
+            server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+            threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+            _exporter["port"] = server.server_address[1]
+            _exporter["server"] = server
+        if path:
+            def write_loop():
+                while True:
+                    try:
+                        write_prometheus(path)
+                    except OSError:
+                        pass
+                    time.sleep(interval)
+            threading.Thread(target=write_loop, name="metrics-file", daemon=True).start()
+        return _exporter
+
+
+def exporter():
+    return _exporter
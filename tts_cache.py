@@ -0,0 +1,286 @@
+import collections
+import hashlib
+import io
+import os
+import queue
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+
+import tracing
+
+DEFAULT_CACHE_DIR = os.path.join(".cache", "tts")
+DISK_BYTES = 256 * 1024 * 1024  # per engine; least recently used files go first
+EXTENSIONS = {"audio/mp3": ".mp3", "audio/wav": ".wav"}
+
+
+# Content address for one rendering of a text
+def audio_key(engine, text, voice, rate):
+    return hashlib.blake2b(f"{engine}\0{voice}\0{rate}\0{text}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+# Google TTS: MP3 bytes; voice is the language code and a rate below 1 selects slow speech
+class GTTSSynthesizer:
+    name = "gtts"
+    mime = "audio/mp3"
+    default_voice = "en"
+    default_rate = 1.0
+    workers = 4  # network-bound, safe to overlap
+
+    def __init__(self, tts_class=None):
+        self.tts_class = tts_class  # any gTTS-compatible class; benchmarks pass a local stand-in
+
+    def __call__(self, text, voice, rate):
+        tts_class = self.tts_class
+        if tts_class is None:
+            from gtts import gTTS as tts_class
+        buffer = io.BytesIO()
+        tts_class(text=text, lang=voice, slow=rate < 1).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+# Offline pyttsx3 engine: WAV bytes through a private temp file. The engine is created
+# on the worker thread and only ever used there.
+class Pyttsx3Synthesizer:
+    name = "pyttsx3"
+    mime = "audio/wav"
+    default_voice = None
+    default_rate = 150
+    workers = 1  # pyttsx3 engines are not thread-safe
+
+    def __init__(self):
+        self.engine = None
+
+    def warm_up(self):
+        if self.engine is None:
+            import pyttsx3
+            self.engine = pyttsx3.init()
+            self.engine.setProperty('volume', 1)
+
+    def __call__(self, text, voice, rate):
+        self.warm_up()
+        self.engine.setProperty('rate', rate)
+        if voice:
+            self.engine.setProperty('voice', voice)
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            self.engine.save_to_file(text, path)
+            self.engine.runAndWait()
+            with open(path, "rb") as f:
+                return f.read()
+        finally:
+            os.remove(path)
+
+
+SYNTHESIZERS = {
+    "gtts": GTTSSynthesizer,
+    "pyttsx3": Pyttsx3Synthesizer,
+}
+
+
+# Synthesized audio cached in memory by (engine, text, voice, rate), with an optional disk tier.
+# Both tiers are LRUs bounded by bytes; on disk, recency is the file's mtime, refreshed on a hit.
+# Misses go through one queue per engine, served by the engine's own worker threads (a single
+# one for pyttsx3); concurrent requests for the same audio share one synthesis.
+class TTSCache:
+    def __init__(self, synthesizer, memory_bytes=32 * 1024 * 1024, cache_dir=DEFAULT_CACHE_DIR, max_queue=256,
+                 disk_bytes=DISK_BYTES):
+        self.synthesizer = synthesizer
+        self.mime = synthesizer.mime
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.directory = os.path.join(cache_dir, synthesizer.name) if cache_dir else None
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+        self._memory = collections.OrderedDict()
+        self._memory_used = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._disk_used = self._scan_disk()[1] if self.directory else 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "joined": 0, "evictions": 0,
+                      "disk_evictions": 0, "failures": 0, "synth_seconds": 0.0}
+        self._threads = [threading.Thread(target=self._run, name=f"tts-{synthesizer.name}-{i}", daemon=True)
+                         for i in range(getattr(synthesizer, "workers", 1))]
+        for thread in self._threads:
+            thread.start()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._memory)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + EXTENSIONS.get(self.mime, ".bin"))
+
+    def _remember(self, key, audio):
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = audio
+        self._memory_used += len(audio)
+        while self._memory_used > self.memory_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_used -= len(evicted)
+            self.stats["evictions"] += 1
+
+    def _read_disk(self, key):
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+        except OSError:
+            return None
+        try:
+            os.utime(path)  # recently used: evicted last
+        except OSError:
+            pass
+        return audio
+
+    # Write-then-rename, so sessions never see each other's half-written files
+    def _write_disk(self, key, audio):
+        if not self.directory:
+            return
+        path = self._path(key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(audio)
+            os.replace(tmp, path)
+        except OSError:
+            return
+        with self._disk_lock:
+            self._disk_used += len(audio)
+            if self._disk_used > self.disk_bytes:
+                self._prune_disk()
+
+    # (mtime, size, path) of every cached file and their total size; other processes' files included
+    def _scan_disk(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".tmp"):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue  # removed meanwhile
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries, sum(size for _, size, _ in entries)
+
+    # Remove the least recently used files down to 90% of the budget, so pruning is not per write
+    def _prune_disk(self):
+        entries, used = self._scan_disk()
+        removed = 0
+        for _, size, path in sorted(entries):
+            if used <= self.disk_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue  # already pruned by another process
+            used -= size
+            removed += 1
+        self._disk_used = used
+        with self._lock:
+            self.stats["disk_evictions"] += removed
+
+    # Future resolving to the audio bytes; cache hits resolve immediately
+    def submit(self, text, voice=None, rate=None):
+        voice = self.synthesizer.default_voice if voice is None else voice
+        rate = self.synthesizer.default_rate if rate is None else rate
+        key = audio_key(self.synthesizer.name, text, voice, rate)
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return _resolved(audio)
+            future = self._pending.get(key)
+            if future is not None:
+                self.stats["joined"] += 1
+                return future
+            future = self._pending[key] = Future()
+
+        audio = self._read_disk(key)
+        if audio is not None:
+            with self._lock:
+                self.stats["disk_hits"] += 1
+                self._remember(key, audio)
+                del self._pending[key]
+            future.set_result(audio)
+            return future
+
+        with self._lock:
+            self.stats["misses"] += 1
+        self._queue.put((key, text, voice, rate, future))
+        return future
+
+    def get(self, text, voice=None, rate=None, timeout=60):
+        return self.submit(text, voice, rate).result(timeout)
+
+    # Initialize the engine on the worker thread ahead of the first request
+    def warm_up(self, timeout=None):
+        future = Future()
+        self._queue.put((None, None, None, None, future))
+        future.result(timeout)
+        return self
+
+    def close(self):
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            key, text, voice, rate, future = item
+            if key is None:
+                try:
+                    getattr(self.synthesizer, "warm_up", lambda: None)()
+                    future.set_result(None)
+                except Exception as e:
+                    future.set_exception(e)
+                continue
+
+            start = time.perf_counter()
+            try:
+                with tracing.span("tts"):
+                    audio = self.synthesizer(text, voice, rate)
+            except Exception as e:
+                with self._lock:
+                    self.stats["failures"] += 1
+                    del self._pending[key]
+                future.set_exception(e)
+                continue
+            with self._lock:
+                self.stats["synth_seconds"] += time.perf_counter() - start
+                self._remember(key, audio)
+                del self._pending[key]
+            self._write_disk(key, audio)
+            future.set_result(audio)
+
+
+def _resolved(value):
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+# One cache and one synthesis worker per engine per process, shared by every session
+def get_tts(engine="gtts", synthesizer=None, **kwargs):
+    with _caches_lock:
+        cache = _caches.get(engine)
+        if cache is None:
+            cache = _caches[engine] = TTSCache(synthesizer or SYNTHESIZERS[engine](), **kwargs)
+        return cache
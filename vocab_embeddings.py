@@ -0,0 +1,137 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from atomic_files import file_lock, write_bytes
+from speech_coverage import unit_rows
+
+DEFAULT_TABLE_DIR = os.path.join(".cache", "vocab")
+BUILD_BATCH = 512
+RETRY_SECONDS = 60  # how often a process without a table looks for one built since
+
+
+# Identifies the word list a table was built for; rows follow the bank's word ids
+def vocabulary_digest(words):
+    digest = hashlib.blake2b(digest_size=16)
+    for word in words:
+        digest.update(word.encode("utf-8") + b"\n")
+    return digest.hexdigest()
+
+
+def table_dir(model_name, directory=DEFAULT_TABLE_DIR):
+    return os.path.join(directory, "".join(c if c.isalnum() or c in "-_." else "_" for c in model_name))
+
+
+# Unit-length float16 embeddings of every synonym bank word, memory-mapped. Row i is bank.words[i],
+# so the bank's word -> id dict is the only index; scoring an in-vocabulary answer is a row
+# lookup and a dot product, and the model only sees words the bank has never heard of.
+class VocabTable:
+    def __init__(self, bank, vectors):
+        self.bank = bank
+        self.vectors = vectors
+        self.dim = vectors.shape[1]
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def row(self, word):
+        return self.bank.index.get(word)
+
+    # Unit float32 vectors for words; encode_fn embeds the out-of-vocabulary ones in one call
+    def lookup(self, words, encode_fn):
+        out = np.empty((len(words), self.dim), dtype=np.float32)
+        rows = [self.row(word) for word in words]
+        known = [i for i, row in enumerate(rows) if row is not None]
+        if known:
+            out[known] = self.vectors[[rows[i] for i in known]]
+        unknown = [i for i, row in enumerate(rows) if row is None]
+        if unknown:
+            out[unknown] = unit_rows(encode_fn([words[i] for i in unknown]))
+        return out
+
+    # Best cosine of an answer against every accepted word: one max over a small matrix
+    def best_similarity(self, answer, accepted, encode_fn):
+        vectors = self.lookup([answer] + list(accepted), encode_fn)
+        return float((vectors[1:] @ vectors[0]).max()) if len(vectors) > 1 else 0.0
+
+    @classmethod
+    def open(cls, bank, model_name, directory=DEFAULT_TABLE_DIR):
+        path = table_dir(model_name, directory)
+        try:
+            with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+        except OSError:
+            return None
+        # A table built for another bank or model is ignored and rebuilt
+        if meta["model"] != model_name or meta["digest"] != vocabulary_digest(bank.words):
+            return None
+        return cls(bank, np.load(os.path.join(path, "vectors.npy"), mmap_mode="r"))
+
+
+# Encode the whole vocabulary in batches straight into a float16 .npy, then publish it. Builds
+# of one table are serialized by a lock file, and each writes its own temporary files.
+def build(bank, encode_fn, model_name, directory=DEFAULT_TABLE_DIR, batch=BUILD_BATCH):
+    words = bank.words
+    if not words:
+        raise ValueError("the synonym bank is empty")
+    path = table_dir(model_name, directory)
+    os.makedirs(path, exist_ok=True)
+    with file_lock(os.path.join(path, "build.lock")):
+        return _build_locked(bank, encode_fn, model_name, directory, path, batch)
+
+
+def _build_locked(bank, encode_fn, model_name, directory, path, batch):
+    words = bank.words
+    first = unit_rows(encode_fn(words[:batch]))
+    tmp = os.path.join(path, f"vectors.{os.getpid()}.tmp.npy")
+    vectors = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float16, shape=(len(words), first.shape[1]))
+    vectors[:len(first)] = first
+    for start in range(batch, len(words), batch):
+        vectors[start:start + batch] = unit_rows(encode_fn(words[start:start + batch]))
+    vectors.flush()
+    del vectors
+    os.replace(tmp, os.path.join(path, "vectors.npy"))
+    write_bytes(os.path.join(path, "meta.json"), json.dumps({
+        "model": model_name, "words": len(words), "digest": vocabulary_digest(words),
+        "dim": int(first.shape[1]), "dtype": "float16"}).encode("utf-8"))
+    return VocabTable.open(bank, model_name, directory)
+
+
+_tables = {}  # (bank, model, directory) -> (table or None, when it was last looked for)
+_tables_lock = threading.Lock()
+
+
+# The prebuilt table of a bank and model, opened once per process; None if it has not been built
+# (python -m vocab_embeddings), and then looked for again every RETRY_SECONDS. Pages never build
+# it, so live answers do not compete with encoding the whole vocabulary.
+def get_table(bank, model_name, directory=DEFAULT_TABLE_DIR):
+    key = (id(bank), model_name, directory)
+    with _tables_lock:
+        table, checked = _tables.get(key, (None, None))
+        if table is None and (checked is None or time.monotonic() - checked >= RETRY_SECONDS):
+            table = VocabTable.open(bank, model_name, directory)
+            _tables[key] = (table, time.monotonic())
+        return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute Sentence-BERT embeddings for the synonym bank")
+    parser.add_argument("--bank", default=None, help="synonym bank .npz (default: the app's bank)")
+    parser.add_argument("--dir", default=DEFAULT_TABLE_DIR)
+    args = parser.parse_args()
+
+    import startup
+    import synonym_bank
+    bank = synonym_bank.SynonymBank.load(args.bank) if args.bank else synonym_bank.load_or_build()
+    model = startup.load_sentence_model(startup.MODEL_PRECISION, startup.MODEL_THREADS)
+    table = build(bank, model.encode, startup.MODEL_ID, args.dir)
+    print(f"{len(table)} words x {table.dim} -> {table_dir(startup.MODEL_ID, args.dir)}")
+
+
+if __name__ == "__main__":
+    main()